@@ -0,0 +1,217 @@
+"""
+Per-block audio stages that sit between the recorder and the recognizer.
+
+Every stage works on one mono float32 block (-1.0..1.0) at a time with
+vectorized NumPy, so they are cheap enough to run on every capture block.
+
+Public:
+- VoiceActivityGate(sample_rate, ...)
+- Int16Converter(capacity)
+- Resampler(in_rate, out_rate)
+- downmix(frames) -> np.ndarray
+- load_wav(path) -> (samples, sample_rate)
+"""
+import wave
+from collections import deque
+from math import gcd
+
+import numpy as np
+
+_EPSILON = 1e-10
+_INT16_MAX = np.float32(32767)
+_INT16_MIN = np.float32(-32768)
+
+
+class VoiceActivityGate:
+    """
+    Energy / zero-crossing voice activity detector.
+
+    process() returns the blocks that should be fed to the recognizer: nothing
+    while it is silent, and the buffered pre-roll plus the current block when
+    speech starts so word onsets are not clipped. After the last speech block the
+    gate stays open for `hangover` seconds so the recognizer hears the trailing
+    silence it needs to finalize the utterance.
+    """
+
+    def __init__(
+        self,
+        sample_rate: int,
+        threshold_db: float = -55.0,
+        noise_margin_db: float = 10.0,
+        max_zcr: float = 0.5,
+        hangover: float = 1.0,
+        pre_roll: float = 0.3,
+    ) -> None:
+        self.sample_rate = sample_rate
+        self.threshold_db = threshold_db
+        self.noise_margin_db = noise_margin_db
+        self.max_zcr = max_zcr
+        self.hangover_samples = int(hangover * sample_rate)
+        self.pre_roll_samples = int(pre_roll * sample_rate)
+
+        self.noise_floor_db = threshold_db
+        self._pre_roll: deque[np.ndarray] = deque()
+        self._pre_roll_len = 0
+        self._open_for = 0
+        self.total_samples = 0
+        self.skipped_samples = 0
+
+    @property
+    def skipped_fraction(self) -> float:
+        return self.skipped_samples / self.total_samples if self.total_samples else 0.0
+
+    def reset(self) -> None:
+        self._pre_roll.clear()
+        self._pre_roll_len = 0
+        self._open_for = 0
+
+    def is_speech(self, block: np.ndarray) -> bool:
+        n = len(block)
+        if n == 0:
+            return False
+        energy_db = 10.0 * np.log10(float(np.dot(block, block)) / n + _EPSILON)
+        crossings = np.count_nonzero(np.signbit(block[1:]) != np.signbit(block[:-1]))
+        zcr = crossings / n
+
+        speech = (
+            energy_db > max(self.threshold_db, self.noise_floor_db + self.noise_margin_db)
+            and zcr <= self.max_zcr
+        )
+        if not speech:
+            # Track the background level so a noisy line does not hold the gate open
+            if energy_db < self.noise_floor_db:
+                self.noise_floor_db = energy_db
+            else:
+                self.noise_floor_db += 0.05 * (energy_db - self.noise_floor_db)
+        return speech
+
+    def process(self, block: np.ndarray) -> list[np.ndarray]:
+        n = len(block)
+        self.total_samples += n
+
+        if self.is_speech(block):
+            self._open_for = self.hangover_samples
+            if self._pre_roll:
+                blocks = [*self._pre_roll, block]
+                self.skipped_samples -= self._pre_roll_len
+                self._pre_roll.clear()
+                self._pre_roll_len = 0
+                return blocks
+            return [block]
+
+        if self._open_for > 0:
+            self._open_for -= n
+            return [block]
+
+        # Silent: keep a short pre-roll and skip the recognizer entirely.
+        # Copied: callers may pass views of a buffer they reuse for the next block.
+        self._pre_roll.append(block.copy())
+        self._pre_roll_len += n
+        while self._pre_roll and self._pre_roll_len - len(self._pre_roll[0]) >= self.pre_roll_samples:
+            self._pre_roll_len -= len(self._pre_roll.popleft())
+        self.skipped_samples += n
+        return []
+
+
+class Int16Converter:
+    """
+    float32 -> int16 PCM without per-block allocations.
+
+    The scale, clip and cast all write into buffers that are kept between calls
+    (grown only when a larger block shows up), and the result is returned as a
+    memoryview over the int16 buffer. Loud audio saturates instead of wrapping.
+    The view is only valid until the next convert() call.
+    """
+
+    def __init__(self, capacity: int = 4096) -> None:
+        self._scratch = np.empty(capacity, dtype=np.float32)
+        self._pcm = np.empty(capacity, dtype=np.int16)
+
+    def convert(self, block: np.ndarray) -> memoryview:
+        n = len(block)
+        if n > len(self._pcm):
+            self._scratch = np.empty(n, dtype=np.float32)
+            self._pcm = np.empty(n, dtype=np.int16)
+
+        scratch = self._scratch[:n]
+        pcm = self._pcm[:n]
+        # minimum/maximum with float32 scalars are cheaper than np.clip's dispatch
+        np.multiply(block, _INT16_MAX, out=scratch)
+        np.minimum(scratch, _INT16_MAX, out=scratch)
+        np.maximum(scratch, _INT16_MIN, out=scratch)
+        np.copyto(pcm, scratch, casting="unsafe")
+        return memoryview(pcm).cast("B")
+
+
+def downmix(frames: np.ndarray) -> np.ndarray:
+    """Average (frames, channels) capture data down to one mono float32 channel"""
+    if frames.ndim == 1:
+        return frames
+    if frames.shape[1] == 1:
+        return frames.reshape(-1)
+    return frames.mean(axis=1, dtype=np.float32)
+
+
+def load_wav(path: str) -> tuple[np.ndarray, int]:
+    """Read a 16-bit PCM WAV into mono float32 in -1.0..1.0; ValueError for any other sample width"""
+    with wave.open(path, "rb") as wav:
+        if wav.getsampwidth() != 2:
+            raise ValueError(f"{path}: only 16-bit PCM WAV is supported")
+        channels = wav.getnchannels()
+        rate = wav.getframerate()
+        frames = np.frombuffer(wav.readframes(wav.getnframes()), dtype=np.int16)
+    samples = frames.reshape(-1, channels).astype(np.float32) / np.float32(32768)
+    return downmix(samples), rate
+
+
+class Resampler:
+    """
+    Streaming polyphase FIR resampler (e.g. a 48 kHz device down to a 16 kHz model).
+
+    The rational ratio out/in is reduced to up/down; a windowed-sinc low-pass is
+    split into `up` phases and every output sample is one short dot product,
+    computed for the whole block at once. The last taps-1 input samples are kept
+    between calls so consecutive blocks filter as one continuous signal.
+    """
+
+    def __init__(self, in_rate: int, out_rate: int, taps_per_phase: int = 24) -> None:
+        divisor = gcd(in_rate, out_rate)
+        self.in_rate = in_rate
+        self.out_rate = out_rate
+        self.up = out_rate // divisor
+        self.down = in_rate // divisor
+        self.taps = taps_per_phase
+
+        # Low-pass just under the lower of the two Nyquist frequencies, at the upsampled rate
+        n_taps = taps_per_phase * self.up
+        cutoff = 0.45 / max(self.up, self.down)
+        n = np.arange(n_taps) - (n_taps - 1) / 2
+        h = 2 * cutoff * np.sinc(2 * cutoff * n) * np.kaiser(n_taps, 8.0)
+        h *= self.up / h.sum()
+
+        # phases[p, j] = h[p + j * up], reversed along j so it lines up with ascending input indices
+        self._phases = np.ascontiguousarray(h.reshape(taps_per_phase, self.up).T[:, ::-1], dtype=np.float32)
+        self._offsets = np.arange(taps_per_phase)
+        self._history = np.zeros(taps_per_phase - 1, dtype=np.float32)
+        self._next = 0 # Upsampled position of the next output, relative to the current block start
+
+    def reset(self) -> None:
+        self._history[:] = 0.0
+        self._next = 0
+
+    def process(self, block: np.ndarray) -> np.ndarray:
+        n_in = len(block)
+        extended = np.concatenate((self._history, block))
+
+        # Every output whose newest input sample falls inside this block
+        end = n_in * self.up
+        positions = np.arange(self._next, end, self.down)
+        bases = positions // self.up
+        phases = positions - bases * self.up
+
+        windows = extended[bases[:, None] + self._offsets]
+        out = np.einsum("ij,ij->i", windows, self._phases[phases]).astype(np.float32, copy=False)
+
+        self._next = (positions[-1] + self.down - end) if len(positions) else self._next - end
+        self._history = extended[-(self.taps - 1):].copy() if self.taps > 1 else self._history
+        return out
@@ -0,0 +1,229 @@
+"""
+Offline batch mode: run the name detector over recorded meetings.
+
+Files are spread across a process pool. Each worker loads the model once and
+keeps one recognizer, which it resets between files; every file goes through
+the same DetectionEngine pipeline (resampler, VAD, recognizer, matcher) as a
+live session, just without a loopback device in front of it.
+
+Output is JSONL: one line per final transcript and per detection, a summary line
+per file, and a closing throughput line (audio-hours per wall-hour per core).
+
+    python batch_detect.py recordings/ extra.wav --names william,harvin -o detections.jsonl
+
+Public:
+- find_audio_files(paths) -> list[str]
+- load_audio(path) -> (samples, sample_rate)
+- detect_file(path, config) -> dict
+- run_batch(paths, config, jobs, output) -> dict
+"""
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from audio_processing import downmix, load_wav
+from detection_engine import (
+    DEFAULT_MODEL_PATH,
+    MODE_FULL,
+    MODE_KEYWORDS,
+    ArraySource,
+    DetectionEngine,
+    EngineConfig,
+    EngineListener,
+    parse_targets,
+    vosk_recognizer_factory,
+)
+from name_matcher import parse_aliases
+
+AUDIO_EXTENSIONS = (".wav", ".flac")
+
+
+# Input ===
+
+def find_audio_files(paths: list[str]) -> list[str]:
+    """Expand directories (recursively) into their WAV/FLAC files, keeping the given order"""
+    files: list[str] = []
+    for path in paths:
+        if os.path.isdir(path):
+            for directory, _, names in sorted(os.walk(path)):
+                files.extend(
+                    os.path.join(directory, name)
+                    for name in sorted(names)
+                    if name.lower().endswith(AUDIO_EXTENSIONS)
+                )
+        else:
+            files.append(path)
+    return files
+
+
+def load_audio(path: str) -> tuple[np.ndarray, int]:
+    """Read a recording into mono float32 in -1.0..1.0. FLAC needs the soundfile package."""
+    if path.lower().endswith(".wav"):
+        try:
+            return load_wav(path)
+        except ValueError:
+            pass # 24-bit or float WAV: soundfile reads those
+
+    try:
+        import soundfile
+    except ImportError as e:
+        raise RuntimeError(f"{path}: reading this file needs the 'soundfile' package (pip install soundfile)") from e
+    samples, rate = soundfile.read(path, dtype="float32", always_2d=True)
+    return downmix(samples), rate
+
+
+# Worker ===
+
+_worker_recognizer = None
+
+
+def _worker_factory(config: EngineConfig):
+    """One recognizer per worker process, reset between files"""
+    global _worker_recognizer
+    if _worker_recognizer is None:
+        _worker_recognizer = vosk_recognizer_factory(config)
+    else:
+        _worker_recognizer.Reset()
+    return _worker_recognizer
+
+
+class _CollectingListener(EngineListener):
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.engine: DetectionEngine | None = None
+        self.events: list[dict] = []
+        self.errors: list[str] = []
+
+    def on_final(self, text):
+        self.events.append({"type": "final", "file": self.path, "audio_s": round(self.engine.audio_position, 2), "text": text})
+
+    def on_detection(self, target_names, pending_partial, timing=None):
+        event = {"type": "detection", "file": self.path, "audio_s": round(self.engine.audio_position, 2), "names": target_names}
+        if timing is not None and timing.word:
+            event["word"] = timing.word
+            event["word_audio_s"] = round(timing.word_audio_s, 2)
+        self.events.append(event)
+
+    def on_error(self, exc):
+        self.errors.append(str(exc))
+
+
+def detect_file(path: str, config: EngineConfig) -> dict:
+    """Run one recording through the detector. Returns its events and timing."""
+    wall, cpu = time.perf_counter(), time.process_time()
+    listener = _CollectingListener(path)
+    audio_seconds = 0.0
+    try:
+        samples, rate = load_audio(path)
+        audio_seconds = len(samples) / rate
+        engine = DetectionEngine(config, listener, ArraySource(samples, rate, name=os.path.basename(path)), _worker_factory)
+        listener.engine = engine
+        engine.run()
+    except Exception as e:
+        listener.errors.append(str(e))
+    return {
+        "file": path,
+        "events": listener.events,
+        "errors": listener.errors,
+        "audio_seconds": audio_seconds,
+        "wall_seconds": time.perf_counter() - wall,
+        "cpu_seconds": time.process_time() - cpu,
+    }
+
+
+# Pool ===
+
+def run_batch(paths: list[str], config: EngineConfig, jobs: int | None = None, output=sys.stdout) -> dict:
+    """Detect names in every file across `jobs` worker processes, writing JSONL to output as files finish"""
+    files = find_audio_files(paths)
+    jobs = max(1, min(jobs or os.cpu_count() or 1, len(files) or 1))
+
+    def write(record: dict) -> None:
+        output.write(json.dumps(record) + "\n")
+        output.flush()
+
+    totals = {"files": 0, "failed": 0, "detections": 0, "audio_seconds": 0.0, "cpu_seconds": 0.0}
+    started = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        futures = [pool.submit(detect_file, path, config) for path in files]
+        for future in as_completed(futures):
+            result = future.result()
+            for event in result["events"]:
+                write(event)
+            detections = sum(1 for event in result["events"] if event["type"] == "detection")
+            write({
+                "type": "file",
+                "file": result["file"],
+                "audio_seconds": round(result["audio_seconds"], 2),
+                "wall_seconds": round(result["wall_seconds"], 2),
+                "real_time_factor": round(result["wall_seconds"] / result["audio_seconds"], 4) if result["audio_seconds"] else None,
+                "detections": detections,
+                "errors": result["errors"],
+            })
+            totals["files"] += 1
+            totals["failed"] += bool(result["errors"])
+            totals["detections"] += detections
+            totals["audio_seconds"] += result["audio_seconds"]
+            totals["cpu_seconds"] += result["cpu_seconds"]
+    wall = time.perf_counter() - started
+
+    summary = {
+        "type": "summary",
+        **totals,
+        "jobs": jobs,
+        "wall_seconds": round(wall, 2),
+        "audio_hours_per_wall_hour": round(totals["audio_seconds"] / wall, 2) if wall else None,
+        # Throughput each worker core delivers; compare across machines and job counts
+        "audio_hours_per_wall_hour_per_core": round(totals["audio_seconds"] / wall / jobs, 2) if wall else None,
+        "audio_hours_per_cpu_hour": round(totals["audio_seconds"] / totals["cpu_seconds"], 2) if totals["cpu_seconds"] else None,
+    }
+    summary["audio_seconds"] = round(summary["audio_seconds"], 2)
+    summary["cpu_seconds"] = round(summary["cpu_seconds"], 2)
+    write(summary)
+    return summary
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Run the name detector over recorded WAV/FLAC files.")
+    parser.add_argument("paths", nargs="+", help="audio files or directories")
+    parser.add_argument("-o", "--output", default=None, help="JSONL output file (default: stdout)")
+    parser.add_argument("-j", "--jobs", type=int, default=None, help="worker processes (default: one per core)")
+    parser.add_argument("--names", default="william,harvin")
+    parser.add_argument("--aliases", default="", help="e.g. 'william=will|bill, harvin=harv'")
+    parser.add_argument("--fuzzy", action="store_true", help="also match one-letter, same-sounding variants of longer names")
+    parser.add_argument("--model", default=DEFAULT_MODEL_PATH)
+    parser.add_argument("--block-size", type=int, default=4096)
+    parser.add_argument("--cooldown", type=float, default=10.0)
+    parser.add_argument("--mode", choices=[MODE_FULL, MODE_KEYWORDS], default=MODE_FULL)
+    parser.add_argument("--no-vad", action="store_true", help="feed silence to the recognizer too")
+    parser.add_argument("--no-partials", action="store_true", help="only decode final results")
+    args = parser.parse_args()
+
+    config = EngineConfig(
+        target_names=parse_targets(args.names),
+        aliases=parse_aliases(args.aliases),
+        fuzzy_names=args.fuzzy,
+        model_path=args.model,
+        block_size=args.block_size,
+        cooldown=args.cooldown,
+        recognizer_mode=args.mode,
+        vad=not args.no_vad,
+        partial_results=not args.no_partials,
+    )
+    output = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    try:
+        summary = run_batch(args.paths, config, args.jobs, output)
+    finally:
+        if output is not sys.stdout:
+            output.close()
+    print(
+        f"{summary['files']} file(s), {summary['audio_seconds'] / 3600:.2f} h of audio in {summary['wall_seconds']:.0f} s: "
+        f"{summary['audio_hours_per_wall_hour_per_core']} audio-hours per wall-hour per core ({summary['jobs']} jobs)",
+        file=sys.stderr,
+    )
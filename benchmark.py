@@ -0,0 +1,693 @@
+"""
+Benchmarks for the listening pipeline. Run with `python benchmark.py <name> --help`.
+
+- modes: CPU per audio-second and detection latency, full transcript vs keyword grammar
+- convert: time and transient allocations per block for the float32 -> int16 conversion
+- matcher: name_in_text vs the compiled NameMatcher as the number of target phrases grows
+- suite: replays an audio corpus through capture -> convert -> recognize -> match over a
+  sweep of sample rates, block sizes, models and matcher options; saves JSON results
+- compare: real-time factor and latency of two saved suite results side by side
+- snap: minmaxPrograms latency and correctness on a simulated desktop with thousands of windows
+
+The suite needs no audio hardware: audio comes from an in-memory source, and a stub
+recognizer stands in for Vosk when no real model is usable: vosk not installed, the
+model files missing or failing to load, or the model named "stub".
+"""
+import argparse
+import importlib.util
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+import model_cache
+from audio_processing import Int16Converter, Resampler, load_wav
+from name_matcher import NameMatcher
+from detection_engine import (
+    DEFAULT_MODEL_PATH,
+    MODE_FULL,
+    MODE_KEYWORDS,
+    ArraySource,
+    DetectionEngine,
+    EngineConfig,
+    EngineListener,
+    name_in_text,
+    parse_targets,
+    resolve_model_rate,
+    vosk_recognizer_factory,
+)
+
+
+class _TimedRecognizer:
+    """Wraps a recognizer and accounts the time spent decoding"""
+
+    def __init__(self, recognizer) -> None:
+        self._recognizer = recognizer
+        self.blocks = 0
+        self.wall = 0.0
+        self.cpu = 0.0
+        self.audio_bytes = 0
+
+    def AcceptWaveform(self, data) -> bool:
+        wall, cpu = time.perf_counter(), time.process_time()
+        result = self._recognizer.AcceptWaveform(data)
+        self.wall += time.perf_counter() - wall
+        self.cpu += time.process_time() - cpu
+        self.blocks += 1
+        self.audio_bytes += len(data)
+        return result
+
+    def __getattr__(self, name):
+        return getattr(self._recognizer, name)
+
+
+class _DetectionRecorder(EngineListener):
+    def __init__(self, timed: list) -> None:
+        self.timed = timed
+        self.detections: list[dict] = []
+
+    def on_detection(self, target_names, pending_partial, timing=None):
+        recognizer = self.timed[0]
+        # Audio position (seconds) at which the detection fired: a lower value
+        # for the same recording means the mode reacted sooner.
+        self.detections.append({
+            "audio_s": recognizer.audio_bytes / 2 / recognizer.sample_rate,
+            "wall_s": time.perf_counter() - recognizer.started,
+        })
+        if timing is not None:
+            timing.complete()
+
+
+def bench_modes(audio_path: str, model_path: str, names: str, block_size: int) -> dict:
+    samples, rate = load_wav(audio_path)
+    audio_seconds = len(samples) / rate
+    report: dict = {"audio": audio_path, "audio_seconds": audio_seconds, "block_size": block_size, "modes": {}}
+
+    for mode in (MODE_FULL, MODE_KEYWORDS):
+        config = EngineConfig(
+            target_names=parse_targets(names),
+            model_path=model_path,
+            sample_rate=rate,
+            block_size=block_size,
+            cooldown=0.0,
+            recognizer_mode=mode,
+        )
+        timed: list = []
+
+        def factory(cfg, timed=timed):
+            recognizer = _TimedRecognizer(vosk_recognizer_factory(cfg))
+            recognizer.sample_rate = resolve_model_rate(cfg)
+            recognizer.started = time.perf_counter()
+            timed.append(recognizer)
+            return recognizer
+
+        events = _DetectionRecorder(timed)
+        vosk_recognizer_factory(config)  # Load the model outside the timed run
+        DetectionEngine(config, events, ArraySource(samples, rate), factory).run()
+
+        recognizer = timed[0]
+        report["modes"][mode] = {
+            "cpu_per_audio_second": recognizer.cpu / audio_seconds,
+            "real_time_factor": recognizer.wall / audio_seconds,
+            "ms_per_block": 1000 * recognizer.wall / max(recognizer.blocks, 1),
+            "detections": events.detections,
+            "first_detection_audio_s": events.detections[0]["audio_s"] if events.detections else None,
+        }
+    return report
+
+
+def _legacy_convert(block: np.ndarray) -> bytes:
+    return (block * 32767).astype(np.int16).tobytes()
+
+
+def _measure(func, block: np.ndarray, iterations: int) -> dict:
+    func(block)  # Warm-up: lets the converter size its buffers
+    started = time.perf_counter()
+    for _ in range(iterations):
+        func(block)
+    elapsed = time.perf_counter() - started
+
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    baseline, _ = tracemalloc.get_traced_memory()
+    result = func(block)
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return {
+        "us_per_block": 1e6 * elapsed / iterations,
+        # Bytes the call had to allocate: temporaries (peak) plus whatever it returned (current)
+        "allocated_bytes_per_block": peak - baseline,
+    }
+
+
+def bench_convert(block_sizes: list[int], iterations: int) -> dict:
+    rng = np.random.default_rng(0)
+    report: dict = {"iterations": iterations, "block_sizes": {}}
+    for block_size in block_sizes:
+        block = rng.uniform(-1.2, 1.2, block_size).astype(np.float32)
+        converter = Int16Converter(block_size)
+        report["block_sizes"][block_size] = {
+            "astype_tobytes": _measure(_legacy_convert, block, iterations),
+            "int16_converter": _measure(converter.convert, block, iterations),
+        }
+    return report
+
+
+_WORDS = (
+    "so the next item on the agenda is the quarterly review and i think we should "
+    "ask the team about the launch timeline before we move on to budget questions"
+).split()
+
+
+def bench_matcher(target_counts: list[int], iterations: int) -> dict:
+    rng = np.random.default_rng(0)
+    texts = [" ".join(rng.choice(_WORDS, 24)) for _ in range(200)]
+    report: dict = {"iterations": iterations, "words_per_text": 24, "targets": {}}
+    for count in target_counts:
+        # Synthetic names that never occur in the text: the common (miss) case
+        targets = [f"name{i:04d}" for i in range(count - 2)] + ["william", "harvin"]
+        matcher = NameMatcher(targets)
+        results = {}
+        for label, func in (("name_in_text", name_in_text), ("name_matcher", matcher)):
+            started = time.perf_counter()
+            for i in range(iterations):
+                func(targets, texts[i % len(texts)])
+            results[label] = {"us_per_call": 1e6 * (time.perf_counter() - started) / iterations}
+        started = time.perf_counter()
+        NameMatcher(targets)
+        results["name_matcher"]["compile_ms"] = 1000 * (time.perf_counter() - started)
+        report["targets"][count] = results
+    return report
+
+
+# Suite ===
+
+STUB_MODEL = "stub"
+MATCHERS = ("fuzzy", "exact", "legacy")
+
+# What the stub "hears", one phrase per utterance, in order
+_STUB_SCRIPT = (
+    "so the next item on the agenda",
+    "william can you share your screen",
+    "thanks that looks good",
+    "i think harvin had a question",
+    "let us move on to the budget",
+    "harvin and william please stay after",
+)
+
+
+class _StubRecognizer:
+    """
+    Stands in for KaldiRecognizer when no model is installed. Utterances are cut
+    on signal energy like a real decoder would end them; each one "transcribes"
+    to the next phrase of a fixed script, with word timestamps on the recognizer's
+    own audio timeline (one word every 0.3 s from the start of speech).
+    """
+
+    WORD_SECONDS = 0.3
+
+    def __init__(self, sample_rate: int, silence_ms: float = 300.0, threshold: int = 1000) -> None:
+        self.sample_rate = sample_rate
+        self.silence = int(sample_rate * silence_ms / 1000)
+        self.threshold = threshold
+        self.reason = "" # Why the suite fell back to the stub
+        self.fed = 0
+        self.utterances = 0
+        self._start: int | None = None
+        self._end = 0
+        self._final: dict = {"text": ""}
+
+    def SetWords(self, enabled) -> None:
+        pass
+
+    def SetPartialWords(self, enabled) -> None:
+        pass
+
+    def Reset(self) -> None:
+        self._start = None
+
+    def AcceptWaveform(self, data) -> bool:
+        pcm = np.frombuffer(data, dtype=np.int16)
+        start = self.fed
+        self.fed += len(pcm)
+        if len(pcm) and max(int(pcm.max()), -int(pcm.min())) >= self.threshold:
+            if self._start is None:
+                self._start = start
+            self._end = self.fed
+            return False
+        if self._start is not None and self.fed - self._end >= self.silence:
+            self._final = {"text": "", "result": self._words(self._end)}
+            self._final["text"] = " ".join(word["word"] for word in self._final["result"])
+            self._start = None
+            self.utterances += 1
+            return True
+        return False
+
+    def _words(self, until: int) -> list[dict]:
+        phrase = _STUB_SCRIPT[self.utterances % len(_STUB_SCRIPT)].split()
+        start = self._start / self.sample_rate
+        words = []
+        for index, word in enumerate(phrase):
+            end = min(start + (index + 1) * self.WORD_SECONDS, until / self.sample_rate)
+            words.append({"word": word, "start": end - self.WORD_SECONDS, "end": end, "conf": 1.0})
+            if end >= until / self.sample_rate:
+                break
+        return words
+
+    def Result(self) -> str:
+        return json.dumps(self._final)
+
+    def FinalResult(self) -> str:
+        return json.dumps({"text": ""})
+
+    def PartialResult(self) -> str:
+        if self._start is None:
+            return json.dumps({"partial": ""})
+        # Only words that have been spoken in full; the one still in progress is not heard yet
+        heard = [word for word in self._words(sys.maxsize) if word["end"] <= self.fed / self.sample_rate]
+        return json.dumps({"partial": " ".join(word["word"] for word in heard), "partial_result": heard})
+
+
+def _stub_reason(model_path: str) -> str | None:
+    """Why a real model cannot be used for this path, or None when it can"""
+    if model_path == STUB_MODEL:
+        return "requested"
+    if not os.path.isfile(os.path.join(model_path, "am", "final.mdl")):
+        return f"no model files in {model_path}"
+    if importlib.util.find_spec("vosk") is None:
+        return "vosk is not installed"
+    return None
+
+
+def _suite_factory(config: EngineConfig):
+    reason = _stub_reason(config.model_path)
+    if reason is None:
+        try:
+            return vosk_recognizer_factory(config)
+        except Exception as e:
+            reason = f"model failed to load ({e})"
+    recognizer = _StubRecognizer(resolve_model_rate(config))
+    recognizer.reason = reason
+    return recognizer
+
+
+def synthetic_corpus(sample_rate: int, seconds: float, speech_s: float = 2.0, pause_s: float = 1.0) -> np.ndarray:
+    """Deterministic speech-like bursts (voiced harmonics with a syllable envelope) between quiet gaps"""
+    rng = np.random.default_rng(0)
+    t = np.arange(int(speech_s * sample_rate)) / sample_rate
+    envelope = 0.5 + 0.5 * np.sin(2 * np.pi * 4.0 * t) ** 2
+    bursts = []
+    for pitch in (120.0, 180.0, 140.0, 210.0):
+        voiced = sum(np.sin(2 * np.pi * pitch * k * t) / k for k in range(1, 6))
+        bursts.append((0.2 * envelope * voiced).astype(np.float32))
+    pause = (rng.standard_normal(int(pause_s * sample_rate)) * 3e-4).astype(np.float32)
+
+    parts: list[np.ndarray] = []
+    total = 0
+    index = 0
+    while total < seconds * sample_rate:
+        parts.extend((bursts[index % len(bursts)], pause))
+        total += len(bursts[index % len(bursts)]) + len(pause)
+        index += 1
+    return np.concatenate(parts)[: int(seconds * sample_rate)]
+
+
+def load_corpus(paths: list[str], sample_rate: int) -> np.ndarray:
+    """Concatenate recordings into one stream at the swept device rate"""
+    from batch_detect import find_audio_files, load_audio
+
+    parts = []
+    for path in find_audio_files(paths):
+        samples, rate = load_audio(path)
+        if rate != sample_rate:
+            samples = Resampler(rate, sample_rate).process(samples)
+        parts.append(samples)
+    return np.concatenate(parts)
+
+
+class _MeasuredEngine(DetectionEngine):
+    """Times every block through convert -> recognize -> match on the recognition thread"""
+
+    def __init__(self, *args, trace_allocations: bool = False, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.trace_allocations = trace_allocations
+        self.block_cpu: list[float] = []
+        self.block_allocated: list[int] = []
+        self.block_started = 0.0
+
+    @property
+    def recognizer_seconds(self) -> float:
+        """Audio fed to the recognizer so far, on its own timeline"""
+        return self._fed_samples / self.model_rate
+
+    def _recognize(self, block, captured_at) -> None:
+        if self.trace_allocations:
+            tracemalloc.reset_peak()
+            baseline, _ = tracemalloc.get_traced_memory()
+        self.block_started = time.perf_counter()
+        cpu = time.thread_time()
+        super()._recognize(block, captured_at)
+        self.block_cpu.append(time.thread_time() - cpu)
+        if self.trace_allocations:
+            _, peak = tracemalloc.get_traced_memory()
+            self.block_allocated.append(peak - baseline)
+
+
+class _SuiteListener(EngineListener):
+    def __init__(self) -> None:
+        self.engine: _MeasuredEngine | None = None
+        self.latencies_ms: list[float] = []
+        self.word_timestamps = True
+
+    def on_detection(self, target_names, pending_partial, timing=None):
+        engine = self.engine
+        # Audio that had to arrive after the name ended, plus the compute spent on the block that found it
+        heard_after = engine.recognizer_seconds - timing.word_audio_s
+        compute = timing.matched_at - engine.block_started
+        self.latencies_ms.append(1000 * (max(heard_after, 0.0) + compute))
+        self.word_timestamps = self.word_timestamps and bool(timing.word)
+        timing.complete()
+
+
+def _percentile(values, q: float) -> float | None:
+    return float(np.percentile(values, q)) if len(values) else None
+
+
+def run_suite_case(case: dict, corpus_paths: list[str], corpus_seconds: float, vad: bool, alloc_seconds: float) -> dict:
+    """One point of the sweep. Runs in its own process so peak RSS belongs to this case alone."""
+    rate = case["sample_rate"]
+    if corpus_paths:
+        samples = load_corpus(corpus_paths, rate)
+    else:
+        samples = synthetic_corpus(rate, corpus_seconds)
+    audio_seconds = len(samples) / rate
+
+    config = EngineConfig(
+        target_names=["william", "harvin"],
+        model_path=case["model"],
+        sample_rate=rate,
+        block_size=case["block_size"],
+        cooldown=0.0,
+        vad=vad,
+        fuzzy_names=case["matcher"] != "exact",
+    )
+    matcher = name_in_text if case["matcher"] == "legacy" else None
+    recognizer = _suite_factory(config)  # Model load stays outside the timed run
+    stub = isinstance(recognizer, _StubRecognizer)
+
+    def replay(audio: np.ndarray, trace: bool) -> tuple[_MeasuredEngine, _SuiteListener]:
+        listener = _SuiteListener()
+        fresh = _suite_factory(config)
+        engine = _MeasuredEngine(config, listener, ArraySource(audio, rate), lambda _config: fresh, matcher=matcher, trace_allocations=trace)
+        listener.engine = engine
+        engine.run()
+        return engine, listener
+
+    wall, cpu = time.perf_counter(), time.process_time()
+    engine, listener = replay(samples, False)
+    wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+    block_cpu_ms = 1000 * np.asarray(engine.block_cpu)
+
+    # Second, shorter pass under tracemalloc: tracing would distort the timings above
+    traced_audio = samples[: int(alloc_seconds * rate)]
+    tracemalloc.start()
+    try:
+        traced, _ = replay(traced_audio, True)
+    finally:
+        tracemalloc.stop()
+    allocated = np.asarray(traced.block_allocated, dtype=float)
+
+    return {
+        **case,
+        "recognizer": "stub" if stub else "vosk",
+        "stub_reason": recognizer.reason if stub else None,
+        "audio_seconds": round(audio_seconds, 2),
+        "wall_seconds": round(wall, 3),
+        "real_time_factor": wall / audio_seconds,
+        "cpu_per_audio_second": cpu / audio_seconds,
+        "blocks": len(block_cpu_ms),
+        "block_cpu_ms": {
+            "mean": float(block_cpu_ms.mean()) if len(block_cpu_ms) else None,
+            "p50": _percentile(block_cpu_ms, 50),
+            "p99": _percentile(block_cpu_ms, 99),
+        },
+        "detections": len(listener.latencies_ms),
+        "detection_latency_ms": {
+            "p50": _percentile(listener.latencies_ms, 50),
+            "p99": _percentile(listener.latencies_ms, 99),
+            "from_word_timestamps": listener.word_timestamps,
+        },
+        "peak_rss_bytes": model_cache.peak_rss(),
+        # Python has no cumulative allocation counter: this is the transient peak per block
+        # under tracemalloc (Python and NumPy buffers), summed per second of audio
+        "allocated_bytes_per_block": float(allocated.mean()) if len(allocated) else None,
+        "allocated_bytes_per_audio_second": float(allocated.sum() / (len(traced_audio) / rate)) if len(traced_audio) else None,
+    }
+
+
+def _environment() -> dict:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = ""
+    return {
+        "commit": commit,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def bench_suite(
+    sample_rates: list[int],
+    block_sizes: list[int],
+    models: list[str],
+    matchers: list[str],
+    corpus_paths: list[str],
+    corpus_seconds: float,
+    vad: bool,
+    alloc_seconds: float,
+    isolate: bool = True,
+) -> dict:
+    cases = [
+        {"model": model, "sample_rate": rate, "block_size": block_size, "matcher": matcher}
+        for model in models
+        for rate in sample_rates
+        for block_size in block_sizes
+        for matcher in matchers
+    ]
+    report: dict = {
+        "environment": _environment(),
+        "corpus": corpus_paths or f"synthetic {corpus_seconds:g} s",
+        "vad": vad,
+        "results": [],
+    }
+    for case in cases:
+        args = (case, corpus_paths, corpus_seconds, vad, alloc_seconds)
+        if isolate:
+            with ProcessPoolExecutor(max_workers=1) as pool:
+                result = pool.submit(run_suite_case, *args).result()
+        else:
+            result = run_suite_case(*args)
+        report["results"].append(result)
+        print(
+            f"{case['model']:>10} {case['sample_rate']:>6} Hz {case['block_size']:>6} {case['matcher']:>6}: "
+            f"RTF {result['real_time_factor']:.4f}, p99 latency {result['detection_latency_ms']['p99'] or 0:.0f} ms, "
+            + (f"stub recognizer ({result['stub_reason']})" if result["recognizer"] == "stub" else "vosk"),
+            file=sys.stderr,
+        )
+    return report
+
+
+def compare_results(old_path: str, new_path: str) -> dict:
+    """Pair up the cases two suite runs have in common and report new/old ratios"""
+    def load(path):
+        with open(path, encoding="utf-8") as source:
+            report = json.load(source)
+        return report, {
+            (r["model"], r["sample_rate"], r["block_size"], r["matcher"]): r for r in report["results"]
+        }
+
+    old_report, old = load(old_path)
+    new_report, new = load(new_path)
+
+    def ratio(a, b):
+        return round(b / a, 3) if a and b is not None else None
+
+    cases = []
+    for key in old.keys() & new.keys():
+        a, b = old[key], new[key]
+        cases.append({
+            "case": dict(zip(("model", "sample_rate", "block_size", "matcher"), key)),
+            "real_time_factor": ratio(a["real_time_factor"], b["real_time_factor"]),
+            "block_cpu_ms_p99": ratio(a["block_cpu_ms"]["p99"], b["block_cpu_ms"]["p99"]),
+            "detection_latency_ms_p99": ratio(a["detection_latency_ms"]["p99"], b["detection_latency_ms"]["p99"]),
+            "peak_rss_bytes": ratio(a["peak_rss_bytes"], b["peak_rss_bytes"]),
+            "allocated_bytes_per_audio_second": ratio(a["allocated_bytes_per_audio_second"], b["allocated_bytes_per_audio_second"]),
+        })
+    cases.sort(key=lambda c: tuple(str(v) for v in c["case"].values()))
+    return {
+        "old": old_report["environment"],
+        "new": new_report["environment"],
+        "note": "new / old: below 1.0 is an improvement",
+        "cases": cases,
+    }
+
+
+# Snap ===
+
+def bench_snap(process_counts: list[int], windows_per_process: int, whitelisted: float, call_cost_us: float, repeats: int, live: bool = True) -> dict:
+    import process_handling
+    import whitelist
+    from window_backend import SHOW_MINIMIZED, SHOW_NORMAL, SimulatedDesktop, getBackend, setBackend
+
+    previous_backend = getBackend()
+    previous_whitelist = whitelist.getWhitelist()
+    report: dict = {
+        "windows_per_process": windows_per_process,
+        "whitelisted_fraction": whitelisted,
+        "call_cost_us": call_cost_us,
+        "processes": {},
+    }
+    try:
+        for count in process_counts:
+            desktop = SimulatedDesktop(callCost=call_cost_us / 1e6)
+            desktop.populate(count, windows_per_process)
+            setBackend(desktop)
+            allowed = [f"app{index:04d}.exe" for index in range(int(count * whitelisted))]
+            whitelist.setWhitelist(allowed)
+
+            cold, warm = [], []
+            for _ in range(repeats):
+                for window in desktop.windows.values():
+                    window.state = SHOW_NORMAL
+                process_handling.invalidateSnapshot()
+                # Submit-to-done time as reported by the snap worker
+                cold.append(whitelist.minmaxPrograms().result().totalSeconds)  # Includes the desktop enumeration
+                warm.append(whitelist.minmaxPrograms().result().totalSeconds)  # Snapshot still fresh
+
+            allowed_set = set(allowed)
+
+            def wrong_states() -> int:
+                return sum(
+                    (window.state == SHOW_MINIMIZED) == (desktop.exeNames[window.pid] in allowed_set)
+                    for window in desktop.windows.values()
+                )
+
+            result = {
+                "windows": len(desktop.windows),
+                "cold_ms": {"p50": 1000 * float(np.median(cold)), "max": 1000 * max(cold)},
+                "warm_ms": {"p50": 1000 * float(np.median(warm)), "max": 1000 * max(warm)},
+                "enumerations_per_snap": desktop.calls.get("enumWindows", 0) / (2 * repeats),
+                "wrong_state_windows": wrong_states(),
+            }
+
+            if live:
+                # Event-driven index: the desktop changes between snaps and no snap enumerates
+                process_handling.startLiveIndex()
+                enumerations = desktop.calls.get("enumWindows", 0)
+                rng = np.random.default_rng(count)
+                snaps = []
+                for _ in range(repeats):
+                    for window in desktop.windows.values():
+                        window.state = SHOW_NORMAL
+                    pids = list(desktop.exeNames)
+                    desktop.addWindow(int(rng.choice(pids)), "New window")
+                    desktop.closeWindow(int(rng.choice(list(desktop.windows))))
+                    desktop.setTitle(int(rng.choice(list(desktop.windows))), "Renamed")
+                    snaps.append(whitelist.minmaxPrograms().result().totalSeconds)
+                result["live_ms"] = {"p50": 1000 * float(np.median(snaps)), "max": 1000 * max(snaps)}
+                result["live_enumerations_per_snap"] = (desktop.calls.get("enumWindows", 0) - enumerations) / repeats
+                result["live_wrong_state_windows"] = wrong_states()
+                process_handling.stopLiveIndex()
+
+            report["processes"][count] = result
+    finally:
+        process_handling.stopLiveIndex()
+        setBackend(previous_backend)
+        whitelist.setWhitelist(previous_whitelist)
+        process_handling.invalidateSnapshot()
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    modes = commands.add_parser("modes", help="compare full-transcript and keyword recognizer modes")
+    modes.add_argument("audio", help="16-bit PCM WAV recording containing the target names")
+    modes.add_argument("--model", default=DEFAULT_MODEL_PATH)
+    modes.add_argument("--names", default="william,harvin")
+    modes.add_argument("--block-size", type=int, default=4096)
+
+    convert = commands.add_parser("convert", help="float32 -> int16 conversion cost per block")
+    convert.add_argument("--block-sizes", type=int, nargs="+", default=[256, 512, 1024, 2048, 4096, 8192])
+    convert.add_argument("--iterations", type=int, default=2000)
+
+    matcher = commands.add_parser("matcher", help="name matching cost per transcript")
+    matcher.add_argument("--targets", type=int, nargs="+", default=[2, 10, 100, 500])
+    matcher.add_argument("--iterations", type=int, default=5000)
+
+    suite = commands.add_parser("suite", help="sweep the whole pipeline and save JSON results")
+    suite.add_argument("--corpus", nargs="*", default=[], help="WAV/FLAC files or folders (default: synthetic speech bursts)")
+    suite.add_argument("--corpus-seconds", type=float, default=60.0, help="length of the synthetic corpus")
+    suite.add_argument("--sample-rates", type=int, nargs="+", default=[16000, 44100, 48000])
+    suite.add_argument("--block-sizes", type=int, nargs="+", default=[1024, 4096])
+    suite.add_argument("--models", nargs="+", default=[DEFAULT_MODEL_PATH], help=f"model directories; '{STUB_MODEL}', a missing/unloadable model or no vosk uses the stub recognizer")
+    suite.add_argument("--matchers", nargs="+", choices=MATCHERS, default=["fuzzy", "exact"])
+    suite.add_argument("--no-vad", action="store_true")
+    suite.add_argument("--alloc-seconds", type=float, default=10.0, help="audio replayed again under tracemalloc")
+    suite.add_argument("--in-process", action="store_true", help="skip the per-case process (peak RSS becomes cumulative)")
+    suite.add_argument("--output", default=None, help="results file (default: benchmark-<timestamp>.json)")
+
+    snap = commands.add_parser("snap", help="minmaxPrograms on a simulated desktop")
+    snap.add_argument("--processes", type=int, nargs="+", default=[10, 100, 1000])
+    snap.add_argument("--windows-per-process", type=int, default=3)
+    snap.add_argument("--whitelisted", type=float, default=0.1, help="fraction of processes on the whitelist")
+    snap.add_argument("--call-cost-us", type=float, default=0.0, help="simulated cost of each window-manager call")
+    snap.add_argument("--repeats", type=int, default=5)
+    snap.add_argument("--no-live", action="store_true", help="skip the event-driven window index run")
+
+    compare = commands.add_parser("compare", help="ratios between two saved suite results")
+    compare.add_argument("old")
+    compare.add_argument("new")
+
+    args = parser.parse_args()
+    if args.command == "suite":
+        report = bench_suite(
+            args.sample_rates, args.block_sizes, args.models, args.matchers,
+            args.corpus, args.corpus_seconds, not args.no_vad, args.alloc_seconds, not args.in_process,
+        )
+        output = args.output or time.strftime("benchmark-%Y%m%d-%H%M%S.json")
+        with open(output, "w", encoding="utf-8") as results:
+            json.dump(report, results, indent=2)
+        print(f"Saved {len(report['results'])} result(s) to {output}", file=sys.stderr)
+        return
+    if args.command == "modes":
+        report = bench_modes(args.audio, args.model, args.names, args.block_size)
+    elif args.command == "convert":
+        report = bench_convert(args.block_sizes, args.iterations)
+    elif args.command == "matcher":
+        report = bench_matcher(args.targets, args.iterations)
+    elif args.command == "snap":
+        report = bench_snap(args.processes, args.windows_per_process, args.whitelisted, args.call_cost_us, args.repeats, not args.no_live)
+    elif args.command == "compare":
+        report = compare_results(args.old, args.new)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
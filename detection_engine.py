@@ -0,0 +1,880 @@
+"""
+Headless capture -> recognize -> match -> act loop.
+
+Public:
+- EngineConfig
+- EngineListener
+- DetectionEngine(config, listener, source, recognizer_factory, matcher)
+- LoopbackSource(device_name)
+- ArraySource(samples, sample_rate)
+- parse_targets(raw: str) -> list[str]
+- keyword_grammar(target_names: list[str]) -> str
+- name_in_text(target: list[str], text: str) -> bool
+"""
+import bisect
+import functools
+import json
+import math
+import os
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Callable
+
+import numpy as np
+
+import device_registry
+import model_cache
+from engine_api import (
+    DEFAULT_MODEL_PATH,
+    DEFAULT_MODEL_RATE,
+    MODE_FULL,
+    MODE_KEYWORDS,
+    EngineListener,
+    parse_targets,
+)
+from latency import DetectionTiming, LatencyTracker
+from name_matcher import IncrementalDetector, NameMatcher, parse_aliases
+from audio_processing import Int16Converter, Resampler, VoiceActivityGate, downmix
+from ring_buffer import OVERFLOW_BLOCK, OVERFLOW_DROP_OLDEST, OVERFLOW_POLICIES, AudioRingBuffer
+
+# Common call words kept in the keyword grammar so ordinary speech is absorbed
+# by real words instead of being forced onto the closest target name.
+FILLER_WORDS: tuple[str, ...] = (
+    "the", "a", "and", "to", "you", "i", "it", "is", "that", "so", "we", "okay",
+    "yeah", "yes", "no", "um", "uh", "hi", "hey", "thanks", "what", "do", "think",
+    "can", "will", "just", "right", "well",
+)
+
+
+def name_in_text(target: list[str], text: str) -> bool:
+    """Check if target name is in text"""
+    text = text.strip().lower()
+
+    if not target or not text:
+        return False
+
+    for name in target:
+        if name in text:
+            return True
+
+    return False
+
+
+def read_model_rate(model_path: str, default: int = DEFAULT_MODEL_RATE) -> int:
+    """Sample rate the model was trained at, from its conf/mfcc.conf"""
+    try:
+        with open(os.path.join(model_path, "conf", "mfcc.conf")) as conf:
+            for line in conf:
+                if line.startswith("--sample-frequency="):
+                    return int(float(line.split("=", 1)[1]))
+    except (OSError, ValueError):
+        pass
+    return default
+
+
+def resolve_model_rate(config: "EngineConfig") -> int:
+    return config.model_rate or read_model_rate(config.model_path)
+
+
+def is_device_invalidated(exc: BaseException) -> bool:
+    """True when the error means the audio endpoint went away (device switched or reset)"""
+    message = str(exc).lower()
+    return "0x8889000a" in message or "audclnt_e_device_invalidated" in message
+
+
+@dataclass
+class EngineConfig:
+    target_names: list[str] = field(default_factory=list)
+    model_path: str = DEFAULT_MODEL_PATH
+    device_name: str | None = None
+    sample_rate: int = 48000 # Device capture rate; the recognizer always runs at the model's own rate
+    block_size: int = 4096
+    model_rate: int | None = None # None reads it from the model's conf/mfcc.conf
+    cooldown: float = 10.0 # Per target name
+    recognizer_mode: str = MODE_FULL
+    vad: bool = True
+    partial_results: bool = True # False: only final results are decoded (fine for keyword-only setups)
+    partial_interval_ms: float = 0.0 # Poll PartialResult at most this often; 0 polls after every block
+    partial_min_audio_ms: float = 0.0 # ...and only after at least this much new audio
+    word_timestamps: bool = True # SetWords(True): needed for per-stage latency stamps
+    aliases: dict[str, list[str]] = field(default_factory=dict) # target -> other ways it is said
+    fuzzy_names: bool = False # Also match one-letter, same-sounding variants of longer names
+    buffer_seconds: float = 2.0 # Capture audio that may queue up while the recognizer catches up
+    reconnect_delay: float = 0.05 # First retry after the device is invalidated; doubles per attempt...
+    reconnect_max_delay: float = 2.0 # ...up to this
+    reconnect_timeout: float = 30.0 # Give up when the device has not come back by then
+    adaptive_block: bool = False # Let BlockSizeController resize block_size from the measured real-time factor
+    block_size_min: int = 512
+    block_size_max: int = 16384
+    target_latency_ms: float = 150.0 # Block fill time + processing the adaptive size aims for
+    max_rtf: float = 0.7 # Adaptive sizes keep processing time below this share of the audio time
+    overflow: str = OVERFLOW_DROP_OLDEST
+
+
+# Audio sources ===
+# A source only needs a microphone() method returning an object with a `name`
+# and a soundcard-style recorder(samplerate, channels, blocksize) context manager
+# whose record(n) returns float32 frames in -1.0..1.0. A microphone that knows its
+# own rate exposes it as `native_rate`, which wins over EngineConfig.sample_rate.
+class LoopbackSource:
+    def __init__(self, device_name: str | None = None) -> None:
+        self.device_name = device_name
+
+    def microphone(self):
+        """Find loopback microphone (from the cached device registry)"""
+        return device_registry.loopback_microphone(self.device_name)
+
+    def invalidate(self) -> None:
+        """The device went away: look it up afresh next time"""
+        device_registry.invalidate()
+
+
+class _ArrayRecorder:
+    def __init__(self, samples: np.ndarray, realtime: bool, sample_rate: int) -> None:
+        self._samples = samples
+        self._pos = 0
+        self._realtime = realtime
+        self._sample_rate = sample_rate
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc) -> None:
+        return None
+
+    def record(self, numframes: int) -> np.ndarray:
+        if self._pos >= len(self._samples):
+            raise EOFError("end of audio")
+        block = self._samples[self._pos:self._pos + numframes]
+        self._pos += len(block)
+        if self._realtime:
+            time.sleep(len(block) / self._sample_rate)
+        return block.reshape(-1, 1)
+
+
+class ArraySource:
+    """Replays a mono float32 array as if it came from a loopback device. Used for headless runs."""
+
+    def __init__(self, samples, sample_rate: int = 16000, realtime: bool = False, name: str = "array") -> None:
+        self.samples = np.asarray(samples, dtype=np.float32).reshape(-1)
+        self.sample_rate = sample_rate
+        self.native_rate = sample_rate
+        self.lossless = not realtime # Nothing is lost by making a file wait for the recognizer
+        self.realtime = realtime
+        self.name = name
+
+    def microphone(self):
+        return self
+
+    def recorder(self, samplerate: int, channels: int | None = None, blocksize: int | None = None):
+        return _ArrayRecorder(self.samples, self.realtime, self.sample_rate)
+
+
+def keyword_grammar(target_names: list[str], fillers: tuple[str, ...] = FILLER_WORDS) -> str:
+    """Vosk grammar JSON restricted to the target names, filler words and [unk]"""
+    phrases = list(dict.fromkeys([*target_names, *fillers]))
+    phrases.append("[unk]")
+    return json.dumps(phrases)
+
+
+@functools.lru_cache(maxsize=None)
+def _buffer_recognizer_class():
+    """KaldiRecognizer that accepts any buffer (memoryview, ndarray) without copying it to bytes"""
+    import vosk
+
+    ffi = getattr(vosk, "_ffi", None)
+
+    class BufferRecognizer(vosk.KaldiRecognizer):
+        def AcceptWaveform(self, data):
+            if isinstance(data, bytes):
+                return super().AcceptWaveform(data)
+            if ffi is None:
+                return super().AcceptWaveform(bytes(data))
+            return super().AcceptWaveform(ffi.from_buffer(data))
+
+    return BufferRecognizer
+
+
+def vosk_recognizer_factory(config: EngineConfig):
+    """
+    Build a Vosk recognizer on top of the cached model.
+
+    In keyword mode the decoder only searches the grammar from keyword_grammar(),
+    which is far cheaper than the open vocabulary; it needs a model with a
+    dynamic graph (the small models have one).
+    """
+    KaldiRecognizer = _buffer_recognizer_class()
+
+    model = model_cache.get_model(config.model_path)
+    model_rate = resolve_model_rate(config)
+    if config.recognizer_mode == MODE_KEYWORDS:
+        alias_words = [word for variants in config.aliases.values() for alias in variants for word in alias.split()]
+        recognizer = KaldiRecognizer(model, model_rate, keyword_grammar([*config.target_names, *alias_words]))
+    else:
+        recognizer = KaldiRecognizer(model, model_rate)
+    if config.word_timestamps:
+        # Word start/end times let every detection be placed on the audio timeline
+        recognizer.SetWords(True)
+        if hasattr(recognizer, "SetPartialWords"):
+            recognizer.SetPartialWords(True)
+    return recognizer
+
+
+class PartialPolicy:
+    """Decides when PartialResult() is worth calling, and counts the work it avoided"""
+
+    def __init__(self, enabled: bool, interval_ms: float, min_audio_ms: float, sample_rate: int) -> None:
+        self.enabled = enabled
+        # Both gates count samples, so whole blocks never drift under the interval
+        self.interval = round(interval_ms / 1000.0 * sample_rate)
+        self.min_audio = int(min_audio_ms / 1000.0 * sample_rate)
+        self.sample_rate = sample_rate
+        self._audio_clock = 0 # Samples seen so far
+        self._last_poll: int | None = None
+        self._pending_audio = 0
+        self._last_raw = ""
+
+        # Counters
+        self.blocks = 0
+        self.skipped_disabled = 0
+        self.skipped_interval = 0
+        self.skipped_audio = 0
+        self.unchanged = 0
+        self.decoded = 0
+
+    def due(self, samples: int) -> bool:
+        """
+        Called for every non-final block with the samples just fed. Time is measured
+        on the audio clock, so live and file sources behave the same.
+        """
+        self.blocks += 1
+        self._audio_clock += samples
+        self._pending_audio += samples
+        now = self._audio_clock
+        if not self.enabled:
+            self.skipped_disabled += 1
+            return False
+        if self._last_poll is not None and now - self._last_poll < self.interval:
+            self.skipped_interval += 1
+            return False
+        if self._pending_audio < self.min_audio:
+            self.skipped_audio += 1
+            return False
+        self._last_poll = now
+        self._pending_audio = 0
+        return True
+
+    def changed(self, raw: str) -> bool:
+        """False when the recognizer returned the same JSON as last time (no decode needed)"""
+        if raw == self._last_raw:
+            self.unchanged += 1
+            return False
+        self._last_raw = raw
+        self.decoded += 1
+        return True
+
+    def utterance_ended(self, samples: int) -> None:
+        self._audio_clock += samples
+        self._last_raw = ""
+        self._pending_audio = 0
+
+    def stats(self) -> dict:
+        return {
+            "blocks": self.blocks,
+            "decoded": self.decoded,
+            "skipped_disabled": self.skipped_disabled,
+            "skipped_interval": self.skipped_interval,
+            "skipped_audio": self.skipped_audio,
+            "unchanged": self.unchanged,
+        }
+
+    def describe(self) -> str:
+        avoided = self.blocks - self.decoded
+        share = avoided / self.blocks if self.blocks else 0.0
+        return (
+            f"Partial results: decoded {self.decoded} of {self.blocks} block(s), "
+            f"avoided {share:.0%} ({self.skipped_interval} by interval, {self.skipped_audio} by audio, "
+            f"{self.unchanged} unchanged, {self.skipped_disabled} disabled)."
+        )
+
+
+class BlockSizeController:
+    """
+    Picks how many samples are captured and fed to the recognizer per call.
+
+    Small blocks shorten the wait for a block to fill but pay the recognizer's
+    per-call overhead (and partial polling) more often; large blocks amortize it
+    and add latency. Every `window` seconds of audio the measured real-time factor
+    (processing time / audio time) sets the next size: double while the RTF is
+    above max_rtf or a backlog builds, otherwise move toward the largest block
+    whose fill time plus processing still meets the target latency. Shrinking
+    assumes the worst case (all cost is per call), so it never plans a size that
+    would push the RTF past max_rtf. Disabled, it only measures.
+    """
+
+    def __init__(
+        self,
+        initial: int,
+        sample_rate: int,
+        enabled: bool = True,
+        minimum: int = 512,
+        maximum: int = 16384,
+        target_latency_ms: float = 150.0,
+        max_rtf: float = 0.7,
+        window: float = 1.0,
+        step: int = 256,
+    ) -> None:
+        self.enabled = enabled
+        self.minimum = max(step, minimum // step * step)
+        self.maximum = max(self.minimum, maximum // step * step)
+        self.target_latency = target_latency_ms / 1000.0
+        self.max_rtf = max_rtf
+        self.sample_rate = sample_rate
+        self.window = window
+        self.step = step
+        self.size = self._clamp(initial) if enabled else initial
+        self.rtf = 0.0 # Over the last window
+        self.latency = 0.0 # Estimated seconds from a sample arriving to its block being recognized
+        self._busy = 0.0
+        self._audio = 0.0
+        self._calls = 0
+        self._hold = 0 # Windows to wait before shrinking again after falling behind
+
+        # Counters
+        self.windows = 0
+        self.grown = 0
+        self.shrunk = 0
+        self.peak_rtf = 0.0
+
+    @property
+    def capacity(self) -> int:
+        """Largest block this controller can ask for"""
+        return self.maximum if self.enabled else self.size
+
+    def _clamp(self, size: int) -> int:
+        return min(max(size // self.step * self.step, self.minimum), self.maximum)
+
+    def record(self, samples: int, seconds: float, backlog: int = 0) -> bool:
+        """
+        One block done: `samples` of audio took `seconds` to process, `backlog`
+        samples are still queued behind it. Returns True when a window closed
+        (rtf, latency and maybe size were updated).
+        """
+        self._busy += seconds
+        self._audio += samples / self.sample_rate
+        self._calls += 1
+        if self._audio < self.window:
+            return False
+
+        self.rtf = self._busy / self._audio
+        self.peak_rtf = max(self.peak_rtf, self.rtf)
+        self.latency = (self.size + backlog) / self.sample_rate + self._busy / self._calls
+        self._busy = self._audio = 0.0
+        self._calls = 0
+        self.windows += 1
+        if self.enabled:
+            self._adjust(backlog)
+        return True
+
+    def _adjust(self, backlog: int) -> None:
+        size = self.size
+        if self.rtf > self.max_rtf or backlog > size:
+            # Falling behind: spread the per-call overhead over more audio
+            target = size * 2
+            self._hold = 3
+        else:
+            target = int(self.target_latency / (1.0 + self.rtf) * self.sample_rate)
+            if target < size:
+                if self._hold:
+                    self._hold -= 1
+                    return
+                # Worst case the RTF scales with size / new size; round up so the step does not undercut it
+                needed = math.ceil(size * self.rtf / self.max_rtf / self.step) * self.step
+                target = max(target, size // 2, needed)
+            else:
+                target = min(target, size * 2)
+
+        target = self._clamp(target)
+        if target > size:
+            self.grown += 1
+        elif target < size:
+            self.shrunk += 1
+        self.size = target
+
+    def stats(self) -> dict:
+        return {
+            "block_size": self.size,
+            "rtf": self.rtf,
+            "peak_rtf": self.peak_rtf,
+            "latency_ms": self.latency * 1000.0,
+            "windows": self.windows,
+            "grown": self.grown,
+            "shrunk": self.shrunk,
+        }
+
+    def describe(self) -> str:
+        block_ms = self.size / self.sample_rate * 1000.0
+        if not self.enabled:
+            return f"Block size: fixed at {self.size} ({block_ms:.0f} ms), real-time factor {self.rtf:.2f} (peak {self.peak_rtf:.2f})."
+        return (
+            f"Block size: ended at {self.size} ({block_ms:.0f} ms), grown {self.grown}x / shrunk {self.shrunk}x, "
+            f"real-time factor {self.rtf:.2f} (peak {self.peak_rtf:.2f})."
+        )
+
+
+# Engine ===
+class DetectionEngine:
+    def __init__(
+        self,
+        config: EngineConfig,
+        listener: EngineListener | None = None,
+        source: Any = None,
+        recognizer_factory: Callable[[EngineConfig], Any] = vosk_recognizer_factory,
+        matcher: Callable[[list[str], str], bool] | None = None,
+        archive: Any = None,
+        latency: LatencyTracker | None = None,
+    ) -> None:
+        self.config = config
+        self.listener = listener or EngineListener()
+        self.source = source if source is not None else LoopbackSource(config.device_name)
+        # Files decode faster than real time: their cooldowns run on the audio clock
+        self._audio_clock = getattr(self.source, "lossless", False)
+        self.recognizer_factory = recognizer_factory
+        # Compiled once per listening session; name_in_text is still accepted as a plain function
+        self.matcher = matcher or NameMatcher(config.target_names, config.aliases, config.fuzzy_names)
+        self.detector = IncrementalDetector(self.matcher, config.target_names, config.cooldown)
+        self.archive = archive # Anything with record(text, device, detected, targets), e.g. TranscriptArchive
+
+        self.recognizer = None
+        self.model_rate = resolve_model_rate(config)
+        self.vad = VoiceActivityGate(self.model_rate) if config.vad else None
+        self.partials = PartialPolicy(
+            config.partial_results, config.partial_interval_ms, config.partial_min_audio_ms, self.model_rate
+        )
+        self.blocks = BlockSizeController(
+            config.block_size,
+            config.sample_rate,
+            enabled=config.adaptive_block,
+            minimum=config.block_size_min,
+            maximum=config.block_size_max,
+            target_latency_ms=config.target_latency_ms,
+            max_rtf=config.max_rtf,
+        )
+        self.converter = Int16Converter(self.blocks.capacity)
+        self.resampler: Resampler | None = None
+        self.ring: AudioRingBuffer | None = None
+        self.thread: threading.Thread | None = None
+        self._capture_rate = config.sample_rate
+        self._device_name = ""
+        self.latency = latency or LatencyTracker()
+        self._capture_marks: deque[tuple[int, float]] = deque() # (ring end position, perf_counter)
+        self._fed_samples = 0
+        self._fed_ends: list[float] = [] # Recognizer audio time at the end of each fed block
+        self._fed_times: list[float] = [] # ...and when that block was captured
+        self._recognition_error: Exception | None = None
+        self._draining = False # Set at end of input: flush the recognizer's last utterance
+        self._lost_at: float | None = None # perf_counter when the device was invalidated, until audio flows again
+        self._reconnect_attempts = 0
+        self.reconnects: list[dict] = [] # {"device", "seconds", "attempts"} per recovered invalidation
+        self._stopped = threading.Event()
+        self._last_partial = ""
+
+    @property
+    def listening(self) -> bool:
+        return not self._stopped.is_set()
+
+    @property
+    def audio_position(self) -> float:
+        """Seconds of source audio handed to recognition so far (silence skipped by the VAD included)"""
+        if self.ring is None:
+            return 0.0
+        return self.ring.read_position / self._capture_rate
+
+    @property
+    def block_size(self) -> int:
+        """Samples (at the capture rate) currently captured and fed per recognizer call"""
+        return self.blocks.size
+
+    @property
+    def real_time_factor(self) -> float:
+        """Recognition time / audio time over the last measurement window"""
+        return self.blocks.rtf
+
+    def start(self) -> threading.Thread:
+        """Run the engine on a daemon thread"""
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+        return self.thread
+
+    def stop(self) -> None:
+        self._stopped.set()
+
+    def run(self) -> None:
+        """
+        Listening loop. Blocks until stop() or the source runs out of audio.
+
+        This thread only captures: blocks go into a ring buffer that a separate
+        recognition thread drains, so a slow AcceptWaveform never stalls the device.
+        """
+        config = self.config
+        events = self.listener
+        recognition_thread = None
+        drain = False
+        try:
+            events.on_status(f"Loading model from: {config.model_path}")
+            self.recognizer = self.recognizer_factory(config)
+            model_stats = model_cache.stats_for(config.model_path)
+            if model_stats:
+                events.on_info(model_stats.describe())
+
+            overflow = OVERFLOW_BLOCK if getattr(self.source, "lossless", False) else config.overflow
+            self.ring = AudioRingBuffer(
+                max(int(config.buffer_seconds * config.sample_rate), 2 * self.blocks.capacity),
+                overflow,
+            )
+            self._capture_rate = config.sample_rate
+            recognition_thread = threading.Thread(target=self._recognition_loop, name="recognition", daemon=True)
+            recognition_thread.start()
+
+            while self.listening:
+                try:
+                    events.on_status("Finding microphone...")
+                    mic = self.source.microphone()
+                    capture_rate = getattr(mic, "native_rate", None) or config.sample_rate
+                    if capture_rate != self._capture_rate:
+                        # Let the recognizer finish audio recorded at the old rate first
+                        self.ring.wait_empty(timeout=config.buffer_seconds)
+                        self._capture_rate = capture_rate
+                        self.blocks.sample_rate = capture_rate
+
+                    self._device_name = mic.name
+                    events.on_status(
+                        f"Device: {mic.name} \nTarget: {config.target_names} \nListening"
+                    )
+
+                    # Record every channel at the device rate; downmix and resampling happen downstream.
+                    # An adaptive block size asks for the smallest device buffer so any size can be read.
+                    with mic.recorder(
+                        samplerate=capture_rate,
+                        channels=None,
+                        blocksize=self.blocks.minimum if config.adaptive_block else config.block_size,
+                    ) as recorder:
+                        self._capture_loop(recorder)
+
+                except EOFError:
+                    drain = True
+                    break
+                except Exception as e:
+                    # While reconnecting, a device that has not reappeared yet is retried too
+                    missing = self._lost_at is not None and isinstance(e, device_registry.DeviceNotFoundError)
+                    if not (is_device_invalidated(e) or missing):
+                        raise
+                    self._wait_for_device(e)
+
+            self._finish_recognition(recognition_thread, drain)
+            recognition_thread = None
+            if self._recognition_error is not None:
+                raise self._recognition_error
+
+        # When there is an error launching
+        except Exception as e:
+            events.on_error(e)
+
+        # Runs no matter what happens
+        finally:
+            if recognition_thread is not None:
+                self._finish_recognition(recognition_thread, False)
+            self._stopped.set()
+            events.on_stopped()
+
+    def _wait_for_device(self, error: Exception) -> None:
+        """
+        Back off before the next lookup after the device went away. The recognizer,
+        detector and ring buffer are left alone, so the utterance in progress
+        continues once audio flows again.
+        """
+        config = self.config
+        now = time.perf_counter()
+        if self._lost_at is None:
+            self._lost_at = now
+            self._reconnect_attempts = 0
+        elif now - self._lost_at > config.reconnect_timeout:
+            raise error
+        self._reconnect_attempts += 1
+        invalidate = getattr(self.source, "invalidate", None)
+        if invalidate is not None:
+            invalidate()
+
+        delay = min(config.reconnect_delay * 2 ** (self._reconnect_attempts - 1), config.reconnect_max_delay)
+        self.listener.on_status(
+            f"Audio device changed or was reset.\nReconnecting (attempt {self._reconnect_attempts})...\n"
+            "If this keeps up, please choose another audio device!"
+        )
+        self._stopped.wait(delay)
+
+    def _reconnected(self) -> None:
+        seconds = time.perf_counter() - self._lost_at
+        self.reconnects.append({"device": self._device_name, "seconds": seconds, "attempts": self._reconnect_attempts})
+        self._lost_at = None
+        self.listener.on_info(
+            f"Reconnected to {self._device_name} in {seconds * 1000:.0f} ms "
+            f"({self._reconnect_attempts} attempt(s)); the current sentence was kept."
+        )
+
+    def _finish_recognition(self, recognition_thread: threading.Thread, drain: bool) -> None:
+        # A finished file is drained to the end; a stopped live session drops what is left
+        self._draining = drain
+        if not drain:
+            self.ring.clear()
+        self.ring.close()
+        recognition_thread.join()
+        stats = self.ring.stats()
+        self.listener.on_info(
+            f"Capture buffer: {stats['overruns']} overrun(s), "
+            f"{stats['dropped_samples'] / self._capture_rate:.1f} s dropped, "
+            f"peak depth {stats['max_depth'] / self._capture_rate * 1000:.0f} ms."
+        )
+
+    def buffer_stats(self) -> dict:
+        """Overrun and queue-depth counters for the capture ring buffer"""
+        return self.ring.stats() if self.ring is not None else {}
+
+    def _capture_loop(self, recorder) -> None:
+        blocks = self.blocks
+        ring = self.ring
+        marks = self._capture_marks
+
+        while self.listening:
+            data = recorder.record(blocks.size) # Data is audio described in float -1.0 to 1.0
+            if self._lost_at is not None:
+                self._reconnected()
+            block = downmix(data)
+            # Remember when each stretch of the ring was captured, for latency stamps
+            marks.append((ring.write_position + min(len(block), ring.capacity), time.perf_counter()))
+            ring.write(block)
+
+    def _capture_time(self, position: int) -> float:
+        """perf_counter time at which ring sample `position` was handed over by the device"""
+        marks = self._capture_marks
+        while len(marks) > 1 and marks[0][0] < position:
+            marks.popleft()
+        if not marks:
+            return time.perf_counter()
+        end, captured_at = marks[0]
+        return captured_at - max(end - position, 0) / self._capture_rate
+
+    def _recognition_loop(self) -> None:
+        ring = self.ring
+        gate = self.vad
+        blocks = self.blocks
+        chunk = np.empty(blocks.capacity, dtype=np.float32)
+        try:
+            while True:
+                n = ring.read_into(chunk[:blocks.size], timeout=0.1)
+                if n == 0:
+                    if ring.closed:
+                        if self._draining:
+                            # Vosk holds back the last utterance until it is told the audio has ended
+                            self._final_result(self.recognizer.FinalResult())
+                        break
+                    continue
+                started = time.perf_counter()
+                self._process_block(chunk[:n], self._capture_time(ring.read_position))
+                # A file source is always queued ahead of recognition; that backlog is not lag
+                backlog = 0 if self._audio_clock else ring.depth
+                if blocks.record(n, time.perf_counter() - started, backlog):
+                    self.listener.on_block_size(blocks.size, blocks.size / self._capture_rate * 1000.0, blocks.rtf)
+        except Exception as e:
+            self._recognition_error = e
+            self.stop()
+            ring.close() # Wake a capture thread waiting for room
+        finally:
+            if gate is not None:
+                self.listener.on_info(f"Voice activity gate skipped {gate.skipped_fraction:.0%} of the audio.")
+            self.listener.on_info(self.partials.describe())
+            self.listener.on_info(blocks.describe())
+
+    def _process_block(self, block: np.ndarray, captured_at: float) -> None:
+        """Resample, gate and recognize one block read from the ring"""
+        gate = self.vad
+        if self._capture_rate != self.model_rate:
+            if self.resampler is None or self.resampler.in_rate != self._capture_rate:
+                # The gate works at the model rate, so its pre-roll and hangover carry over a device switch
+                self.resampler = Resampler(self._capture_rate, self.model_rate)
+            block = self.resampler.process(block)
+
+        if gate is None:
+            self._recognize(block, captured_at)
+            return
+
+        # Silence never reaches the recognizer; speech arrives with its pre-roll
+        for voiced in gate.process(block):
+            self._recognize(voiced, captured_at)
+
+    def _recognize(self, block: np.ndarray, captured_at: float) -> None:
+        events = self.listener
+        recognizer = self.recognizer
+        pcm = self.converter.convert(block) # Vosk only accepts 16 bit integers (-32768 to 32767)
+
+        # Feed the audio into the recognizer
+        # Will return True if speech has ended (Final result) and False if not (Partial)
+        is_final = recognizer.AcceptWaveform(pcm)
+        self._fed_samples += len(block)
+        self._fed_ends.append(self._fed_samples / self.model_rate)
+        self._fed_times.append(captured_at)
+        if len(self._fed_ends) > 4096:
+            del self._fed_ends[:2048], self._fed_times[:2048]
+
+        if is_final:
+            self._final_result(recognizer.Result(), len(block))
+            return
+
+        if not self.partials.due(len(block)):
+            return
+        raw = recognizer.PartialResult()
+        if not self.partials.changed(raw):
+            return
+        partial = json.loads(raw)
+        emitted_at = time.perf_counter()
+        text = partial.get("partial", "")
+        words = partial.get("partial_result", [])
+        events.on_partial(text)
+        self._last_partial = text
+        fired = self.detector.partial(text, self._now())
+
+        if fired:
+            timing = self._timing(fired, words, emitted_at)
+            events.on_detection(fired, self._last_partial, timing)
+            self._last_partial = ""
+
+    def _final_result(self, raw: str, samples: int = 0) -> None:
+        """A finished utterance: transcript, archive and detection"""
+        events = self.listener
+        result = json.loads(raw)
+        emitted_at = time.perf_counter()
+        text = result.get("text", "")
+        words = result.get("result", [])
+        if text:
+            events.on_final(text)
+        self._last_partial = ""
+        self.partials.utterance_ended(samples)
+        fired = self.detector.final(text, self._now())
+        if text and self.archive is not None:
+            heard = self.detector.last_utterance_names
+            self.archive.record(text, self._device_name, bool(heard), sorted(heard))
+
+        if fired:
+            timing = self._timing(fired, words, emitted_at)
+            events.on_detection(fired, self._last_partial, timing)
+
+    def _now(self) -> float | None:
+        return self.audio_position if self._audio_clock else None
+
+    def _timing(self, fired: list[str], words: list[dict], emitted_at: float) -> DetectionTiming:
+        matched_at = time.perf_counter()
+        timing = DetectionTiming(list(fired), emitted_at=emitted_at, matched_at=matched_at, tracker=self.latency)
+
+        # Word-level timestamps (SetWords) place the name on the audio timeline
+        index = self.detector.fired_words.get(fired[0], -1)
+        if words and -len(words) <= index < len(words):
+            timing.word = words[index].get("word", "")
+            timing.word_audio_s = float(words[index].get("end", 0.0))
+        else:
+            timing.word_audio_s = self._fed_samples / self.model_rate
+
+        # Map that audio time back to when its block was captured
+        slot = bisect.bisect_left(self._fed_ends, timing.word_audio_s)
+        if slot >= len(self._fed_ends):
+            slot = len(self._fed_ends) - 1
+        timing.captured_at = self._fed_times[slot]
+        timing.spoken_at = timing.captured_at - max(self._fed_ends[slot] - timing.word_audio_s, 0.0)
+        return timing
+
+
+if __name__ == "__main__":
+    import argparse
+
+    class _PrintListener(EngineListener):
+        def on_status(self, text):
+            print(f"[status] {text}")
+
+        def on_final(self, text):
+            print(text)
+
+        def on_detection(self, target_names, pending_partial, timing=None):
+            if pending_partial:
+                print(pending_partial)
+            print(f"DETECTED: '{target_names}'")
+            if timing is not None:
+                timing.complete()
+
+        def on_info(self, text):
+            print(f"[info] {text}")
+
+        def on_error(self, exc):
+            print(f"ERROR: {exc}")
+
+    parser = argparse.ArgumentParser(description="Run the name detector without a UI.")
+    parser.add_argument("--names", default="william,harvin")
+    parser.add_argument("--aliases", default="", help="e.g. 'william=will|bill, harvin=harv'")
+    parser.add_argument("--fuzzy", action="store_true", help="also match one-letter, same-sounding variants of longer names")
+    parser.add_argument("--model", default=DEFAULT_MODEL_PATH)
+    parser.add_argument("--device", default=None)
+    parser.add_argument("--sample-rate", type=int, default=48000, help="device capture rate")
+    parser.add_argument("--block-size", type=int, default=4096)
+    parser.add_argument("--adaptive-block", action="store_true", help="resize blocks from the measured real-time factor")
+    parser.add_argument("--target-latency-ms", type=float, default=150.0)
+    parser.add_argument("--max-rtf", type=float, default=0.7)
+    parser.add_argument("--cooldown", type=float, default=10.0)
+    parser.add_argument("--mode", choices=[MODE_FULL, MODE_KEYWORDS], default=MODE_FULL)
+    parser.add_argument("--no-vad", action="store_true", help="feed silence to the recognizer too")
+    parser.add_argument("--buffer-seconds", type=float, default=2.0)
+    parser.add_argument("--overflow", choices=OVERFLOW_POLICIES, default=OVERFLOW_DROP_OLDEST)
+    parser.add_argument("--partial-interval-ms", type=float, default=0.0, help="minimum audio time between partial results (0: every block)")
+    parser.add_argument("--partial-min-audio-ms", type=float, default=0.0)
+    parser.add_argument("--no-partials", action="store_true", help="only decode final results")
+    parser.add_argument("--latency-json", default=None, help="write per-stage detection latency here on exit")
+    parser.add_argument("--archive", default=None, help="SQLite transcript archive to append finalized lines to")
+    args = parser.parse_args()
+
+    archive = None
+    if args.archive:
+        from transcript_archive import TranscriptArchive
+
+        archive = TranscriptArchive(args.archive)
+
+    engine = DetectionEngine(
+        EngineConfig(
+            target_names=parse_targets(args.names),
+            aliases=parse_aliases(args.aliases),
+            fuzzy_names=args.fuzzy,
+            model_path=args.model,
+            device_name=args.device,
+            sample_rate=args.sample_rate,
+            block_size=args.block_size,
+            adaptive_block=args.adaptive_block,
+            target_latency_ms=args.target_latency_ms,
+            max_rtf=args.max_rtf,
+            cooldown=args.cooldown,
+            recognizer_mode=args.mode,
+            vad=not args.no_vad,
+            partial_results=not args.no_partials,
+            partial_interval_ms=args.partial_interval_ms,
+            partial_min_audio_ms=args.partial_min_audio_ms,
+            buffer_seconds=args.buffer_seconds,
+            overflow=args.overflow,
+        ),
+        _PrintListener(),
+        archive=archive,
+    )
+    try:
+        engine.run()
+    except KeyboardInterrupt:
+        engine.stop()
+    finally:
+        if archive is not None:
+            archive.close()
+        if args.latency_json:
+            engine.latency.dump(args.latency_json)
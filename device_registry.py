@@ -0,0 +1,190 @@
+"""
+Process-wide cache of the audio output devices and their loopback microphones.
+
+Enumerating endpoints through soundcard takes tens to hundreds of milliseconds,
+so it is done once and shared by the device list and the engine; looking up a
+device afterwards is a dictionary read. A watcher thread re-enumerates in the
+background and notifies subscribers when devices come, go or the default
+changes. soundcard has no device-change callback, so the watcher polls, off
+the UI and audio threads.
+
+Public:
+- speaker_names(rescan_now: bool = False) -> list[str]
+- default_speaker_name() -> str
+- loopback_microphone(device_name: str | None)
+- rescan() -> bool
+- invalidate() -> None
+- subscribe(callback) -> None
+- unsubscribe(callback) -> None
+- start_watcher(interval: float = 3.0) -> None
+- stop_watcher() -> None
+- stats() -> dict
+- DeviceNotFoundError
+"""
+import threading
+import time
+from typing import Callable
+
+from engine_api import DEFAULT_DEVICE
+
+_lock = threading.Lock()
+_scan_lock = threading.Lock() # One enumeration at a time; callers that waited reuse its result
+_loopbacks: dict[str, object] | None = None # Speaker name -> loopback microphone, in soundcard's order
+_default_name = ""
+_generation = 0
+_subscribers: list[Callable[[], None]] = []
+_watcher: threading.Thread | None = None
+_watcher_stop = threading.Event()
+
+# Counters
+_scans = 0
+_scan_seconds = 0.0
+_last_scan_seconds = 0.0
+
+
+class DeviceNotFoundError(RuntimeError):
+    pass
+
+
+def _enumerate() -> tuple[dict[str, object], str]:
+    import soundcard as sc
+
+    loopbacks = {}
+    for mic in sc.all_microphones(include_loopback=True):
+        if getattr(mic, "isloopback", False):
+            loopbacks.setdefault(mic.name, mic)
+    try:
+        default_name = sc.default_speaker().name if loopbacks else ""
+    except Exception:
+        default_name = ""
+    return loopbacks, default_name
+
+
+def rescan() -> bool:
+    """Enumerate now. Returns True (and notifies subscribers) when the devices or the default changed."""
+    global _loopbacks, _default_name, _generation, _scans, _scan_seconds, _last_scan_seconds
+    with _lock:
+        seen = _generation
+    with _scan_lock:
+        with _lock:
+            if _generation != seen and _loopbacks is not None:
+                return False # Someone else rescanned while we waited
+        started = time.perf_counter()
+        loopbacks, default_name = _enumerate()
+        elapsed = time.perf_counter() - started
+        with _lock:
+            _scans += 1
+            _scan_seconds += elapsed
+            _last_scan_seconds = elapsed
+            changed = (
+                _loopbacks is None
+                or list(loopbacks) != list(_loopbacks)
+                or default_name != _default_name
+            )
+            _loopbacks, _default_name = loopbacks, default_name
+            _generation += 1
+            subscribers = list(_subscribers) if changed else []
+
+    for callback in subscribers:
+        try:
+            callback()
+        except Exception:
+            pass
+    return changed
+
+
+def invalidate() -> None:
+    """Forget the cached devices; the next lookup enumerates again"""
+    global _loopbacks
+    with _lock:
+        _loopbacks = None
+
+
+def _cached() -> tuple[dict[str, object], str]:
+    with _lock:
+        if _loopbacks is not None:
+            return _loopbacks, _default_name
+    rescan()
+    with _lock:
+        return _loopbacks or {}, _default_name
+
+
+def speaker_names(rescan_now: bool = False) -> list[str]:
+    if rescan_now:
+        rescan()
+    loopbacks, _ = _cached()
+    return list(loopbacks)
+
+
+def default_speaker_name() -> str:
+    return _cached()[1]
+
+
+def loopback_microphone(device_name: str | None = None):
+    """Loopback microphone for a speaker name; None or DEFAULT_DEVICE picks the default output"""
+    loopbacks, default_name = _cached()
+    name = device_name if device_name and device_name != DEFAULT_DEVICE else default_name
+    mic = loopbacks.get(name)
+    if mic is None:
+        # Plugged in since the last scan?
+        rescan()
+        loopbacks, default_name = _cached()
+        name = device_name if device_name and device_name != DEFAULT_DEVICE else default_name
+        mic = loopbacks.get(name)
+    if mic is None:
+        available = ", ".join(loopbacks)
+        raise DeviceNotFoundError(f"No speaker device matched '{name}'. Available: {available}")
+    return mic
+
+
+# Watcher ===
+
+def subscribe(callback: Callable[[], None]) -> None:
+    """callback() runs on the scanning thread whenever the device set or default changes"""
+    with _lock:
+        _subscribers.append(callback)
+
+
+def unsubscribe(callback: Callable[[], None]) -> None:
+    with _lock:
+        if callback in _subscribers:
+            _subscribers.remove(callback)
+
+
+def _watch(interval: float) -> None:
+    while not _watcher_stop.wait(interval):
+        try:
+            rescan()
+        except Exception:
+            pass # A device mid-reset can fail one scan; the next one catches up
+
+
+def start_watcher(interval: float = 3.0) -> None:
+    global _watcher
+    with _lock:
+        if _watcher is not None and _watcher.is_alive():
+            return
+        _watcher_stop.clear()
+        _watcher = threading.Thread(target=_watch, args=(interval,), name="device-watcher", daemon=True)
+        _watcher.start()
+
+
+def stop_watcher() -> None:
+    global _watcher
+    _watcher_stop.set()
+    with _lock:
+        watcher, _watcher = _watcher, None
+    # Wait out a scan in progress, so a start_watcher() right after cannot leave two watchers polling
+    if watcher is not None and watcher is not threading.current_thread():
+        watcher.join(timeout=5.0)
+
+
+def stats() -> dict:
+    with _lock:
+        return {
+            "devices": len(_loopbacks or {}),
+            "scans": _scans,
+            "scan_seconds": _scan_seconds,
+            "last_scan_ms": _last_scan_seconds * 1000.0,
+            "watching": _watcher is not None and _watcher.is_alive(),
+        }
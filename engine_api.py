@@ -0,0 +1,66 @@
+"""
+The parts of the detection engine a front end needs before it starts listening.
+
+Kept free of numpy, vosk and soundcard so the GUI can build its window without
+importing the audio stack; detection_engine re-exports the engine-side names.
+
+Public:
+- EngineListener
+- parse_targets(raw: str) -> list[str]
+- DEFAULT_DEVICE, DEFAULT_MODEL_PATH, DEFAULT_MODEL_RATE
+- MODE_FULL, MODE_KEYWORDS
+"""
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from latency import DetectionTiming
+
+DEFAULT_DEVICE = "(Default system output)"
+DEFAULT_MODEL_PATH = "./models/vosk-model-small-en-us-0.15"
+DEFAULT_MODEL_RATE = 16000
+
+MODE_FULL = "full"
+MODE_KEYWORDS = "keywords"
+
+
+def parse_targets(raw: str) -> list[str]:
+    """Split a comma/space separated list of names into lowercase targets"""
+    return raw.strip().lower().replace(",", " ").split()
+
+
+class EngineListener:
+    """
+    Receives engine events. Every method is called from the engine thread,
+    so GUI clients must marshal back to their own thread.
+    """
+
+    def on_status(self, text: str) -> None:
+        pass
+
+    def on_partial(self, text: str) -> None:
+        pass
+
+    def on_final(self, text: str) -> None:
+        pass
+
+    def on_info(self, text: str) -> None:
+        pass
+
+    def on_detection(self, target_names: list[str], pending_partial: str, timing: "DetectionTiming | None" = None) -> None:
+        """
+        target_names: the targets that fired (each at most once per utterance).
+        Call timing.complete() once the detection action has finished so the
+        end-to-end latency is recorded.
+        """
+        if timing is not None:
+            timing.complete()
+
+    def on_block_size(self, block_size: int, block_ms: float, rtf: float) -> None:
+        """Once per measurement window (about a second of audio): current block size and real-time factor"""
+        pass
+
+    def on_error(self, exc: Exception) -> None:
+        pass
+
+    def on_stopped(self) -> None:
+        pass
@@ -0,0 +1,122 @@
+"""
+End-to-end detection latency: from the moment a name is spoken to the moment
+the detection action (minimize/restore) has finished.
+
+Every detection carries a DetectionTiming with one perf_counter stamp per
+stage; a LatencyTracker folds completed timings into per-stage histograms.
+
+Public:
+- DetectionTiming
+- LatencyTracker
+- STAGES
+"""
+import json
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+
+# (name, from stamp, to stamp)
+STAGES: tuple[tuple[str, str, str], ...] = (
+    ("capture", "spoken_at", "captured_at"), # Word end -> its block handed over by the device
+    ("recognize", "captured_at", "emitted_at"), # Queueing + decoding until the recognizer reported it
+    ("match", "emitted_at", "matched_at"),
+    ("action", "matched_at", "action_done_at"), # UI thread pickup + minimize/restore
+    ("total", "spoken_at", "action_done_at"),
+)
+
+BUCKETS_MS: tuple[float, ...] = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, float("inf"))
+
+
+@dataclass
+class DetectionTiming:
+    names: list[str]
+    word: str = ""
+    word_audio_s: float = 0.0 # End of the word on the recognizer's audio timeline
+    spoken_at: float = 0.0
+    captured_at: float = 0.0
+    emitted_at: float = 0.0
+    matched_at: float = 0.0
+    action_done_at: float = 0.0
+    tracker: "LatencyTracker | None" = field(default=None, repr=False, compare=False)
+
+    def complete(self) -> None:
+        """Called by the action sink once the detection action has finished"""
+        self.action_done_at = time.perf_counter()
+        if self.tracker is not None:
+            self.tracker.add(self)
+
+    def stages_ms(self) -> dict[str, float]:
+        return {
+            name: (getattr(self, end) - getattr(self, start)) * 1000.0
+            for name, start, end in STAGES
+            if getattr(self, start) and getattr(self, end)
+        }
+
+
+class LatencyTracker:
+    def __init__(self, keep: int = 1000) -> None:
+        self._lock = threading.Lock()
+        self._recent: deque[DetectionTiming] = deque(maxlen=keep)
+        self._samples: dict[str, deque[float]] = {name: deque(maxlen=keep) for name, _, _ in STAGES}
+        self._counts: dict[str, list[int]] = {name: [0] * len(BUCKETS_MS) for name, _, _ in STAGES}
+        self.detections = 0
+
+    def add(self, timing: DetectionTiming) -> None:
+        stages = timing.stages_ms()
+        with self._lock:
+            self.detections += 1
+            self._recent.append(timing)
+            for name, value in stages.items():
+                self._samples[name].append(value)
+                for index, bound in enumerate(BUCKETS_MS):
+                    if value <= bound:
+                        self._counts[name][index] += 1
+                        break
+
+    def summary(self) -> dict[str, dict]:
+        import numpy as np # Only needed once there is something to report; keeps GUI startup light
+
+        with self._lock:
+            result = {}
+            for name, _, _ in STAGES:
+                values = np.fromiter(self._samples[name], dtype=float)
+                if len(values) == 0:
+                    continue
+                p50, p90, p99 = np.percentile(values, [50, 90, 99])
+                result[name] = {
+                    "count": len(values),
+                    "p50_ms": float(p50),
+                    "p90_ms": float(p90),
+                    "p99_ms": float(p99),
+                    "max_ms": float(values.max()),
+                    "histogram": {
+                        (f"<={bound:g}ms" if bound != float("inf") else f">{BUCKETS_MS[-2]:g}ms"): count
+                        for bound, count in zip(BUCKETS_MS, self._counts[name])
+                    },
+                }
+            return result
+
+    def to_dict(self) -> dict:
+        with self._lock:
+            recent = [
+                {"names": t.names, "word": t.word, "word_audio_s": t.word_audio_s, "stages_ms": t.stages_ms()}
+                for t in self._recent
+            ]
+        return {"detections": self.detections, "stages": self.summary(), "recent": recent}
+
+    def dump(self, path: str) -> None:
+        with open(path, "w", encoding="utf-8") as output:
+            json.dump(self.to_dict(), output, indent=2)
+
+    def describe(self) -> str:
+        """Human-readable table for the UI"""
+        summary = self.summary()
+        if not summary:
+            return "No detections measured yet."
+        lines = [f"{'Stage':<10}{'p50':>9}{'p90':>9}{'p99':>9}{'max':>9}   (ms, {self.detections} detections)"]
+        for name, stats in summary.items():
+            lines.append(
+                f"{name:<10}{stats['p50_ms']:>9.0f}{stats['p90_ms']:>9.0f}{stats['p99_ms']:>9.0f}{stats['max_ms']:>9.0f}"
+            )
+        return "\n".join(lines)
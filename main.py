@@ -1,10 +1,20 @@
 # Main program that cointains the settings
+import startup_timing # First, so the startup report is measured from launch
 import ctypes
+import threading
 import tkinter as tk
 from tkinter import messagebox, ttk
-import keyboard
-import whitelist as wl
-from name_detector import NameDetectorGUI
+
+# keyboard, numpy, soundcard and vosk are imported when their feature is first used
+with startup_timing.measure("import whitelist"):
+    import whitelist as wl
+with startup_timing.measure("import model_cache"):
+    import model_cache
+import process_handling
+import device_registry
+from engine_api import DEFAULT_MODEL_PATH
+with startup_timing.measure("import name_detector"):
+    from name_detector import NameDetectorGUI
 
 
 # Get a refference to user32.dll file
@@ -22,7 +32,19 @@ def minimize_all():
     if shell:
         user32.SendMessageW(shell, WM_COMMAND, MINIMIZE_ALL, 0)
 
+def deferred_init():
+    """Work that can wait until the window is on screen"""
+    # Load the default speech model in the background so the first "Start Listening" is instant
+    model_cache.preload(DEFAULT_MODEL_PATH)
+
+    # Track windows from WinEvent hooks so a snap never has to enumerate the desktop
+    threading.Thread(target=process_handling.startLiveIndex, name="live-index-start", daemon=True).start()
+
+    # Keep the audio device list current (hot-plug, Voicemeeter / Bluetooth reconfiguration)
+    device_registry.start_watcher()
+
 # UI ===
+startup_timing.mark("imports done")
 root = tk.Tk()
 root.title("CallSnap")
 root.geometry("750x600")
@@ -69,6 +91,7 @@ def open_detector_settings():
         detector_app.open_settings_window()
 
 def apply_keybinds():
+    keyboard = startup_timing.import_module("keyboard")
     for action_name, action in keybind_actions.items():
         entry = keybind_vars[action_name]
         sequence = entry.get().strip()
@@ -238,4 +261,6 @@ keybind_button = ttk.Button(
 )
 keybind_button.pack(side="left", padx=(8, 0))
 
+startup_timing.mark("window built")
+startup_timing.after_first_paint(root, deferred_init)
 root.mainloop()
@@ -0,0 +1,186 @@
+"""
+Process-wide cache of loaded Vosk models.
+
+Loading a model takes seconds on the larger models, so models are loaded once
+per resolved path and shared by every recognizer built afterwards.
+
+Public:
+- get_model(model_path: str)
+- preload(model_path: str) -> threading.Thread
+- is_cached(model_path: str) -> bool
+- evict(model_path: str) -> bool
+- clear() -> None
+- set_max_models(count: int) -> None
+- stats() -> list[ModelStats]
+- stats_for(model_path: str) -> ModelStats | None
+- peak_rss() -> int
+"""
+import ctypes
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+
+_MAX_MODELS: int = 2
+
+_lock = threading.Lock()
+_models: "OrderedDict[str, object]" = OrderedDict()
+_stats: dict[str, "ModelStats"] = {}
+_loading: dict[str, threading.Event] = {}
+
+
+@dataclass
+class ModelStats:
+    path: str
+    load_seconds: float
+    rss_bytes: int
+    hits: int = 0
+
+    def describe(self) -> str:
+        return (
+            f"Model {os.path.basename(self.path)}: loaded in {self.load_seconds:.2f} s, "
+            f"~{self.rss_bytes / (1024 * 1024):.0f} MB resident, {self.hits} reuse(s)"
+        )
+
+
+def _resolve(model_path: str) -> str:
+    return os.path.normcase(os.path.realpath(os.path.abspath(model_path)))
+
+
+def _current_rss(peak: bool = False) -> int:
+    """Resident set size of this process in bytes, or its high-water mark (0 when unknown)"""
+    if sys.platform == "win32":
+        class _Counters(ctypes.Structure):
+            _fields_ = [
+                ("cb", ctypes.c_ulong),
+                ("PageFaultCount", ctypes.c_ulong),
+                ("PeakWorkingSetSize", ctypes.c_size_t),
+                ("WorkingSetSize", ctypes.c_size_t),
+                ("QuotaPeakPagedPoolUsage", ctypes.c_size_t),
+                ("QuotaPagedPoolUsage", ctypes.c_size_t),
+                ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t),
+                ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+                ("PagefileUsage", ctypes.c_size_t),
+                ("PeakPagefileUsage", ctypes.c_size_t),
+            ]
+
+        counters = _Counters()
+        counters.cb = ctypes.sizeof(_Counters)
+        handle = ctypes.windll.kernel32.GetCurrentProcess()
+        if ctypes.windll.psapi.GetProcessMemoryInfo(handle, ctypes.byref(counters), counters.cb):
+            return counters.PeakWorkingSetSize if peak else counters.WorkingSetSize
+        return 0
+
+    try:
+        if peak:
+            with open("/proc/self/status") as status:
+                for line in status:
+                    if line.startswith("VmHWM:"):
+                        return int(line.split()[1]) * 1024
+            return 0
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return 0
+
+
+def _load(key: str):
+    from vosk import Model
+
+    rss_before = _current_rss()
+    started = time.perf_counter()
+    model = Model(key)
+    elapsed = time.perf_counter() - started
+    return model, ModelStats(key, elapsed, max(_current_rss() - rss_before, 0))
+
+
+def peak_rss() -> int:
+    """Highest resident set size this process has reached, in bytes (0 when unknown)"""
+    # The kernel updates the high-water mark lazily; it can trail the current value
+    return max(_current_rss(peak=True), _current_rss())
+
+
+def _evict_over_limit() -> None:
+    # Caller holds _lock
+    while len(_models) > _MAX_MODELS:
+        old_key, _ = _models.popitem(last=False)
+        _stats.pop(old_key, None)
+
+
+def get_model(model_path: str):
+    """Return the cached model for this path, loading it once if needed"""
+    key = _resolve(model_path)
+    while True:
+        with _lock:
+            if key in _models:
+                _models.move_to_end(key)
+                _stats[key].hits += 1
+                return _models[key]
+            pending = _loading.get(key)
+            if pending is None:
+                pending = _loading[key] = threading.Event()
+                break
+        # Another thread (usually the preloader) is loading it; wait instead of loading twice
+        pending.wait()
+
+    try:
+        model, model_stats = _load(key)
+        with _lock:
+            _models[key] = model
+            _stats[key] = model_stats
+            _evict_over_limit()
+        return model
+    finally:
+        with _lock:
+            _loading.pop(key, None)
+        pending.set()
+
+
+def preload(model_path: str) -> threading.Thread:
+    """Warm the cache on a daemon thread. Errors are left for get_model to report later."""
+    def worker():
+        try:
+            get_model(model_path)
+        except Exception:
+            pass
+
+    thread = threading.Thread(target=worker, name="model-preload", daemon=True)
+    thread.start()
+    return thread
+
+
+def is_cached(model_path: str) -> bool:
+    with _lock:
+        return _resolve(model_path) in _models
+
+
+def evict(model_path: str) -> bool:
+    with _lock:
+        key = _resolve(model_path)
+        _stats.pop(key, None)
+        return _models.pop(key, None) is not None
+
+
+def clear() -> None:
+    with _lock:
+        _models.clear()
+        _stats.clear()
+
+
+def set_max_models(count: int) -> None:
+    global _MAX_MODELS
+    with _lock:
+        _MAX_MODELS = max(1, count)
+        _evict_over_limit()
+
+
+def stats() -> list[ModelStats]:
+    with _lock:
+        return list(_stats.values())
+
+
+def stats_for(model_path: str) -> ModelStats | None:
+    with _lock:
+        return _stats.get(_resolve(model_path))
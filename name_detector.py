@@ -1,15 +1,22 @@
 import tkinter as tk
 from tkinter import ttk, scrolledtext, messagebox, filedialog
 from whitelist import minmaxPrograms
+from transcript_store import TranscriptStore
+from transcript_archive import TranscriptArchive, parse_date
+from latency import LatencyTracker
 import threading
-import queue
-import json
-import time
 import warnings
 import os
-import numpy as np
-import soundcard as sc
-from vosk import KaldiRecognizer, Model
+import sqlite3
+import time
+from typing import TYPE_CHECKING
+import device_registry
+from name_matcher import parse_aliases
+# numpy, vosk and soundcard load with detection_engine, on first Start Listening
+from engine_api import DEFAULT_DEVICE, DEFAULT_MODEL_PATH, MODE_FULL, MODE_KEYWORDS, EngineListener, parse_targets
+
+if TYPE_CHECKING:
+    from detection_engine import EngineConfig
 
 # Suppress soundcard discontinuity warning
 warnings.filterwarnings("ignore", message="data discontinuity in recording")
@@ -24,6 +31,113 @@ SECONDARY_HOVER = "#86b28c"
 UTILITY_BG = "#e6e2dc"
 UTILITY_HOVER = "#d7d1ca"
 
+LOG_WIDGET_LINES = 500
+
+RECOGNIZER_MODES = {
+    "Full transcript": MODE_FULL,
+    "Keywords only (faster)": MODE_KEYWORDS,
+}
+
+
+class RenderScheduler:
+    """
+    Collects UI updates from worker threads and applies them once per frame on the Tk thread.
+
+    Partial text collapses to the newest value and is only redrawn when it differs
+    from what is on screen; log lines queued during a frame go in with one insert.
+    Nothing here calls root.update(), so the Tk event loop is never re-entered.
+    """
+
+    def __init__(self, gui: "NameDetectorGUI", interval_ms: int = 50) -> None:
+        self.gui = gui
+        self.interval_ms = interval_ms
+        self._lock = threading.Lock()
+        self._partial: str | None = None # Newest pending partial text; None when nothing new
+        self._lines: list[str] = []
+        self._calls: list[tuple] = []
+        self.gui.root.after(self.interval_ms, self._frame)
+
+    def set_partial(self, text: str) -> None:
+        with self._lock:
+            self._partial = text
+
+    def add_log(self, message: str) -> None:
+        with self._lock:
+            self._lines.append(message)
+
+    def call(self, func, *args, **kwargs) -> None:
+        with self._lock:
+            self._calls.append((func, args, kwargs))
+
+    def _frame(self) -> None:
+        with self._lock:
+            partial, self._partial = self._partial, None
+            lines, self._lines = self._lines, []
+            calls, self._calls = self._calls, []
+
+        try:
+            if partial is not None:
+                self.gui.update_partial(partial)
+            if lines:
+                self.gui.log_lines(lines)
+            # Calls run last so popups see the log lines queued before them
+            for func, args, kwargs in calls:
+                func(*args, **kwargs)
+        finally:
+            self.gui.root.after(self.interval_ms, self._frame)
+
+
+class _GUIListener(EngineListener):
+    """Forwards engine events onto the Tk thread through the render scheduler"""
+
+    def __init__(self, gui: "NameDetectorGUI") -> None:
+        self.gui = gui
+        self.render = gui.render
+
+    def on_status(self, text):
+        self.render.set_partial(text)
+
+    def on_partial(self, text):
+        self.render.set_partial(text)  # Update partial label
+
+    def on_final(self, text):
+        self.render.set_partial("")  # Clear partial
+        self.render.add_log(f"{text}")
+
+    def on_info(self, text):
+        self.render.add_log(text)
+
+    def on_detection(self, target_names, pending_partial, timing=None):
+        gui = self.gui
+        if pending_partial:
+            self.render.add_log(pending_partial)
+            self.render.set_partial("")
+        self.render.add_log(f"DETECTED: '{target_names}'")
+
+        def snapped(result):
+            # Runs on the window worker once every window has been handled
+            if timing is not None:
+                timing.complete()
+            self.render.add_log(result.describe())
+
+        # The snap runs on its own worker: straight from here, without waiting for a UI frame
+        gui.minmaxPrograms(snapped)
+        self.render.call(gui.show_detection_popup, target_names)
+
+    def on_block_size(self, block_size, block_ms, rtf):
+        self.render.call(self.gui.block_status.set, f"Block {block_size} ({block_ms:.0f} ms) · RTF {rtf:.2f}")
+
+    def on_error(self, exc):
+        self.render.add_log(f"ERROR: {str(exc)}")
+        self.render.call(messagebox.showerror, "Error", str(exc))
+
+    def on_stopped(self):
+        gui = self.gui
+        gui.listening = False
+        self.render.call(gui.start_button.config, state="normal")
+        self.render.call(gui.stop_button.config, state="disabled")
+        self.render.add_log("\nListening stopped.")
+
 
 class NameDetectorGUI:
     def __init__(self, root, configure_window=True, show_settings=True):
@@ -48,6 +162,7 @@ class NameDetectorGUI:
         # Style ===
         style.configure("TFrame", background=BG)
         style.configure("TLabel", background=BG, foreground=TEXT_PRIMARY, font=("Georgia", 11))
+        style.configure("TCheckbutton", background=BG, foreground=TEXT_PRIMARY, font=("Georgia", 10))
         style.configure("TEntry", fieldbackground="white", foreground=TEXT_PRIMARY)
         style.configure("TCombobox", fieldbackground="white", foreground=TEXT_PRIMARY)
         style.configure("Section.TLabelframe", background=BG)
@@ -85,18 +200,37 @@ class NameDetectorGUI:
         # Variables ===
         self.minmaxPrograms = minmaxPrograms
         self.listening = False
-        self.recognizer = None
+        self.engine = None
         self.listener_thread = None
-        self.ui_queue = queue.Queue()
         self.settings_window = None
         self.device_combo = None
+        self._shown_partial = None
+        self.transcript = TranscriptStore()
+        self._archive = None
+        self.search_window = None
+        self.latency = LatencyTracker()
+        self.latency_window = None
+
+        self._devices_loading = False
+        self.render = RenderScheduler(self)
+        device_registry.subscribe(self._devices_changed)
+        self.root.bind("<Destroy>", self._on_destroy, add="+")
 
         self.target_name = tk.StringVar(value="william,harvin")
-        self.model_path = tk.StringVar(value="./models/vosk-model-small-en-us-0.15")
+        self.aliases = tk.StringVar(value="")
+        self.fuzzy_names = tk.BooleanVar(value=False)
+        self.partial_results = tk.BooleanVar(value=True)
+        self.partial_interval = tk.DoubleVar(value=0.0)
+        self.model_path = tk.StringVar(value=DEFAULT_MODEL_PATH)
         self.device_name = tk.StringVar(value="")
-        self.sample_rate = tk.IntVar(value=16000)
+        self.sample_rate = tk.IntVar(value=48000)
         self.block_size = tk.IntVar(value=4096)
+        self.adaptive_block = tk.BooleanVar(value=False)
+        self.target_latency = tk.DoubleVar(value=150.0)
+        self.block_status = tk.StringVar(value="")
         self.cooldown = tk.DoubleVar(value=10.0)
+        self.recognizer_mode = tk.StringVar(value="Full transcript")
+        self.skip_silence = tk.BooleanVar(value=True)
 
         if show_settings:
             self.build_settings_frame(root)
@@ -122,6 +256,31 @@ class NameDetectorGUI:
         )
         self.stop_button.pack(side="left")
 
+        self.search_button = ttk.Button(
+            self.button_frame,
+            text="Search Transcripts",
+            command=self.open_search_window,
+            style="Utility.TButton",
+        )
+        self.search_button.pack(side="left", padx=(8, 0))
+
+        self.latency_button = ttk.Button(
+            self.button_frame,
+            text="Latency",
+            command=self.open_latency_window,
+            style="Utility.TButton",
+        )
+        self.latency_button.pack(side="left", padx=(8, 0))
+
+        # Live block size / real-time factor from the engine
+        block_status_label = ttk.Label(
+            self.button_frame,
+            textvariable=self.block_status,
+            foreground=TEXT_SECONDARY,
+            font=("Segoe UI", 9),
+        )
+        block_status_label.pack(side="right")
+
         # Main content frame (left + right)
         content_frame = ttk.Frame(root)
         content_frame.pack(fill="both", expand=True, padx=24, pady=(0, 20))
@@ -158,21 +317,33 @@ class NameDetectorGUI:
         )
         self.output_text.pack(fill="both", expand=True)
 
-        self.root.after(20, self.process_ui_queue)
+    @property
+    def archive(self) -> TranscriptArchive:
+        """Opened on first use: creating the schema touches the disk"""
+        if self._archive is None:
+            self._archive = TranscriptArchive(on_error=self._archive_failed)
+        return self._archive
 
-    def process_ui_queue(self):
-        """Apply UI updates from the worker thread."""
-        try:
-            while True:
-                func, args, kwargs = self.ui_queue.get_nowait()
-                func(*args, **kwargs)
-        except queue.Empty:
-            pass
-        self.root.after(20, self.process_ui_queue)
+    def _archive_failed(self, message):
+        """Runs on the archive's writer thread"""
+        self.render.add_log(f"ERROR: {message}")
+
+    def _on_destroy(self, event):
+        # Child widgets' <Destroy> events reach this binding too
+        if event.widget is not self.root:
+            return
+        self.listening = False
+        if self.engine:
+            self.engine.stop()
+            if self.listener_thread is not None:
+                self.listener_thread.join(timeout=2.0) # Its last final result still goes to the archive
+        device_registry.unsubscribe(self._devices_changed)
+        if self._archive is not None:
+            self._archive.close() # Commits the lines still queued
 
     def ui_call(self, func, *args, **kwargs):
         """Schedule a UI update safely from any thread."""
-        self.ui_queue.put((func, args, kwargs))
+        self.render.call(func, *args, **kwargs)
 
     def build_settings_frame(self, parent, include_save_button=False):
         settings_frame = ttk.LabelFrame(parent, text="Settings", padding=12, style="Section.TLabelframe")
@@ -223,7 +394,7 @@ class NameDetectorGUI:
         zoom_help_btn.grid(row=2, column=3, sticky="w", padx=(6, 0))
 
         # Sample Rate
-        sample_rate_label = ttk.Label(settings_frame, text="Sample Rate:")
+        sample_rate_label = ttk.Label(settings_frame, text="Device Sample Rate:")
         sample_rate_label.grid(row=3, column=0, sticky="w", pady=5)
         sample_rate_entry = ttk.Entry(settings_frame, textvariable=self.sample_rate, width=40)
         sample_rate_entry.grid(row=3, column=1, sticky="ew", padx=8)
@@ -233,6 +404,12 @@ class NameDetectorGUI:
         block_size_label.grid(row=4, column=0, sticky="w", pady=5)
         block_size_entry = ttk.Entry(settings_frame, textvariable=self.block_size, width=40)
         block_size_entry.grid(row=4, column=1, sticky="ew", padx=8)
+        adaptive_block_check = ttk.Checkbutton(
+            settings_frame,
+            text="Adapt to CPU",
+            variable=self.adaptive_block,
+        )
+        adaptive_block_check.grid(row=4, column=2, columnspan=2, sticky="w")
 
         # Cooldown
         cooldown_label = ttk.Label(settings_frame, text="Cooldown (seconds):")
@@ -240,8 +417,64 @@ class NameDetectorGUI:
         cooldown_entry = ttk.Entry(settings_frame, textvariable=self.cooldown, width=40)
         cooldown_entry.grid(row=5, column=1, sticky="ew", padx=8)
 
+        # Recognizer Mode
+        recognizer_mode_label = ttk.Label(settings_frame, text="Recognizer Mode:")
+        recognizer_mode_label.grid(row=6, column=0, sticky="w", pady=5)
+        recognizer_mode_combo = ttk.Combobox(
+            settings_frame,
+            textvariable=self.recognizer_mode,
+            values=list(RECOGNIZER_MODES),
+            width=40,
+            state="readonly",
+        )
+        recognizer_mode_combo.grid(row=6, column=1, sticky="ew", padx=8)
+
+        # Voice Activity Gate
+        skip_silence_check = ttk.Checkbutton(
+            settings_frame,
+            text="Skip silence (lower CPU while nobody is talking)",
+            variable=self.skip_silence,
+        )
+        skip_silence_check.grid(row=7, column=1, sticky="w", padx=8, pady=5)
+
+        # Aliases
+        aliases_label = ttk.Label(settings_frame, text="Aliases:")
+        aliases_label.grid(row=8, column=0, sticky="w", pady=5)
+        aliases_entry = ttk.Entry(settings_frame, textvariable=self.aliases, width=40)
+        aliases_entry.grid(row=8, column=1, sticky="ew", padx=8)
+        aliases_hint = ttk.Label(settings_frame, text="e.g. william=will|bill", foreground=TEXT_SECONDARY)
+        aliases_hint.grid(row=8, column=2, columnspan=2, sticky="w")
+
+        # Fuzzy Matching
+        fuzzy_names_check = ttk.Checkbutton(
+            settings_frame,
+            text="Also catch near misses (harven for harvin; may cause false hits)",
+            variable=self.fuzzy_names,
+        )
+        fuzzy_names_check.grid(row=9, column=1, sticky="w", padx=8, pady=5)
+
+        # Partial Results
+        partial_interval_label = ttk.Label(settings_frame, text="Partial Interval (ms):")
+        partial_interval_label.grid(row=10, column=0, sticky="w", pady=5)
+        partial_interval_entry = ttk.Entry(settings_frame, textvariable=self.partial_interval, width=40)
+        partial_interval_entry.grid(row=10, column=1, sticky="ew", padx=8)
+        partial_results_check = ttk.Checkbutton(
+            settings_frame,
+            text="Show live partial results (off: react at end of sentence only)",
+            variable=self.partial_results,
+        )
+        partial_results_check.grid(row=11, column=1, sticky="w", padx=8, pady=5)
+
+        # Target Latency (adaptive block size)
+        target_latency_label = ttk.Label(settings_frame, text="Target Latency (ms):")
+        target_latency_label.grid(row=12, column=0, sticky="w", pady=5)
+        target_latency_entry = ttk.Entry(settings_frame, textvariable=self.target_latency, width=40)
+        target_latency_entry.grid(row=12, column=1, sticky="ew", padx=8)
+        target_latency_hint = ttk.Label(settings_frame, text="with Adapt to CPU", foreground=TEXT_SECONDARY)
+        target_latency_hint.grid(row=12, column=2, columnspan=2, sticky="w")
+
         settings_frame.columnconfigure(1, weight=1)
-        self.refresh_devices()
+        self.refresh_devices(rescan=False)
 
         if include_save_button:
             save_frame = ttk.Frame(parent)
@@ -265,11 +498,131 @@ class NameDetectorGUI:
         self.settings_window = tk.Toplevel(self.toplevel)
         self.settings_window.title("zoomSnap - Detector Settings")
         self.settings_window.configure(bg=BG)
-        self.settings_window.geometry("640x360")
+        self.settings_window.geometry("640x600")
         self.build_settings_frame(self.settings_window, include_save_button=True)
         self.settings_window.transient(self.toplevel)
         self.settings_window.grab_set()
 
+    def open_search_window(self):
+        if self.search_window and self.search_window.winfo_exists():
+            self.search_window.lift()
+            self.search_window.focus_force()
+            return
+
+        self.search_window = tk.Toplevel(self.toplevel)
+        self.search_window.title("zoomSnap - Search Transcripts")
+        self.search_window.configure(bg=BG)
+        self.search_window.geometry("760x440")
+
+        form = ttk.Frame(self.search_window, padding=12)
+        form.pack(fill="x")
+
+        self.search_query = tk.StringVar(value="")
+        self.search_since = tk.StringVar(value="")
+        self.search_until = tk.StringVar(value="")
+        self.search_detected_only = tk.BooleanVar(value=False)
+
+        query_label = ttk.Label(form, text="Words:")
+        query_label.grid(row=0, column=0, sticky="w", pady=4)
+        query_entry = ttk.Entry(form, textvariable=self.search_query, width=40)
+        query_entry.grid(row=0, column=1, columnspan=3, sticky="ew", padx=8)
+        query_entry.bind("<Return>", lambda _event: self.run_search())
+
+        since_label = ttk.Label(form, text="From (YYYY-MM-DD):")
+        since_label.grid(row=1, column=0, sticky="w", pady=4)
+        since_entry = ttk.Entry(form, textvariable=self.search_since, width=16)
+        since_entry.grid(row=1, column=1, sticky="w", padx=8)
+
+        until_label = ttk.Label(form, text="To:")
+        until_label.grid(row=1, column=2, sticky="w", pady=4)
+        until_entry = ttk.Entry(form, textvariable=self.search_until, width=16)
+        until_entry.grid(row=1, column=3, sticky="w", padx=8)
+
+        detected_check = ttk.Checkbutton(form, text="Only lines where my name was detected", variable=self.search_detected_only)
+        detected_check.grid(row=2, column=1, columnspan=3, sticky="w", padx=8, pady=4)
+
+        search_btn = ttk.Button(form, text="Search", command=self.run_search, style="Primary.TButton")
+        search_btn.grid(row=0, column=4, sticky="e")
+        form.columnconfigure(3, weight=1)
+
+        results_frame = ttk.Frame(self.search_window, padding=(12, 0, 12, 12))
+        results_frame.pack(fill="both", expand=True)
+        self.search_results = ttk.Treeview(results_frame, columns=("time", "device", "text"), show="headings")
+        self.search_results.heading("time", text="Time")
+        self.search_results.heading("device", text="Device")
+        self.search_results.heading("text", text="Text")
+        self.search_results.column("time", width=140, stretch=False)
+        self.search_results.column("device", width=140, stretch=False)
+        self.search_results.column("text", width=420)
+        self.search_results.pack(side="left", fill="both", expand=True)
+        results_scroll = ttk.Scrollbar(results_frame, orient="vertical", command=self.search_results.yview)
+        results_scroll.pack(side="right", fill="y")
+        self.search_results.configure(yscrollcommand=results_scroll.set)
+
+        self.search_status = ttk.Label(self.search_window, text="")
+        self.search_status.pack(anchor="w", padx=12, pady=(0, 8))
+
+    def open_latency_window(self):
+        if self.latency_window and self.latency_window.winfo_exists():
+            self.latency_window.lift()
+            self.refresh_latency()
+            return
+
+        self.latency_window = tk.Toplevel(self.toplevel)
+        self.latency_window.title("zoomSnap - Detection Latency")
+        self.latency_window.configure(bg=BG)
+        self.latency_window.geometry("560x260")
+
+        self.latency_text = tk.Text(self.latency_window, height=8, font=("Consolas", 10), state="disabled")
+        self.latency_text.pack(fill="both", expand=True, padx=12, pady=(12, 8))
+
+        buttons = ttk.Frame(self.latency_window, padding=(12, 0, 12, 12))
+        buttons.pack(fill="x")
+        refresh_btn = ttk.Button(buttons, text="Refresh", command=self.refresh_latency, style="Primary.TButton")
+        refresh_btn.pack(side="left")
+        save_btn = ttk.Button(buttons, text="Save JSON...", command=self.save_latency, style="Secondary.TButton")
+        save_btn.pack(side="left", padx=(8, 0))
+
+        self.refresh_latency()
+
+    def refresh_latency(self):
+        """Show p50/p90/p99 per stage, from spoken word to finished minimize/restore"""
+        self.latency_text.config(state="normal")
+        self.latency_text.delete("1.0", "end")
+        self.latency_text.insert("end", self.latency.describe())
+        self.latency_text.config(state="disabled")
+
+    def save_latency(self):
+        filename = filedialog.asksaveasfilename(
+            title="Save latency report",
+            defaultextension=".json",
+            filetypes=[("JSON", "*.json"), ("All files", "*.*")],
+        )
+        if filename:
+            self.latency.dump(filename)
+
+    def run_search(self):
+        """Query the transcript archive and show the newest matches"""
+        try:
+            since = parse_date(self.search_since.get()) if self.search_since.get().strip() else None
+            until = parse_date(self.search_until.get()) if self.search_until.get().strip() else None
+            if until is not None and len(self.search_until.get().strip()) == 10:
+                until += 24 * 60 * 60 # A bare date includes the whole day
+            self.archive.flush(timeout=1.0)
+            started = time.perf_counter()
+            rows = self.archive.search(self.search_query.get(), since, until, self.search_detected_only.get())
+            elapsed = time.perf_counter() - started
+        except (ValueError, sqlite3.Error) as e:
+            messagebox.showerror("Search", str(e), parent=self.search_window)
+            return
+
+        self.search_results.delete(*self.search_results.get_children())
+        for row in rows:
+            stamp = time.strftime("%Y-%m-%d %H:%M", time.localtime(row["ts"]))
+            text = ("DETECTED: " if row["detected"] else "") + row["text"]
+            self.search_results.insert("", "end", values=(stamp, row["device"], text))
+        self.search_status.config(text=f"{len(rows)} result(s) in {elapsed * 1000:.0f} ms")
+
     def save_settings_and_close(self):
         if self.settings_window and self.settings_window.winfo_exists():
             self.settings_window.destroy()
@@ -277,20 +630,26 @@ class NameDetectorGUI:
 
     def log(self, message):
         """Log a message to the output text area"""
+        self.log_lines([message])
+
+    def log_lines(self, messages):
+        """Log several messages with a single insert, keeping only the newest lines in the widget"""
+        self.transcript.extend(messages)
+
         self.output_text.config(state="normal") # Enable the textbox
 
-        self.output_text.insert("end", message + "\n") # add to the "end" the (message + "\n")
+        self.output_text.insert("end", "\n".join(messages) + "\n") # add to the "end" the messages
+        # Older lines live in the transcript store (and its spill file), not in Tk
+        line_count = int(self.output_text.index("end-1c").split(".")[0])
+        if line_count > LOG_WIDGET_LINES:
+            self.output_text.delete("1.0", f"{line_count - LOG_WIDGET_LINES + 1}.0")
         self.output_text.see("end") # scroll down to the "end" so we can see the end
 
         self.output_text.config(state="disabled") # Redisable the textbox 
-        self.root.update()
 
     def get_last_log_snippet(self, max_chars=500):
         """Return the last N characters from the log"""
-        try:
-            return self.output_text.get(f"end-1c - {max_chars} chars", "end-1c")
-        except tk.TclError:
-            return self.output_text.get("1.0", "end-1c")
+        return self.transcript.snippet(max_chars)
 
     def show_detection_popup(self, target_name, extra=""):
         """Show a popup with a log snippet when a name is detected"""
@@ -322,47 +681,53 @@ class NameDetectorGUI:
 
     def update_partial(self, text):
         """Update the partial transcription text widget"""
+        text = text if text else "(listening...)"
+        if text == self._shown_partial:
+            return # Nothing changed; skip the redraw
+        self._shown_partial = text
 
         self.partial_text.config(state="normal") # Enable the text box
         
         self.partial_text.delete("1.0", "end") # Clear out from the beggining to the end
-        self.partial_text.insert("1.0", text if text else "(listening...)") # Insert from the beggining the text else just listening
+        self.partial_text.insert("1.0", text) # Insert from the beggining the text else just listening
             
         self.partial_text.config(state="disabled") # Redisable the textbox
-        self.root.update()
 
-    def refresh_devices(self):
-        """Refresh the list of audio devices"""
-        if not self.device_combo:
+    def refresh_devices(self, rescan=True):
+        """
+        Refresh the list of audio devices. The lookup runs on a worker thread
+        (the registry is usually cached); the list fills in when it is done.
+        """
+        if not self.device_combo or self._devices_loading:
             return
-        speakers = sc.all_speakers()
-        names = [s.name for s in speakers]
-        default_name = sc.default_speaker().name if speakers else ""
-        display_names = ["(Default system output)"] + names
-        self.device_combo["values"] = display_names
+        self._devices_loading = True
         if not self.device_name.get():
-            self.device_name.set("(Default system output)")
-        elif self.device_name.get() not in display_names and default_name:
-            self.device_name.set("(Default system output)")
-
-    def find_loopback_microphone(self, device_name):
-        """Find loopback microphone"""
-        speakers = sc.all_speakers()
+            self.device_name.set(DEFAULT_DEVICE)
+        threading.Thread(target=self._enumerate_devices, args=(rescan,), daemon=True).start()
 
-        if device_name and device_name != "(Default system output)":
-            for spk in speakers:
-                if spk.name == device_name:
-                    # Turns that speaker into a loopback microphone and returns it
-                    return sc.get_microphone(spk.name, include_loopback=True)
+    def _enumerate_devices(self, rescan):
+        try:
+            names = device_registry.speaker_names(rescan_now=rescan)
+            default_name = device_registry.default_speaker_name()
+        except Exception as e:
+            names, default_name = [], ""
+            self.render.add_log(f"Could not list audio devices: {e}")
+        self.ui_call(self._apply_devices, names, default_name)
 
-            available = ", ".join(s.name for s in speakers)
-            raise RuntimeError(
-                f"No speaker device matched '{device_name}'. Available: {available}"
-            )
+    def _devices_changed(self):
+        # Registry watcher thread: a device was plugged in or removed
+        self.ui_call(self.refresh_devices, False)
 
-        # Use the default speakers if none
-        default_speaker = sc.default_speaker()
-        return sc.get_microphone(default_speaker.name, include_loopback=True)
+    def _apply_devices(self, names, default_name):
+        self._devices_loading = False
+        if not self.device_combo or not self.device_combo.winfo_exists():
+            return
+        display_names = [DEFAULT_DEVICE] + names
+        self.device_combo["values"] = display_names
+        if not self.device_name.get():
+            self.device_name.set(DEFAULT_DEVICE)
+        elif self.device_name.get() not in display_names and default_name:
+            self.device_name.set(DEFAULT_DEVICE)
 
     def show_zoom_help(self):
         message = (
@@ -374,105 +739,26 @@ class NameDetectorGUI:
         )
         messagebox.showinfo("Zoom-only Audio", message)
 
-    def name_in_text(self, target: list[str], text: str) -> bool:
-        """Check if target name is in text"""
-        text = text.strip().lower()
-
-        if not target or not text:
-            return False
-        
-        for name in target:
-            if name in text:
-                return True
-
-        return False
-
-    def listen(self):
-        """Listening thread"""
-        try:
-            target_name = self.target_name.get().strip().lower().replace(","," ").split()
-            print(target_name)
-            model_path = self.model_path.get()
-            device_name = self.device_name.get() or None
-            sample_rate = self.sample_rate.get()
-            block_size = self.block_size.get()
-            cooldown = self.cooldown.get()
-            last_partial = ""
-
-            self.ui_call(self.update_partial, f"Loading model from: {model_path}")
-            model = Model(model_path)
-            self.recognizer = KaldiRecognizer(model, sample_rate)
-            last_hit = 0.0
-
-            while self.listening:
-                try:
-                    self.ui_call(self.update_partial, "Finding microphone...")
-                    mic = self.find_loopback_microphone(device_name)
-
-                    self.ui_call(
-                        self.update_partial,
-                        f"Device: {mic.name} \nTarget: {target_name} \nListening",
-                    )
-
-                    with mic.recorder(
-                        samplerate=sample_rate,
-                        channels=1,
-                        blocksize=block_size,
-                    ) as recorder:
-                        while self.listening:
-                            data = recorder.record(block_size) # Data is audio described in float -1.0 to 1.0
-                            data16 = (data * 32767).astype(np.int16) # Amplify the audio because Vosk only accepts 16 bit integers (-32767 to 32767)
-
-                            # Feed the audio into the recognizer
-                            # Will return True if speech has ended (Final result) and False if not (Partial)
-                            if self.recognizer.AcceptWaveform(data16.tobytes()): 
-                                result = json.loads(self.recognizer.Result())
-                                text = result.get("text", "")
-                                if text:
-                                    self.ui_call(self.update_partial, "")  # Clear partial
-                                    self.ui_call(self.log, f"{text}")
-                                last_partial = ""
-                            else:
-                                partial = json.loads(self.recognizer.PartialResult())
-                                text = partial.get("partial", "")
-                                self.ui_call(self.update_partial, text)  # Update partial label
-                                last_partial = text
-
-                            if self.name_in_text(target_name, text):
-                                now = time.time()
-                                if now - last_hit >= cooldown:
-                                    last_hit = now
-                                    if last_partial:
-                                        self.ui_call(self.log, last_partial)
-                                        self.ui_call(self.update_partial, "")
-                                        last_partial = ""
-                                    self.ui_call(self.log, f"DETECTED: '{target_name}'")
-                                    self.ui_call(self.minmaxPrograms)
-                                    self.ui_call(self.show_detection_popup, target_name)
-                                    
-                except Exception as e:
-                    message = str(e).lower()
-                    if "0x8889000a" in message or "audclnt_e_device_invalidated" in message:
-                        self.ui_call(
-                            self.update_partial,
-                            "Audio device changed or was reset.\nRecconecting...\nPlease choose another audio device!",
-                        )
-                        time.sleep(1.0)
-                        continue
-                    raise
-                            
-
-        # When there is an error launching
-        except Exception as e:
-            self.ui_call(self.log, f"ERROR: {str(e)}")
-            self.ui_call(messagebox.showerror, "Error", str(e))
-        
-        # Runs no matter what happens
-        finally: 
-            self.listening = False
-            self.ui_call(self.start_button.config, state="normal")
-            self.ui_call(self.stop_button.config, state="disabled")
-            self.ui_call(self.log, "\nListening stopped.")
+    def build_engine_config(self) -> "EngineConfig":
+        """Snapshot the Tk settings into a plain config the engine thread can read"""
+        from detection_engine import EngineConfig
+
+        return EngineConfig(
+            target_names=parse_targets(self.target_name.get()),
+            aliases=parse_aliases(self.aliases.get()),
+            fuzzy_names=self.fuzzy_names.get(),
+            partial_results=self.partial_results.get(),
+            partial_interval_ms=self.partial_interval.get(),
+            model_path=self.model_path.get(),
+            device_name=self.device_name.get() or None,
+            sample_rate=self.sample_rate.get(),
+            block_size=self.block_size.get(),
+            adaptive_block=self.adaptive_block.get(),
+            target_latency_ms=self.target_latency.get(),
+            cooldown=self.cooldown.get(),
+            recognizer_mode=RECOGNIZER_MODES.get(self.recognizer_mode.get(), MODE_FULL),
+            vad=self.skip_silence.get(),
+        )
 
     def start_listening(self):
         """Start the listening thread"""
@@ -480,6 +766,20 @@ class NameDetectorGUI:
             messagebox.showwarning("Warning", "Already listening!")
             return
 
+        try:
+            config = self.build_engine_config()
+        except tk.TclError as e:
+            messagebox.showerror("Invalid settings", str(e))
+            return
+        from detection_engine import DetectionEngine, LoopbackSource
+
+        self.engine = DetectionEngine(
+            config,
+            _GUIListener(self),
+            LoopbackSource(config.device_name),
+            archive=self.archive,
+            latency=self.latency,
+        )
         self.listening = True
 
         self.start_button.config(state="disabled")
@@ -488,18 +788,23 @@ class NameDetectorGUI:
         self.output_text.config(state="normal")
         self.output_text.delete("1.0", "end")
         self.output_text.config(state="disabled")
+        self.transcript.clear()
 
-        self.listener_thread = threading.Thread(target=self.listen, daemon=True)
-        self.listener_thread.start()
+        self.listener_thread = self.engine.start()
 
     def stop_listening(self):
         """Stop the listening thread"""
         self.listening = False
+        if self.engine:
+            self.engine.stop()
         self.start_button.config(state="normal")
         self.stop_button.config(state="disabled")
 
 
 if __name__ == "__main__":
+    import process_handling
+    process_handling.startLiveIndex()
+    device_registry.start_watcher()
     root = tk.Tk()
     app = NameDetectorGUI(root)
     root.mainloop()
@@ -0,0 +1,281 @@
+"""
+Precompiled multi-pattern name matcher.
+
+Target names, their aliases and multi-word phrases are compiled once into an
+Aho-Corasick automaton over whole tokens, so a transcript is scanned in one
+pass whatever the number of targets, and "william" never fires on "williams".
+Each transcript word is first resolved to a target word: exactly or, with fuzzy
+matching on, as a near miss of a longer name ("harven" -> "harvin"): same length,
+one letter substituted and the same phonetic (Soundex) code. Added or dropped
+letters never match, so inflections ("williams", "marks") stay apart.
+Resolutions are memoized per word.
+
+Public:
+- NameMatcher(targets, aliases, fuzzy)
+    - match(text) -> list[str]
+    - __call__(targets, text) -> bool (drop-in for name_in_text)
+- IncrementalDetector(matcher, targets, cooldown)
+    - partial(text, now) -> list[str]
+    - final(text, now) -> list[str]
+- parse_aliases(raw: str) -> dict[str, list[str]]
+- soundex(word: str) -> str
+"""
+import time
+from collections import deque
+from typing import Callable
+
+_SOUNDEX_CODES = {
+    **dict.fromkeys("bfpv", "1"),
+    **dict.fromkeys("cgjkqsxz", "2"),
+    **dict.fromkeys("dt", "3"),
+    "l": "4",
+    **dict.fromkeys("mn", "5"),
+    "r": "6",
+}
+
+_MIN_FUZZY_LENGTH = 5 # Shorter names only match exactly; "kate" would otherwise hit "kite"
+_MAX_CACHE = 50_000
+
+
+def soundex(word: str) -> str:
+    """Classic 4-character American Soundex code"""
+    word = "".join(ch for ch in word.lower() if ch.isalpha())
+    if not word:
+        return ""
+    code = word[0].upper()
+    previous = _SOUNDEX_CODES.get(word[0], "")
+    for ch in word[1:]:
+        digit = _SOUNDEX_CODES.get(ch, "")
+        if digit and digit != previous:
+            code += digit
+            if len(code) == 4:
+                break
+        if ch not in "hw":
+            previous = digit
+    return code.ljust(4, "0")
+
+
+def parse_aliases(raw: str) -> dict[str, list[str]]:
+    """'william=will|bill, harvin=harv' -> {'william': ['will', 'bill'], 'harvin': ['harv']}"""
+    aliases: dict[str, list[str]] = {}
+    for entry in raw.split(","):
+        if "=" not in entry:
+            continue
+        name, variants = entry.split("=", 1)
+        name = name.strip().lower()
+        if name:
+            aliases.setdefault(name, []).extend(v.strip().lower() for v in variants.split("|") if v.strip())
+    return aliases
+
+
+class NameMatcher:
+    def __init__(
+        self,
+        targets: list[str],
+        aliases: dict[str, list[str]] | None = None,
+        fuzzy: bool = False,
+    ) -> None:
+        self.targets = list(targets)
+        self.fuzzy = fuzzy
+
+        # Every phrase (target or alias) as a token sequence, owned by its target name
+        phrases: list[tuple[list[str], str]] = []
+        for target in self.targets:
+            phrases.append((target.lower().split(), target))
+            for alias in (aliases or {}).get(target.lower(), []):
+                phrases.append((alias.lower().split(), target))
+        phrases = [(tokens, owner) for tokens, owner in phrases if tokens]
+
+        # Vocabulary of pattern words and their fuzzy lookup tables
+        self._vocab: dict[str, int] = {}
+        for tokens, _ in phrases:
+            for token in tokens:
+                self._vocab.setdefault(token, len(self._vocab))
+        self._by_length: dict[int, list[tuple[str, str, int]]] = {} # length -> (word, soundex, id)
+        for word, word_id in self._vocab.items():
+            if len(word) >= _MIN_FUZZY_LENGTH:
+                self._by_length.setdefault(len(word), []).append((word, soundex(word), word_id))
+        self._resolved: dict[str, int] = {}
+
+        self._build_automaton(phrases)
+
+    def _build_automaton(self, phrases: list[tuple[list[str], str]]) -> None:
+        self._goto: list[dict[int, int]] = [{}]
+        self._output: list[set[str]] = [set()]
+        for tokens, owner in phrases:
+            state = 0
+            for token in tokens:
+                word_id = self._vocab[token]
+                nxt = self._goto[state].get(word_id)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[state][word_id] = nxt
+                    self._goto.append({})
+                    self._output.append(set())
+                state = nxt
+            self._output[state].add(owner)
+
+        # Failure links, breadth first; outputs are merged along them
+        self._fail = [0] * len(self._goto)
+        pending = deque(self._goto[0].values())
+        while pending:
+            state = pending.popleft()
+            for word_id, nxt in self._goto[state].items():
+                pending.append(nxt)
+                fallback = self._fail[state]
+                while fallback and word_id not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[nxt] = self._goto[fallback].get(word_id, 0)
+                self._output[nxt] |= self._output[self._fail[nxt]]
+
+    def _resolve(self, word: str) -> int:
+        """Pattern word id for a transcript word, or -1"""
+        word_id = self._resolved.get(word)
+        if word_id is not None:
+            return word_id
+
+        word_id = self._vocab.get(word, -1)
+        if word_id < 0 and self.fuzzy:
+            candidates = self._by_length.get(len(word), ())
+            code = soundex(word) if candidates else ""
+            for candidate, candidate_code, candidate_id in candidates:
+                # Both checks: a one-letter substitution alone matches too many ordinary words
+                if candidate_code == code and sum(a != b for a, b in zip(word, candidate)) == 1:
+                    word_id = candidate_id
+                    break
+
+        if len(self._resolved) >= _MAX_CACHE:
+            self._resolved.clear()
+        self._resolved[word] = word_id
+        return word_id
+
+    def step(self, state: int, word: str) -> int:
+        """Advance the automaton by one transcript word; output(state) lists what ends there"""
+        word_id = self._resolved.get(word)
+        if word_id is None:
+            word_id = self._resolve(word)
+        if word_id < 0:
+            return 0
+        goto, fail = self._goto, self._fail
+        while state and word_id not in goto[state]:
+            state = fail[state]
+        return goto[state].get(word_id, 0)
+
+    def output(self, state: int) -> set[str]:
+        return self._output[state]
+
+    def match(self, text: str) -> list[str]:
+        """Target names found in text, in the order they were first heard"""
+        found: list[str] = []
+        goto, fail, output = self._goto, self._fail, self._output
+        resolved = self._resolved
+        state = 0
+        for word in text.lower().split():
+            word_id = resolved.get(word)
+            if word_id is None:
+                word_id = self._resolve(word)
+            if word_id < 0:
+                state = 0
+                continue
+            while state and word_id not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(word_id, 0)
+            for owner in output[state]:
+                if owner not in found:
+                    found.append(owner)
+        return found
+
+    def __call__(self, target: list[str], text: str) -> bool:
+        return bool(self.match(text))
+
+
+class IncrementalDetector:
+    """
+    Per-utterance detection state over a stream of partial and final results.
+
+    Vosk re-sends the whole hypothesis on every partial. The automaton state after
+    each word is remembered, so only the words after the point where the new
+    hypothesis diverges from the previous one are scanned. A target fires at most
+    once per utterance (partials and final together) and then not again until
+    its own cooldown has passed.
+    """
+
+    def __init__(
+        self,
+        matcher: "NameMatcher | Callable[[list[str], str], bool]",
+        targets: list[str],
+        cooldown: float = 0.0,
+    ) -> None:
+        self.matcher = matcher
+        self.targets = list(targets)
+        self.cooldown = cooldown
+        self.last_fired: dict[str, float] = {}
+        self.utterance_names: set[str] = set()
+        self.last_utterance_names: set[str] = set()
+        self.words_scanned = 0
+        self.fired_words: dict[str, int] = {} # Name -> index of the word that completed it, for the last scan
+        self._incremental = hasattr(matcher, "step")
+        self._words: list[str] = []
+        self._states: list[int] = [0] # _states[i]: automaton state after the first i words
+
+    def partial(self, text: str, now: float | None = None) -> list[str]:
+        return self._scan(text, now)
+
+    def final(self, text: str, now: float | None = None) -> list[str]:
+        fired = self._scan(text, now)
+        self.last_utterance_names = self.utterance_names
+        self.reset()
+        return fired
+
+    def reset(self) -> None:
+        self.utterance_names = set()
+        self._words = []
+        self._states = [0]
+
+    def _scan(self, text: str, now: float | None) -> list[str]:
+        self.fired_words = {}
+        heard = self._heard(text)
+        new = [name for name in heard if name not in self.utterance_names]
+        if not new:
+            return []
+
+        now = time.time() if now is None else now
+        fired = []
+        for name in dict.fromkeys(new):
+            self.utterance_names.add(name)
+            if now - self.last_fired.get(name, float("-inf")) >= self.cooldown:
+                self.last_fired[name] = now
+                fired.append(name)
+        return fired
+
+    def _heard(self, text: str) -> list[str]:
+        words = text.lower().split()
+        if not self._incremental:
+            self.words_scanned += len(words)
+            if not self.matcher(self.targets, text):
+                return []
+            self.fired_words = dict.fromkeys(self.targets, len(words) - 1)
+            return list(self.targets)
+
+        previous = self._words
+        if words[:len(previous)] == previous:
+            common = len(previous)
+        else:
+            common = 0
+            for old, new in zip(previous, words):
+                if old != new:
+                    break
+                common += 1
+
+        del self._states[common + 1:]
+        state = self._states[common]
+        heard: list[str] = []
+        for index in range(common, len(words)):
+            state = self.matcher.step(state, words[index])
+            self._states.append(state)
+            for name in self.matcher.output(state):
+                heard.append(name)
+                self.fired_words.setdefault(name, index)
+        self.words_scanned += len(words) - common
+        self._words = words
+        return heard
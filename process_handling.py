@@ -1,38 +1,409 @@
-import win32gui
-import win32con
-import win32process
+"""
+Public method:
+- getSnapshot(maxAge: float | None = None) -> WindowSnapshot
+- invalidateSnapshot(wait: bool = True) -> None
+- startLiveIndex() -> bool
+- stopLiveIndex() -> None
+- getHwnds(pid: int) -> list[int]
+- minimize_by_pid(pid: int) -> None
+- maximize_by_pid(pid: int) -> None
+- restore_by_pid(pid: int) -> None
+- submitSnap(plan: Callable, onDone: Callable | None = None) -> Future[SnapResult]
+"""
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import Callable
 
-def getHwnds(pid: int) -> list[int]:
-    def callback(hwnd, hwnds):
-        # Get PID for this window handle
-        _, found_pid = win32process.GetWindowThreadProcessId(hwnd)
-        if found_pid == pid and win32gui.IsWindowVisible(hwnd):
-            hwnds.append(hwnd)
-        return True
+from window_backend import EVENT_DESTROY, EVENT_HIDE, EVENT_TITLE, WindowBackend, getBackend
+
+_SNAPSHOT_TTL: float = 1.0 # Seconds a snapshot is reused before the desktop is enumerated again
+_RESYNC_INTERVAL: float = 60.0 # Live index: full enumeration in the background, in case an event was missed
+
+@dataclass
+class WindowSnapshot:
+    """One EnumWindows pass: every visible top-level window, grouped by its process"""
+    hwnds: dict[int, list[int]] = field(default_factory=dict) # pid -> visible hwnds, in Z order
+    names: dict[int, str] = field(default_factory=dict) # pid -> executable name ("chrome.exe")
+    titles: dict[int, str] = field(default_factory=dict) # hwnd -> window title
+    takenAt: float = 0.0
+
+    def title(self, pid: int) -> str:
+        """First non-empty window title of the process"""
+        for hwnd in self.hwnds.get(pid, []):
+            if self.titles.get(hwnd):
+                return self.titles[hwnd]
+        return ""
+
+    def age(self) -> float:
+        return time.monotonic() - self.takenAt
+
+_snapshot: WindowSnapshot | None = None
+_snapshotBackend: WindowBackend | None = None
+_snapshotLock = threading.Lock()
+_exeNames: dict[int, str] = {} # pid -> executable name, kept while the pid stays alive
+_exeNamesLock = threading.Lock() # Touched by the event pump, the snap worker and the Tk thread
+
+def _exeName(backend: WindowBackend, pid: int) -> str:
+    with _exeNamesLock:
+        name = _exeNames.get(pid)
+    if name is None:
+        name = backend.getExeName(pid) # Outside the lock: it opens the process
+        with _exeNamesLock:
+            name = _exeNames.setdefault(pid, name)
+    return name
+
+def _forgetExeNames(keep: "dict | None" = None) -> None:
+    """Drop cached names of pids not in keep (all of them when keep is None)"""
+    with _exeNamesLock:
+        if keep is None:
+            _exeNames.clear()
+            return
+        for pid in [pid for pid in _exeNames if pid not in keep]:
+            del _exeNames[pid]
+
+def _takeSnapshot(backend: WindowBackend) -> WindowSnapshot:
+    snapshot = WindowSnapshot()
+    for hwnd in backend.enumWindows():
+        pid = backend.getPid(hwnd)
+        snapshot.hwnds.setdefault(pid, []).append(hwnd)
+        snapshot.titles[hwnd] = backend.getTitle(hwnd)
+
+    # Executable names are only looked up for processes that own a visible window
+    _forgetExeNames(keep = snapshot.hwnds)
+    for pid in snapshot.hwnds:
+        snapshot.names[pid] = _exeName(backend, pid)
+
+    snapshot.takenAt = time.monotonic()
+    return snapshot
+
+class _LiveWindowIndex:
+    """
+    Window index kept current by window events. The desktop is enumerated once
+    at start; after that each create/destroy/show/hide/title event patches the
+    index, so reading it never scans. A new WindowSnapshot is only assembled
+    when something changed since the last read.
+
+    Events that arrive while a resync is enumerating are applied at once and
+    also queued; the queue is replayed on top of the fresh enumeration, so a
+    window opened or closed mid-resync is not lost.
+    """
+
+    def __init__(self, backend: WindowBackend) -> None:
+        self.backend = backend
+        self.events = 0
+        self._lock = threading.Lock()
+        self._resyncLock = threading.Lock() # One enumeration at a time
+        self._pids: dict[int, int] = {} # hwnd -> pid
+        self._titles: dict[int, str] = {} # hwnd -> title
+        self._pending: list[tuple[str, int, int, str, str]] | None = None # Events seen during a resync; None when idle
+        self._published: WindowSnapshot | None = None
+        self._dirty = False
+        self._syncedAt = 0.0
+        self._resyncing = False
+        # Subscribe before enumerating so nothing created in between is missed
+        self._stopWatching = backend.watchWindows(self._onEvent)
+        if self.live:
+            self.resync()
+
+    @property
+    def live(self) -> bool:
+        return self._stopWatching is not None
+
+    def stop(self) -> None:
+        if self._stopWatching is not None:
+            self._stopWatching()
+            self._stopWatching = None
+
+    def resync(self) -> None:
+        with self._resyncLock:
+            with self._lock:
+                self._pending = []
+            try:
+                snapshot = _takeSnapshot(self.backend)
+            except BaseException:
+                with self._lock:
+                    self._pending = None
+                raise
+            with self._lock:
+                pending, self._pending = self._pending, None
+                self._pids = {hwnd: pid for pid, hwnds in snapshot.hwnds.items() for hwnd in hwnds}
+                self._titles = dict(snapshot.titles)
+                self._published = snapshot
+                self._dirty = False
+                for event in pending:
+                    self._apply(*event) # Marks the index dirty again when anything changed
+                self._syncedAt = time.monotonic()
+
+    def requestResync(self) -> None:
+        """Re-enumerate on a background thread (no-op while one is running)"""
+        with self._lock:
+            if self._resyncing:
+                return
+            self._resyncing = True
+        threading.Thread(target=self._resyncInBackground, name="window-resync", daemon=True).start()
+
+    def _resyncInBackground(self) -> None:
+        try:
+            self.resync()
+        finally:
+            self._resyncing = False
+
+    def _onEvent(self, event: str, hwnd: int) -> None:
+        self.events += 1
+        pid, title, exeName = 0, "", ""
+        if event == EVENT_TITLE:
+            if hwnd not in self._pids and self._pending is None:
+                return
+            title = self.backend.getTitle(hwnd)
+        elif event not in (EVENT_DESTROY, EVENT_HIDE):
+            # EVENT_CREATE / EVENT_SHOW: only visible top-level windows join the index
+            if hwnd in self._pids or not self.backend.isTopLevelVisible(hwnd):
+                return
+            pid = self.backend.getPid(hwnd)
+            title = self.backend.getTitle(hwnd)
+            exeName = _exeName(self.backend, pid)
+
+        with self._lock:
+            if self._pending is not None:
+                self._pending.append((event, hwnd, pid, title, exeName))
+            self._apply(event, hwnd, pid, title, exeName)
+
+    def _apply(self, event: str, hwnd: int, pid: int, title: str, exeName: str) -> None:
+        """Patch the index with one event. Caller holds _lock."""
+        if event in (EVENT_DESTROY, EVENT_HIDE):
+            gone = self._pids.pop(hwnd, None)
+            if gone is None:
+                return
+            self._titles.pop(hwnd, None)
+            # Last window gone: forget the name, so a reused pid is looked up afresh
+            if gone not in self._pids.values():
+                with _exeNamesLock:
+                    _exeNames.pop(gone, None)
+        elif event == EVENT_TITLE:
+            if hwnd not in self._pids:
+                return
+            self._titles[hwnd] = title
+        else:
+            self._pids[hwnd] = pid
+            self._titles[hwnd] = title
+            with _exeNamesLock:
+                _exeNames.setdefault(pid, exeName) # A replayed create may follow the resync's pruning
+        self._dirty = True
+
+    def snapshot(self) -> WindowSnapshot:
+        if not self._resyncing and time.monotonic() - self._syncedAt > _RESYNC_INTERVAL:
+            self.requestResync()
 
-    hwnds = []
-    win32gui.EnumWindows(callback, hwnds)
-    return hwnds
+        with self._lock:
+            if self._dirty or self._published is None:
+                snapshot = WindowSnapshot(titles=dict(self._titles), takenAt=time.monotonic())
+                for hwnd, pid in self._pids.items():
+                    snapshot.hwnds.setdefault(pid, []).append(hwnd)
+                with _exeNamesLock:
+                    snapshot.names = {pid: _exeNames.get(pid, "") for pid in snapshot.hwnds}
+                self._published = snapshot
+                self._dirty = False
+            return self._published
+
+_liveIndex: _LiveWindowIndex | None = None
+
+def getSnapshot(maxAge: float | None = None) -> WindowSnapshot:
+    """
+    The pid -> hwnds -> executable index. With the live index running this is
+    a lookup; otherwise it is rebuilt in a single pass when it is older than
+    maxAge seconds (default _SNAPSHOT_TTL) or has been invalidated.
+    """
+    global _snapshot, _snapshotBackend
+    backend = getBackend()
+    index = _liveIndex
+    if index is not None and index.backend is backend:
+        return index.snapshot()
+
+    maxAge = _SNAPSHOT_TTL if maxAge is None else maxAge
+    with _snapshotLock:
+        if _snapshot is None or _snapshotBackend is not backend or _snapshot.age() > maxAge:
+            if _snapshotBackend is not backend:
+                _forgetExeNames()
+            _snapshot = _takeSnapshot(backend)
+            _snapshotBackend = backend
+        return _snapshot
+
+def invalidateSnapshot(wait: bool = True) -> None:
+    """
+    Force the next getSnapshot() to enumerate the desktop again. With the live
+    index and wait=False, the enumeration runs in the background and
+    getSnapshot() keeps returning the current index until it is done.
+    """
+    global _snapshot
+    index = _liveIndex
+    if index is not None and index.backend is getBackend():
+        if wait:
+            index.resync()
+        else:
+            index.requestResync()
+        return
+    with _snapshotLock:
+        _snapshot = None
+
+def startLiveIndex() -> bool:
+    """
+    Keep the window index current from window events (WinEvent hooks on
+    Windows) instead of re-enumerating. Returns False when the backend has no
+    events; getSnapshot() then keeps polling with a TTL.
+    """
+    global _liveIndex
+    backend = getBackend()
+    with _snapshotLock:
+        if _liveIndex is not None:
+            if _liveIndex.backend is backend:
+                return True
+            _liveIndex.stop()
+            _liveIndex = None
+        _forgetExeNames()
+        index = _LiveWindowIndex(backend)
+        if not index.live:
+            return False
+        _liveIndex = index
+    return True
+
+def stopLiveIndex() -> None:
+    global _liveIndex
+    with _snapshotLock:
+        if _liveIndex is not None:
+            _liveIndex.stop()
+            _liveIndex = None
+
+def getHwnds(pid: int) -> list[int]:
+    return getSnapshot().hwnds.get(pid, [])
 
 def minimize_by_pid(pid):
+    backend = getBackend()
     for hwnd in getHwnds(pid):
-        win32gui.ShowWindow(hwnd, win32con.SW_MINIMIZE)
+        backend.minimize(hwnd)
 
 def maximize_by_pid(pid):
+    backend = getBackend()
     for hwnd in getHwnds(pid):
-        win32gui.ShowWindow(hwnd, win32con.SW_MAXIMIZE)
+        backend.maximize(hwnd)
 
 def restore_by_pid(pid):
+    backend = getBackend()
     for hwnd in getHwnds(pid):
-        # Reference: https://stackoverflow.com/questions/60471477/using-python-how-can-i-detect-whether-a-program-is-minimized-or-maximized
-        _, viewStatus, *_ = win32gui.GetWindowPlacement(hwnd)
-        if viewStatus == win32con.SW_SHOWMAXIMIZED:
-            win32gui.ShowWindow(hwnd, win32con.SW_MAXIMIZE)
-        else:
-            win32gui.ShowWindow(hwnd, win32con.SW_RESTORE)
-        
+        backend.restore(hwnd)
+
+# Snap worker ===
+@dataclass
+class SnapResult:
+    restored: int = 0 # Windows
+    minimized: int = 0
+    failed: int = 0 # Windows that could not be handled (closed since the snapshot) and were skipped
+    queuedSeconds: float = 0.0 # Waiting for the worker
+    scanSeconds: float = 0.0 # Snapshot + plan
+    restoreSeconds: float = 0.0
+    minimizeSeconds: float = 0.0
+    totalSeconds: float = 0.0 # From submitSnap() to the last window action
+    error: str = ""
+
+    def describe(self) -> str:
+        if self.error:
+            return f"Snap failed: {self.error}"
+        return (
+            f"Snap: restored {self.restored}, minimized {self.minimized} window(s)"
+            + (f", skipped {self.failed} closed" if self.failed else "")
+            + f" in {self.totalSeconds * 1000:.0f} ms "
+            f"(queue {self.queuedSeconds * 1000:.0f}, scan {self.scanSeconds * 1000:.0f}, "
+            f"restore {self.restoreSeconds * 1000:.0f}, minimize {self.minimizeSeconds * 1000:.0f})"
+        )
+
+# plan(snapshot) -> (pids to restore, highest priority first; pids to minimize)
+SnapPlan = Callable[[WindowSnapshot], tuple[list[int], list[int]]]
+
+class _SnapWorker:
+    """
+    Runs window actions off the UI thread. Requests that pile up while a snap is
+    running are merged: only the newest plan runs, and every caller is told.
+    """
+
+    def __init__(self) -> None:
+        self._requests: queue.Queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="snap-worker", daemon=True)
+        self._thread.start()
+
+    def submit(self, plan: SnapPlan, onDone: Callable[[SnapResult], None] | None) -> "Future[SnapResult]":
+        future: Future = Future()
+        self._requests.put((plan, onDone, future, time.perf_counter()))
+        return future
+
+    def _run(self) -> None:
+        while True:
+            batch = [self._requests.get()]
+            while True:
+                try:
+                    batch.append(self._requests.get_nowait())
+                except queue.Empty:
+                    break
+
+            plan = batch[-1][0]
+            submittedAt = min(request[3] for request in batch)
+            result = self._snap(plan, submittedAt)
+            for _, onDone, future, _ in batch:
+                future.set_result(result)
+                if onDone is not None:
+                    try:
+                        onDone(result)
+                    except Exception as e:
+                        print(f"Snap callback failed: {e}")
+
+    def _snap(self, plan: SnapPlan, submittedAt: float) -> SnapResult:
+        result = SnapResult()
+        started = time.perf_counter()
+        result.queuedSeconds = started - submittedAt
+        try:
+            backend = getBackend()
+            snapshot = getSnapshot()
+            restorePids, minimizePids = plan(snapshot)
+            restoreHwnds = [hwnd for pid in restorePids for hwnd in snapshot.hwnds.get(pid, [])]
+            minimizeHwnds = [hwnd for pid in minimizePids for hwnd in snapshot.hwnds.get(pid, [])]
+            scanned = time.perf_counter()
+            result.scanSeconds = scanned - started
+
+            # The call window comes up first; everything else goes down after it
+            # Each batch skips windows that fail on their own, so one closed window cannot abort the snap
+            restoreFailed = backend.restoreMany(restoreHwnds)
+            restored = time.perf_counter()
+            result.restoreSeconds = restored - scanned
+            minimizeFailed = backend.minimizeMany(minimizeHwnds)
+            result.minimizeSeconds = time.perf_counter() - restored
+
+            result.restored = len(restoreHwnds) - restoreFailed
+            result.minimized = len(minimizeHwnds) - minimizeFailed
+            result.failed = restoreFailed + minimizeFailed
+        except Exception as e:
+            result.error = str(e)
+        result.totalSeconds = time.perf_counter() - submittedAt
+        return result
+
+_snapWorker: _SnapWorker | None = None
+_snapWorkerLock = threading.Lock()
+
+def submitSnap(plan: SnapPlan, onDone: Callable[[SnapResult], None] | None = None) -> "Future[SnapResult]":
+    """
+    Queue a snap on the window worker and return at once. onDone(result) is
+    called on the worker thread when the last window has been handled.
+    """
+    global _snapWorker
+    with _snapWorkerLock:
+        if _snapWorker is None:
+            _snapWorker = _SnapWorker()
+    return _snapWorker.submit(plan, onDone)
+
 
 if __name__ == "__main__":
-    target_pids = [25064, 9032, 9260, 20100, 18736, 16132]  # Replace with your PID
-    for target_pid in target_pids:
-        restore_by_pid(target_pid)
\ No newline at end of file
+    started = time.perf_counter()
+    snapshot = getSnapshot()
+    print(f"{len(snapshot.titles)} windows in {len(snapshot.hwnds)} processes, {(time.perf_counter() - started) * 1000:.1f} ms")
+    for pid, name in snapshot.names.items():
+        print(f"{pid:>8} {name:<28} {snapshot.title(pid)}")
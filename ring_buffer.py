@@ -0,0 +1,137 @@
+"""
+Bounded single-producer / single-consumer audio ring buffer.
+
+The capture thread writes mono float32 samples, the recognition thread drains
+them. Storage is allocated once; the lock is only held while indices move and
+samples are copied, never while either side does real work.
+
+Public:
+- AudioRingBuffer(capacity, overflow)
+- OVERFLOW_DROP_OLDEST, OVERFLOW_BLOCK, OVERFLOW_COALESCE
+"""
+import threading
+
+import numpy as np
+
+OVERFLOW_DROP_OLDEST = "drop_oldest" # Discard just enough old audio to fit the new block
+OVERFLOW_BLOCK = "block" # Writer waits for room (no loss; use for file sources, not live devices)
+OVERFLOW_COALESCE = "coalesce" # Discard the whole backlog and keep only the newest block: jump back to live
+
+OVERFLOW_POLICIES = (OVERFLOW_DROP_OLDEST, OVERFLOW_BLOCK, OVERFLOW_COALESCE)
+
+
+class AudioRingBuffer:
+    def __init__(self, capacity: int, overflow: str = OVERFLOW_DROP_OLDEST) -> None:
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown overflow policy '{overflow}'. Choose one of: {', '.join(OVERFLOW_POLICIES)}")
+        self.capacity = capacity
+        self.overflow = overflow
+        self._data = np.zeros(capacity, dtype=np.float32)
+        self._read = 0 # Total samples ever read
+        self._write = 0 # Total samples ever written
+        self._closed = False
+        self._cond = threading.Condition(threading.Lock())
+
+        # Counters
+        self.overruns = 0
+        self.dropped_samples = 0
+        self.max_depth = 0
+
+    @property
+    def depth(self) -> int:
+        """Samples waiting to be read"""
+        return self._write - self._read
+
+    @property
+    def read_position(self) -> int:
+        """Total samples ever read"""
+        return self._read
+
+    @property
+    def write_position(self) -> int:
+        """Total samples ever written"""
+        return self._write
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def close(self) -> None:
+        """Wake the reader; read_into() returns 0 once the remaining audio is drained"""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    def clear(self) -> None:
+        with self._cond:
+            self._read = self._write
+            self._cond.notify_all()
+
+    def wait_empty(self, timeout: float | None = None) -> bool:
+        with self._cond:
+            return self._cond.wait_for(lambda: self.depth == 0 or self._closed, timeout)
+
+    def write(self, samples: np.ndarray, timeout: float | None = None) -> int:
+        """Append samples, applying the overflow policy when full. Returns samples dropped."""
+        n = len(samples)
+        if n > self.capacity:
+            # Larger than the whole ring: only the newest capacity samples can survive
+            dropped = n - self.capacity
+            samples = samples[dropped:]
+            n = self.capacity
+        else:
+            dropped = 0
+
+        with self._cond:
+            free = self.capacity - self.depth
+            if n > free:
+                if self.overflow == OVERFLOW_BLOCK:
+                    self._cond.wait_for(lambda: self.capacity - self.depth >= n or self._closed, timeout)
+                    free = self.capacity - self.depth
+                if n > free:
+                    self.overruns += 1
+                    if self.overflow == OVERFLOW_COALESCE:
+                        lost = self.depth
+                    else:
+                        lost = n - free
+                    self._read += lost
+                    dropped += lost
+
+            start = self._write % self.capacity
+            first = min(n, self.capacity - start)
+            self._data[start:start + first] = samples[:first]
+            if first < n:
+                self._data[:n - first] = samples[first:]
+            self._write += n
+
+            self.dropped_samples += dropped
+            self.max_depth = max(self.max_depth, self.depth)
+            self._cond.notify_all()
+        return dropped
+
+    def read_into(self, out: np.ndarray, timeout: float | None = None) -> int:
+        """
+        Copy up to len(out) samples into out, waiting up to timeout for audio.
+        Returns the number of samples copied (0 on timeout or when closed and drained).
+        """
+        with self._cond:
+            if not self._cond.wait_for(lambda: self.depth > 0 or self._closed, timeout):
+                return 0
+            n = min(len(out), self.depth)
+            start = self._read % self.capacity
+            first = min(n, self.capacity - start)
+            out[:first] = self._data[start:start + first]
+            if first < n:
+                out[first:n] = self._data[:n - first]
+            self._read += n
+            self._cond.notify_all()
+            return n
+
+    def stats(self) -> dict:
+        return {
+            "depth": self.depth,
+            "max_depth": self.max_depth,
+            "capacity": self.capacity,
+            "overruns": self.overruns,
+            "dropped_samples": self.dropped_samples,
+        }
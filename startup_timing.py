@@ -0,0 +1,77 @@
+"""
+Startup timing report: how long each import and init step took, and when the
+first frame was on screen.
+
+Times are measured from when this module is first imported, so import it
+before anything else.
+
+Public:
+- measure(label) -> context manager
+- mark(label) -> None
+- import_module(name) -> module
+- after_first_paint(root, *callbacks) -> None
+- report() -> str
+"""
+import importlib
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+_START = time.perf_counter()
+_lock = threading.Lock()
+_steps: list[tuple[float, float, str]] = [] # (start offset, duration, label), seconds
+
+
+def _record(label: str, started: float, duration: float) -> None:
+    with _lock:
+        _steps.append((started - _START, duration, label))
+
+
+@contextmanager
+def measure(label: str):
+    """Time the with-block as one step of the report"""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        _record(label, started, time.perf_counter() - started)
+
+
+def mark(label: str) -> None:
+    """Record a point in time (no duration)"""
+    _record(label, time.perf_counter(), 0.0)
+
+
+def import_module(name: str):
+    """Import a module on first use, timing it the first time only"""
+    module = sys.modules.get(name)
+    if module is not None:
+        return module
+    with measure(f"import {name}"):
+        return importlib.import_module(name)
+
+
+def after_first_paint(root, *callbacks) -> None:
+    """
+    Once the window has been drawn: record "first paint", print the report and
+    run callbacks (deferred initialization) on the Tk thread.
+    """
+    def painted() -> None:
+        root.update_idletasks()
+        mark("first paint")
+        print(report())
+        for callback in callbacks:
+            callback()
+
+    root.after(0, painted)
+
+
+def report() -> str:
+    with _lock:
+        steps = sorted(_steps)
+    lines = ["Startup timing (ms since launch):"]
+    for started, duration, label in steps:
+        took = f"{duration * 1000:8.1f} ms" if duration else " " * 11
+        lines.append(f"  {started * 1000:8.1f}  {took}  {label}")
+    return "\n".join(lines)
@@ -0,0 +1,79 @@
+import wave
+
+import numpy as np
+import pytest
+
+from audio_processing import Int16Converter, Resampler, VoiceActivityGate, load_wav
+
+
+def test_pre_roll_keeps_original_samples_when_the_caller_reuses_its_buffer():
+    rate = 16000
+    block_size = 1024
+    rng = np.random.default_rng(0)
+    silence = (rng.standard_normal(16 * block_size) * 1e-4).astype(np.float32)
+    tone = (0.5 * np.sin(2 * np.pi * 220 * np.arange(block_size) / rate)).astype(np.float32)
+    audio = np.concatenate([silence, tone])
+
+    gate = VoiceActivityGate(rate)
+    chunk = np.empty(block_size, dtype=np.float32) # Reused for every block, like the recognition loop
+    fed: list[np.ndarray] = []
+    for start in range(0, len(audio), block_size):
+        n = min(block_size, len(audio) - start)
+        chunk[:n] = audio[start:start + n]
+        fed.extend(block.copy() for block in gate.process(chunk[:n]))
+
+    assert len(fed) > 1 # Pre-roll plus the first speech block
+    pre_roll = np.concatenate(fed[:-1])
+    np.testing.assert_array_equal(pre_roll, silence[len(silence) - len(pre_roll):])
+    np.testing.assert_array_equal(fed[-1], tone)
+
+
+def test_load_wav_downmixes_16_bit_pcm(tmp_path):
+    path = str(tmp_path / "stereo.wav")
+    frames = np.array([[16384, -16384], [32767, 32767], [-32768, 0]], dtype=np.int16)
+    with wave.open(path, "wb") as wav:
+        wav.setnchannels(2)
+        wav.setsampwidth(2)
+        wav.setframerate(8000)
+        wav.writeframes(frames.tobytes())
+
+    samples, rate = load_wav(path)
+
+    assert rate == 8000
+    assert samples.dtype == np.float32
+    np.testing.assert_allclose(samples, [0.0, 32767 / 32768, -0.5])
+
+
+def test_int16_converter_saturates_instead_of_wrapping():
+    converter = Int16Converter(capacity=2)
+    block = np.array([0.0, 0.5, -0.5, 1.0, -1.0, 1.5, -3.0, 1e9], dtype=np.float32)
+
+    pcm = np.frombuffer(converter.convert(block), dtype=np.int16)
+
+    assert pcm.tolist() == [0, 16383, -16383, 32767, -32767, 32767, -32768, 32767]
+
+
+def test_int16_converter_reuses_its_buffers():
+    converter = Int16Converter(capacity=8)
+    first = converter.convert(np.full(8, 0.25, dtype=np.float32))
+    second = converter.convert(np.full(4, -0.25, dtype=np.float32))
+
+    assert len(second) == 4 * 2
+    assert np.frombuffer(first, dtype=np.int16)[:4].tolist() == [-8191] * 4 # Same storage, overwritten
+
+
+@pytest.mark.parametrize("in_rate", [48000, 44100, 16000, 8000])
+def test_resampling_in_blocks_matches_the_whole_signal(in_rate):
+    rng = np.random.default_rng(in_rate)
+    signal = rng.uniform(-1.0, 1.0, in_rate).astype(np.float32) # One second
+
+    whole = Resampler(in_rate, 16000).process(signal)
+    chunked = Resampler(in_rate, 16000)
+    # Ragged block sizes, including ones shorter than the filter
+    sizes = rng.integers(1, in_rate // 40, 64) # About 80% of the signal; the rest goes in one last block
+    bounds = np.cumsum(np.concatenate(([0], sizes)))
+    parts = [chunked.process(signal[start:end]) for start, end in zip(bounds[:-1], bounds[1:])]
+    parts.append(chunked.process(signal[bounds[-1]:]))
+
+    assert len(whole) == 16000
+    np.testing.assert_allclose(np.concatenate(parts), whole, rtol=0, atol=1e-5)
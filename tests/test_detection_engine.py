@@ -0,0 +1,147 @@
+import json
+
+import numpy as np
+import pytest
+
+from detection_engine import (
+    ArraySource,
+    BlockSizeController,
+    DetectionEngine,
+    EngineConfig,
+    EngineListener,
+    PartialPolicy,
+)
+
+
+class _HoldingRecognizer:
+    """Never finalizes on its own: the utterance only comes out of FinalResult()"""
+
+    def AcceptWaveform(self, data):
+        return False
+
+    def PartialResult(self):
+        return json.dumps({"partial": ""})
+
+    def Result(self):
+        return json.dumps({"text": ""})
+
+    def FinalResult(self):
+        return json.dumps({"text": "thanks william"})
+
+
+class _Recorder(EngineListener):
+    def __init__(self):
+        self.finals = []
+        self.detections = []
+        self.errors = []
+
+    def on_final(self, text):
+        self.finals.append(text)
+
+    def on_detection(self, target_names, pending_partial, timing=None):
+        self.detections.append(target_names)
+
+    def on_error(self, exc):
+        self.errors.append(exc)
+
+
+def test_end_of_input_flushes_the_last_utterance():
+    config = EngineConfig(target_names=["william"], sample_rate=16000, model_rate=16000, vad=False)
+    listener = _Recorder()
+    samples = np.zeros(16000, dtype=np.float32)
+    DetectionEngine(config, listener, ArraySource(samples, 16000), lambda _config: _HoldingRecognizer()).run()
+
+    assert listener.errors == []
+    assert listener.finals == ["thanks william"]
+    assert listener.detections == [["william"]]
+
+
+def _polls(policy, blocks, samples):
+    return [policy.due(samples) for _ in range(blocks)]
+
+
+def test_default_partial_policy_polls_every_block():
+    config = EngineConfig()
+    policy = PartialPolicy(True, config.partial_interval_ms, config.partial_min_audio_ms, 48000)
+
+    assert _polls(policy, 10, 4096) == [True] * 10 # ~85 ms blocks
+    assert policy.skipped_interval == 0
+
+
+def test_partial_interval_is_measured_on_the_audio_clock():
+    policy = PartialPolicy(True, 100.0, 0.0, 16000)
+
+    # 50 ms blocks: the first block polls, then every second one
+    assert _polls(policy, 6, 800) == [True, False, True, False, True, False]
+    assert (policy.blocks, policy.skipped_interval) == (6, 3)
+
+
+def test_partial_min_audio_waits_for_enough_new_samples():
+    policy = PartialPolicy(True, 0.0, 250.0, 16000)
+
+    # 100 ms blocks: 300 ms has piled up on every third one
+    assert _polls(policy, 6, 1600) == [False, False, True, False, False, True]
+    assert policy.skipped_audio == 4
+
+
+def test_disabled_partial_policy_never_polls():
+    policy = PartialPolicy(False, 0.0, 0.0, 16000)
+
+    assert _polls(policy, 3, 1600) == [False] * 3
+    assert policy.skipped_disabled == 3
+
+
+def _windows(controller, blocks, rtf, backlog=0):
+    """Feed blocks that each take rtf times their audio length; sizes chosen as windows close"""
+    sizes = []
+    for _ in range(blocks):
+        size = controller.size
+        if controller.record(size, size / controller.sample_rate * rtf, backlog):
+            sizes.append(controller.size)
+    return sizes
+
+
+def test_block_size_doubles_when_the_recognizer_falls_behind():
+    controller = BlockSizeController(1024, 16000)
+
+    assert _windows(controller, 16, rtf=0.9) == [2048] # 16 blocks of 64 ms close one window
+    assert (controller.grown, controller.shrunk) == (1, 0)
+    assert controller.rtf == pytest.approx(0.9)
+
+
+def test_block_size_grows_on_backlog_even_when_fast():
+    controller = BlockSizeController(1024, 16000)
+
+    assert _windows(controller, 16, rtf=0.1, backlog=4096) == [2048]
+
+
+def test_block_size_shrinks_toward_the_target_latency_at_most_by_half():
+    controller = BlockSizeController(8192, 16000, target_latency_ms=150)
+
+    # 150 ms / (1 + rtf) at 16 kHz is 2376 samples, on the 256-sample step 2304
+    assert _windows(controller, 12, rtf=0.01) == [4096, 2304]
+    assert controller.shrunk == 2
+
+
+def test_block_size_waits_before_shrinking_after_falling_behind():
+    controller = BlockSizeController(8192, 16000, target_latency_ms=150)
+    assert _windows(controller, 2, rtf=0.9) == [16384]
+
+    assert _windows(controller, 5, rtf=0.01) == [16384, 16384, 16384, 8192]
+
+
+def test_block_size_never_shrinks_past_the_worst_case_rtf():
+    controller = BlockSizeController(4096, 16000, target_latency_ms=150, max_rtf=0.7)
+
+    [size] = _windows(controller, 4, rtf=0.5)
+
+    assert size < 4096
+    assert 4096 * 0.5 / size <= 0.7 # All cost per call: the RTF grows by 4096 / size
+
+
+def test_disabled_block_size_controller_only_measures():
+    controller = BlockSizeController(1000, 16000, enabled=False)
+
+    assert _windows(controller, 32, rtf=0.9) == [1000, 1000]
+    assert controller.capacity == 1000
+    assert controller.rtf == pytest.approx(0.9)
@@ -0,0 +1,176 @@
+import json
+import threading
+
+import numpy as np
+import pytest
+
+import device_registry
+from detection_engine import ArraySource, DetectionEngine, EngineConfig, EngineListener, LoopbackSource
+from ring_buffer import OVERFLOW_BLOCK
+
+
+class _FakeSoundcard:
+    """Stands in for soundcard's enumeration: a dict of devices, hidden for a number of scans"""
+
+    def __init__(self, *devices):
+        self.devices = {device.name: device for device in devices}
+        self.default = devices[0].name if devices else ""
+        self.hidden_scans = 0
+        self.scans = 0
+
+    def enumerate(self):
+        self.scans += 1
+        if self.hidden_scans:
+            self.hidden_scans -= 1
+            return {}, ""
+        return dict(self.devices), self.default
+
+
+@pytest.fixture
+def soundcard(monkeypatch):
+    fake = _FakeSoundcard(ArraySource([], name="Speakers"))
+    monkeypatch.setattr(device_registry, "_enumerate", fake.enumerate)
+    monkeypatch.setattr(device_registry, "_loopbacks", None)
+    monkeypatch.setattr(device_registry, "_default_name", "")
+    monkeypatch.setattr(device_registry, "_subscribers", [])
+    yield fake
+    device_registry.stop_watcher()
+
+
+def test_lookups_are_served_from_the_cache(soundcard):
+    assert device_registry.speaker_names() == ["Speakers"]
+    assert device_registry.loopback_microphone().name == "Speakers"
+    assert device_registry.loopback_microphone("Speakers").name == "Speakers"
+
+    assert soundcard.scans == 1
+
+
+def test_a_device_plugged_in_since_the_last_scan_is_found(soundcard):
+    device_registry.speaker_names()
+    soundcard.devices["Headset"] = ArraySource([], name="Headset")
+
+    assert device_registry.loopback_microphone("Headset").name == "Headset"
+    with pytest.raises(device_registry.DeviceNotFoundError):
+        device_registry.loopback_microphone("Monitor")
+
+
+def test_watcher_notifies_subscribers_of_changes(soundcard):
+    changed = threading.Event()
+    device_registry.speaker_names()
+    device_registry.subscribe(changed.set)
+    device_registry.start_watcher(interval=0.01)
+
+    assert device_registry.stats()["watching"]
+    assert not changed.wait(0.1) # Rescans that find the same devices stay quiet
+
+    soundcard.devices["Headset"] = ArraySource([], name="Headset")
+    assert changed.wait(2.0)
+    assert device_registry.speaker_names() == ["Speakers", "Headset"]
+
+    device_registry.stop_watcher()
+    assert not device_registry.stats()["watching"]
+
+
+# Reconnect ===
+
+class _ResettingRecorder:
+    """Plays its audio, then fails the way a Windows endpoint does when it is reset"""
+
+    def __init__(self, recorder, reset: bool) -> None:
+        self._recorder = recorder
+        self._reset = reset
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc) -> None:
+        return None
+
+    def record(self, numframes: int) -> np.ndarray:
+        try:
+            return self._recorder.record(numframes)
+        except EOFError:
+            if self._reset:
+                raise RuntimeError("Error 0x8889000a AUDCLNT_E_DEVICE_INVALIDATED") from None
+            raise
+
+
+class _ResettingDevice(ArraySource):
+    """Plays each part on its own recorder; every part but the last ends in a device reset"""
+
+    def __init__(self, name: str, *parts) -> None:
+        super().__init__(np.concatenate(parts), name=name)
+        self.parts = list(parts)
+
+    def recorder(self, samplerate: int, channels: int | None = None, blocksize: int | None = None):
+        part = ArraySource(self.parts.pop(0), self.sample_rate)
+        return _ResettingRecorder(part.recorder(samplerate), reset=bool(self.parts))
+
+
+class _CountingRecognizer:
+    def __init__(self) -> None:
+        self.samples = 0
+
+    def AcceptWaveform(self, data):
+        self.samples += len(data) // 2
+        return False
+
+    def PartialResult(self):
+        return json.dumps({"partial": ""})
+
+    def Result(self):
+        return json.dumps({"text": ""})
+
+    def FinalResult(self):
+        return json.dumps({"text": ""})
+
+
+class _Listener(EngineListener):
+    def __init__(self) -> None:
+        self.info = []
+        self.errors = []
+
+    def on_info(self, text):
+        self.info.append(text)
+
+    def on_error(self, exc):
+        self.errors.append(exc)
+
+
+def _engine(listener, recognizer, **config):
+    config = EngineConfig(
+        target_names=["william"], sample_rate=16000, model_rate=16000, block_size=1600, vad=False,
+        overflow=OVERFLOW_BLOCK, reconnect_delay=0.001, **config,
+    )
+    return DetectionEngine(config, listener, LoopbackSource("Speakers"), lambda _config: recognizer)
+
+
+def test_engine_reconnects_when_the_device_comes_back(soundcard):
+    device = _ResettingDevice("Speakers", np.zeros(8000, np.float32), np.zeros(4800, np.float32))
+    soundcard.devices = {device.name: device}
+    soundcard.default = device.name
+    listener, recognizer = _Listener(), _CountingRecognizer()
+    engine = _engine(listener, recognizer)
+
+    device_registry.speaker_names()
+    soundcard.hidden_scans = 2 # Still gone for the first lookup after the reset
+    engine.run()
+
+    assert listener.errors == []
+    assert [(entry["device"], entry["attempts"]) for entry in engine.reconnects] == [("Speakers", 2)]
+    assert any(text.startswith("Reconnected to Speakers") for text in listener.info)
+    assert recognizer.samples == 8000 + 4800 # Same recognizer on both sides of the reset
+
+
+def test_engine_gives_up_when_the_device_stays_away(soundcard):
+    device = _ResettingDevice("Speakers", np.zeros(1600, np.float32), np.zeros(1600, np.float32))
+    soundcard.devices = {device.name: device}
+    soundcard.default = device.name
+    device_registry.speaker_names()
+    soundcard.hidden_scans = 10 ** 6
+    listener = _Listener()
+
+    _engine(listener, _CountingRecognizer(), reconnect_timeout=0.05).run()
+
+    assert len(listener.errors) == 1
+    assert isinstance(listener.errors[0], device_registry.DeviceNotFoundError)
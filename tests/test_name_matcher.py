@@ -0,0 +1,57 @@
+from name_matcher import IncrementalDetector, NameMatcher
+
+
+def test_exact_by_default():
+    assert NameMatcher(["harvin"]).match("hi harven") == []
+
+
+def test_fuzzy_catches_same_sounding_misspelling():
+    assert NameMatcher(["harvin"], fuzzy=True).match("hi harven") == ["harvin"]
+
+
+def test_fuzzy_ignores_common_words_and_inflections():
+    matcher = NameMatcher(["sarah", "mark", "kate", "john", "william"], fuzzy=True)
+    for text in ("sure", "sorry", "share", "shower", "marks", "march", "kite", "join", "wilma", "williams"):
+        assert matcher.match(text) == [], text
+
+
+def _detector(targets, cooldown=10.0):
+    return IncrementalDetector(NameMatcher(targets), targets, cooldown)
+
+
+def test_a_name_fires_once_per_utterance():
+    detector = _detector(["william"])
+
+    assert detector.partial("hey william", now=0.0) == ["william"]
+    assert detector.partial("hey william how", now=0.1) == []
+    assert detector.final("hey william how are you william", now=0.2) == []
+    assert detector.last_utterance_names == {"william"}
+
+
+def test_a_name_fires_again_only_after_its_cooldown():
+    detector = _detector(["william", "harvin"], cooldown=10.0)
+    assert detector.final("thanks william", now=0.0) == ["william"]
+
+    assert detector.final("william again", now=5.0) == []
+    assert detector.final("harvin and william", now=6.0) == ["harvin"] # Cooldowns are per name
+    assert detector.final("over to william", now=10.0) == ["william"]
+
+
+def test_fired_words_point_at_the_word_that_completed_the_name():
+    detector = _detector(["william", "quarterly review"])
+
+    assert detector.partial("the quarterly review with", now=0.0) == ["quarterly review"]
+    assert detector.fired_words == {"quarterly review": 2}
+
+    # A revised hypothesis is rescanned from where it diverges
+    assert detector.partial("the quarterly review with will", now=0.1) == []
+    assert detector.partial("the quarterly review with william", now=0.2) == ["william"]
+    assert detector.fired_words == {"william": 4}
+    assert detector.words_scanned == 4 + 1 + 1
+
+
+def test_plain_callable_matchers_point_at_the_last_word():
+    detector = IncrementalDetector(lambda targets, text: "william" in text, ["william"])
+
+    assert detector.partial("hello there william ok", now=0.0) == ["william"]
+    assert detector.fired_words == {"william": 3}
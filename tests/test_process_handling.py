@@ -0,0 +1,140 @@
+import threading
+import time
+
+import process_handling
+import window_backend
+from window_backend import SHOW_MINIMIZED, SimulatedDesktop
+
+
+def test_window_closed_after_the_snapshot_does_not_abort_the_snap():
+    desktop = SimulatedDesktop()
+    desktop.addProcess(1, "zoom.exe")
+    desktop.addProcess(2, "chrome.exe")
+    call = desktop.addWindow(1, "Meeting", state=SHOW_MINIMIZED)
+    closing = desktop.addWindow(1, "Chat", state=SHOW_MINIMIZED)
+    browser = desktop.addWindow(2, "Browser")
+    window_backend.setBackend(desktop)
+    process_handling.stopLiveIndex()
+    process_handling.invalidateSnapshot()
+
+    def plan(snapshot):
+        desktop.closeWindow(closing) # Closes between the snapshot and the action
+        return [1], [2]
+
+    result = process_handling.submitSnap(plan).result(timeout=5)
+
+    assert result.error == ""
+    assert (result.restored, result.minimized, result.failed) == (1, 1, 1)
+    assert desktop.getPlacement(call) != SHOW_MINIMIZED
+    assert desktop.getPlacement(browser) == SHOW_MINIMIZED
+
+
+def test_reused_pid_gets_its_new_exe_name_in_the_live_index():
+    desktop = SimulatedDesktop()
+    desktop.addProcess(5, "old.exe")
+    window = desktop.addWindow(5, "Old")
+    window_backend.setBackend(desktop)
+    try:
+        assert process_handling.startLiveIndex()
+        assert process_handling.getSnapshot().names[5] == "old.exe"
+
+        desktop.closeWindow(window)
+        desktop.addProcess(5, "new.exe") # Windows hands the pid to another program
+        desktop.addWindow(5, "New")
+
+        assert process_handling.getSnapshot().names[5] == "new.exe"
+    finally:
+        process_handling.stopLiveIndex()
+
+
+class _BusyDesktop(SimulatedDesktop):
+    """Opens and closes a window while a resync is enumerating"""
+
+    duringEnum = None
+
+    def enumWindows(self):
+        hwnds = super().enumWindows()
+        if self.duringEnum is not None:
+            self.duringEnum, action = None, self.duringEnum
+            action()
+        return hwnds
+
+
+def test_events_during_a_resync_are_not_lost():
+    desktop = _BusyDesktop()
+    desktop.addProcess(1, "editor.exe")
+    desktop.addProcess(2, "player.exe")
+    closing = desktop.addWindow(1, "Draft")
+    window_backend.setBackend(desktop)
+    try:
+        assert process_handling.startLiveIndex()
+        opened = []
+
+        def churn():
+            desktop.closeWindow(closing)
+            opened.append(desktop.addWindow(2, "Video"))
+
+        desktop.duringEnum = churn
+        process_handling._liveIndex.resync()
+
+        snapshot = process_handling.getSnapshot()
+        assert snapshot.hwnds == {2: opened}
+        assert snapshot.names == {2: "player.exe"}
+        assert snapshot.titles == {opened[0]: "Video"}
+    finally:
+        process_handling.stopLiveIndex()
+
+
+def test_top_priority_window_ends_up_in_front():
+    desktop = SimulatedDesktop()
+    for pid, name in ((1, "notes.exe"), (2, "zoom.exe"), (3, "chat.exe"), (4, "game.exe")):
+        desktop.addProcess(pid, name)
+    notes = desktop.addWindow(1, "Notes", state=SHOW_MINIMIZED)
+    zoom = desktop.addWindow(2, "Meeting", state=SHOW_MINIMIZED)
+    chat = desktop.addWindow(3, "Chat")
+    game = desktop.addWindow(4, "Game")
+    window_backend.setBackend(desktop)
+    process_handling.stopLiveIndex()
+    process_handling.invalidateSnapshot()
+
+    # Whitelist priority: zoom, then chat, then notes
+    result = process_handling.submitSnap(lambda snapshot: ([2, 3, 1], [4])).result(timeout=5)
+
+    assert result.error == ""
+    assert desktop.foreground == zoom
+    assert desktop.zOrder() == [zoom, chat, notes, game]
+
+
+class _SlowDesktop(SimulatedDesktop):
+    """Enumeration waits until the test lets it through"""
+
+    def __init__(self):
+        super().__init__()
+        self.gate = threading.Event()
+        self.gate.set()
+
+    def enumWindows(self):
+        assert self.gate.wait(timeout=5)
+        return super().enumWindows()
+
+
+def test_invalidate_without_waiting_resyncs_in_the_background():
+    desktop = _SlowDesktop()
+    desktop.addProcess(1, "zoom.exe")
+    window_backend.setBackend(desktop)
+    try:
+        assert process_handling.startLiveIndex()
+        before = process_handling.getSnapshot()
+        desktop.gate.clear()
+
+        process_handling.invalidateSnapshot(wait=False) # Returns while the enumeration is blocked
+        assert process_handling.getSnapshot() is before
+
+        desktop.gate.set()
+        deadline = time.monotonic() + 5
+        while process_handling.getSnapshot() is before and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert process_handling.getSnapshot() is not before
+    finally:
+        desktop.gate.set()
+        process_handling.stopLiveIndex()
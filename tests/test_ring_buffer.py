@@ -0,0 +1,109 @@
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from ring_buffer import OVERFLOW_BLOCK, OVERFLOW_COALESCE, OVERFLOW_DROP_OLDEST, AudioRingBuffer
+
+
+def _ramp(start, count):
+    return np.arange(start, start + count, dtype=np.float32)
+
+
+def _drain(ring):
+    out = np.zeros(ring.capacity, dtype=np.float32)
+    return out[:ring.read_into(out, timeout=0)].tolist()
+
+
+def test_reads_wrap_around_the_end_of_the_storage():
+    ring = AudioRingBuffer(8)
+    ring.write(_ramp(0, 6))
+    assert _drain(ring) == list(range(6))
+
+    ring.write(_ramp(6, 5)) # Starts at slot 6, wraps to slot 0
+
+    assert _drain(ring) == list(range(6, 11))
+    assert (ring.read_position, ring.write_position) == (11, 11)
+
+
+def test_drop_oldest_discards_just_enough_old_audio():
+    ring = AudioRingBuffer(8, OVERFLOW_DROP_OLDEST)
+    ring.write(_ramp(0, 6))
+
+    assert ring.write(_ramp(6, 4)) == 2
+
+    assert _drain(ring) == list(range(2, 10))
+    assert ring.stats() == {"depth": 0, "max_depth": 8, "capacity": 8, "overruns": 1, "dropped_samples": 2}
+
+
+def test_coalesce_discards_the_whole_backlog():
+    ring = AudioRingBuffer(8, OVERFLOW_COALESCE)
+    ring.write(_ramp(0, 6))
+
+    assert ring.write(_ramp(6, 4)) == 6
+
+    assert _drain(ring) == list(range(6, 10))
+    assert (ring.overruns, ring.dropped_samples) == (1, 6)
+
+
+def test_block_waits_for_the_reader_and_loses_nothing():
+    ring = AudioRingBuffer(8, OVERFLOW_BLOCK)
+    ring.write(_ramp(0, 6))
+    reader = threading.Timer(0.05, _drain, args=(ring,))
+    reader.start()
+
+    started = time.monotonic()
+    assert ring.write(_ramp(6, 4), timeout=5.0) == 0
+    reader.join()
+
+    assert time.monotonic() - started >= 0.04
+    assert _drain(ring) == list(range(6, 10))
+    assert (ring.overruns, ring.dropped_samples) == (0, 0)
+
+
+def test_block_drops_oldest_when_the_timeout_runs_out():
+    ring = AudioRingBuffer(8, OVERFLOW_BLOCK)
+    ring.write(_ramp(0, 6))
+
+    started = time.monotonic()
+    assert ring.write(_ramp(6, 4), timeout=0.05) == 2
+
+    assert time.monotonic() - started >= 0.04
+    assert _drain(ring) == list(range(2, 10))
+    assert (ring.overruns, ring.dropped_samples) == (1, 2)
+
+
+def test_block_wakes_when_the_ring_is_closed():
+    ring = AudioRingBuffer(8, OVERFLOW_BLOCK)
+    ring.write(_ramp(0, 8))
+    threading.Timer(0.05, ring.close).start()
+
+    started = time.monotonic()
+    ring.write(_ramp(8, 2), timeout=5.0)
+
+    assert time.monotonic() - started < 2.0
+
+
+def test_a_write_larger_than_the_ring_keeps_the_newest_samples():
+    ring = AudioRingBuffer(4)
+
+    assert ring.write(_ramp(0, 6)) == 2
+
+    assert _drain(ring) == [2, 3, 4, 5]
+
+
+def test_read_times_out_and_returns_zero_once_closed_and_drained():
+    ring = AudioRingBuffer(4)
+    out = np.zeros(4, dtype=np.float32)
+
+    assert ring.read_into(out, timeout=0.01) == 0
+    ring.write(_ramp(0, 2))
+    ring.close()
+    assert ring.read_into(out, timeout=1.0) == 2
+    assert ring.read_into(out, timeout=1.0) == 0
+
+
+def test_unknown_policy_is_rejected():
+    with pytest.raises(ValueError):
+        AudioRingBuffer(4, "spill")
@@ -0,0 +1,90 @@
+import sqlite3
+import time
+
+from transcript_archive import TranscriptArchive
+
+
+def _count(path):
+    connection = sqlite3.connect(path)
+    try:
+        return connection.execute("SELECT COUNT(*) FROM utterances").fetchone()[0]
+    finally:
+        connection.close()
+
+
+def _archive(tmp_path, **kwargs):
+    return TranscriptArchive(str(tmp_path / "archive.db"), **kwargs)
+
+
+def test_a_full_batch_is_committed_without_waiting_for_the_interval(tmp_path):
+    archive = _archive(tmp_path, batch_size=3, flush_interval=60.0)
+    try:
+        for index in range(3):
+            archive.record(f"line {index}")
+        deadline = time.monotonic() + 5
+        while _count(archive.path) < 3 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert _count(archive.path) == 3
+    finally:
+        archive.close()
+
+
+def test_search_filters_and_orders_newest_first(tmp_path):
+    archive = _archive(tmp_path)
+    try:
+        archive.record("thanks william", detected=True, targets=["william"], ts=100.0)
+        archive.record("harvin joined the call", detected=True, targets=["harvin"], ts=200.0)
+        archive.record("the quarterly review", ts=300.0)
+        archive.flush()
+
+        assert [row["ts"] for row in archive.search()] == [300.0, 200.0, 100.0]
+        assert [row["text"] for row in archive.search("harvin")] == ["harvin joined the call"]
+        assert [row["ts"] for row in archive.search(detected_only=True)] == [200.0, 100.0]
+        assert [row["ts"] for row in archive.search(since=150.0, until=300.0)] == [200.0]
+        assert len(archive.search(limit=1)) == 1
+        # Not valid FTS syntax: searched as a literal phrase instead of failing
+        assert [row["ts"] for row in archive.search('quarterly"')] == [300.0]
+    finally:
+        archive.close()
+
+
+def test_search_without_fts_falls_back_to_like(tmp_path):
+    archive = _archive(tmp_path)
+    try:
+        archive.has_fts = False # As on an SQLite built without FTS5
+        archive.record("harvin joined the call", ts=100.0)
+        archive.flush()
+
+        # LIKE matches inside words, which FTS would not
+        assert [row["text"] for row in archive.search("arvin")] == ["harvin joined the call"]
+        assert archive.search("zoom") == []
+    finally:
+        archive.close()
+
+
+def test_write_failures_are_reported(tmp_path):
+    errors = []
+    archive = _archive(tmp_path, on_error=errors.append)
+    try:
+        connection = sqlite3.connect(archive.path)
+        connection.execute("DROP TABLE utterances")
+        connection.close()
+
+        archive.record("lost line")
+        archive.flush()
+
+        assert archive.failed_rows == 1
+        assert "write failed" in archive.last_error
+        assert errors == [archive.last_error]
+    finally:
+        archive.close()
+
+
+def test_flush_after_close_returns_at_once(tmp_path):
+    archive = _archive(tmp_path)
+    archive.close()
+
+    started = time.monotonic()
+    archive.flush(timeout=5.0)
+
+    assert time.monotonic() - started < 1.0
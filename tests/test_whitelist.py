@@ -0,0 +1,63 @@
+import whitelist
+from process_handling import WindowSnapshot
+
+
+def test_pid_reused_by_another_program_is_replaced_not_dropped():
+    rows = {7: whitelist._ProgramRow(7, "old.exe", "Old", "old.exe: Old", False)}
+    snapshot = WindowSnapshot(hwnds={7: [70]}, names={7: "new.exe"}, titles={70: "New"})
+
+    added, gone, retitled = whitelist._diffSnapshot(rows, {7: "new.exe"}, snapshot)
+
+    assert (added, gone, retitled) == ([7], [7], [])
+
+
+def test_processes_without_an_exe_name_still_get_a_decision():
+    snapshot = WindowSnapshot(
+        hwnds={1: [10], 2: [20, 21], 3: [30]},
+        names={1: "zoom.exe", 2: "", 3: ""},
+        titles={10: "Meeting", 20: "", 21: "Task Manager", 30: ""},
+    )
+
+    assert whitelist._getAllProcesses(snapshot) == {1: "zoom.exe", 2: "Task Manager", 3: "pid:3"}
+
+    whitelist.setWhitelist(["zoom"])
+    try:
+        assert whitelist._snapPlan(snapshot) == ([1], [2, 3])
+    finally:
+        whitelist.setWhitelist([])
+
+
+def test_matcher_prefers_exact_names_then_the_first_substring_entry():
+    matcher = whitelist._WhitelistMatcher(["Zoom", "teams", "zoom.exe", "a.b"])
+
+    assert matcher.priority("ZOOM.EXE") == 2 # Exact (case-insensitive) beats the earlier substring entry
+    assert matcher.priority("CptHost-zoom.exe") == 0 # Substring: the first listed entry that occurs
+    assert matcher.priority("ms-teams.exe") == 1
+    assert matcher.priority("axb.exe") == -1 # Entries are literal text, not regexes
+    assert "a.b.exe" in matcher
+    assert "chrome.exe" not in matcher
+    assert whitelist._WhitelistMatcher([]).priority("zoom.exe") == -1
+
+
+def test_matcher_memoizes_and_bounds_its_cache(monkeypatch):
+    matcher = whitelist._WhitelistMatcher(["zoom"])
+    monkeypatch.setattr(whitelist._WhitelistMatcher, "_MAX_CACHE", 3)
+
+    assert matcher.priority("zoom.exe") == 0
+    matcher._regex = None # A cached answer no longer needs the regex
+    assert matcher.priority("zoom.exe") == 0
+
+    for name in ("a.exe", "b.exe", "c.exe"):
+        matcher.priority(name)
+    assert len(matcher._cache) <= 3
+
+
+def test_get_whitelist_returns_a_copy():
+    whitelist.setWhitelist(["zoom.exe"])
+    try:
+        whitelist.getWhitelist().append("chrome.exe")
+
+        assert whitelist.getWhitelist() == ["zoom.exe"]
+        assert "chrome.exe" not in whitelist._matcher
+    finally:
+        whitelist.setWhitelist([])
@@ -0,0 +1,274 @@
+"""
+Searchable archive of finalized utterances (SQLite + FTS5).
+
+record() only puts the row on a queue; a background writer thread commits rows
+in batches, so the recognition loop never waits on disk. Searches open their own
+connection (WAL mode lets them run while the writer is busy).
+
+Public:
+- TranscriptArchive(path, on_error)
+    - record(text, device, detected, targets, ts) -> None
+    - search(query, since, until, detected_only, limit) -> list[dict]
+    - flush() / close()
+    - last_error: str, failed_rows: int
+- parse_date(text: str) -> float
+"""
+import os
+import queue
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from typing import Callable
+
+DEFAULT_ARCHIVE_PATH = "./transcripts/archive.db"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS utterances (
+    id INTEGER PRIMARY KEY,
+    ts REAL NOT NULL,
+    session TEXT NOT NULL,
+    device TEXT NOT NULL DEFAULT '',
+    text TEXT NOT NULL,
+    detected INTEGER NOT NULL DEFAULT 0,
+    targets TEXT NOT NULL DEFAULT ''
+);
+CREATE INDEX IF NOT EXISTS utterances_ts ON utterances (ts);
+CREATE INDEX IF NOT EXISTS utterances_detected ON utterances (detected, ts);
+"""
+
+_FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS utterances_fts USING fts5 (
+    text, content='utterances', content_rowid='id'
+);
+CREATE TRIGGER IF NOT EXISTS utterances_ai AFTER INSERT ON utterances BEGIN
+    INSERT INTO utterances_fts (rowid, text) VALUES (new.id, new.text);
+END;
+CREATE TRIGGER IF NOT EXISTS utterances_ad AFTER DELETE ON utterances BEGIN
+    INSERT INTO utterances_fts (utterances_fts, rowid, text) VALUES ('delete', old.id, old.text);
+END;
+"""
+
+_FLUSH = object()
+_STOP = object()
+
+
+def parse_date(text: str) -> float:
+    """'YYYY-MM-DD' or 'YYYY-MM-DD HH:MM' in local time -> epoch seconds"""
+    for fmt in ("%Y-%m-%d %H:%M", "%Y-%m-%d"):
+        try:
+            return datetime.strptime(text.strip(), fmt).timestamp()
+        except ValueError:
+            continue
+    raise ValueError(f"Invalid date '{text}'. Use YYYY-MM-DD or YYYY-MM-DD HH:MM.")
+
+
+class TranscriptArchive:
+    def __init__(
+        self,
+        path: str = DEFAULT_ARCHIVE_PATH,
+        batch_size: int = 200,
+        flush_interval: float = 0.5,
+        on_error: Callable[[str], None] | None = None,
+    ) -> None:
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.session = time.strftime("%Y%m%d-%H%M%S")
+        self.on_error = on_error # Called on the writer thread with each failure message
+        self.last_error = ""
+        self.failed_rows = 0
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        connection = self._connect()
+        connection.executescript(_SCHEMA)
+        try:
+            connection.executescript(_FTS_SCHEMA)
+            self.has_fts = True
+        except sqlite3.OperationalError:
+            # SQLite built without FTS5: search falls back to LIKE
+            self.has_fts = False
+        connection.close()
+
+        self._queue: queue.Queue = queue.Queue()
+        self._writer = threading.Thread(target=self._write_loop, name="transcript-archive", daemon=True)
+        self._writer.start()
+
+    def _connect(self) -> sqlite3.Connection:
+        connection = sqlite3.connect(self.path, timeout=10)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        return connection
+
+    def record(
+        self,
+        text: str,
+        device: str = "",
+        detected: bool = False,
+        targets: list[str] | None = None,
+        ts: float | None = None,
+    ) -> None:
+        """Queue a finalized utterance; never blocks on disk"""
+        self._queue.put((
+            ts if ts is not None else time.time(),
+            self.session,
+            device or "",
+            text,
+            int(detected),
+            ",".join(targets or []),
+        ))
+
+    def flush(self, timeout: float | None = 5.0) -> None:
+        """Wait until everything recorded so far is committed (returns at once after close())"""
+        if not self._writer.is_alive():
+            return
+        done = threading.Event()
+        self._queue.put((_FLUSH, done))
+        deadline = None if timeout is None else time.monotonic() + timeout
+        # The writer can stop before it reaches our marker; don't sit out the whole timeout then
+        while not done.wait(0.05):
+            if not self._writer.is_alive():
+                return
+            if deadline is not None and time.monotonic() >= deadline:
+                return
+
+    def close(self) -> None:
+        if self._writer.is_alive():
+            self._queue.put(_STOP)
+            self._writer.join(timeout=5.0)
+
+    def _failed(self, message: str) -> None:
+        self.last_error = message
+        if self.on_error is None:
+            print(message)
+            return
+        try:
+            self.on_error(message)
+        except Exception:
+            pass
+
+    def _write_loop(self) -> None:
+        try:
+            connection = self._connect()
+        except sqlite3.Error as e:
+            self._failed(f"Transcript archive could not be opened: {e}")
+            return
+        rows: list[tuple] = []
+        waiters: list[threading.Event] = []
+        running = True
+        while running:
+            deadline = time.monotonic() + self.flush_interval
+            # Collect a batch: up to batch_size rows or flush_interval seconds
+            while len(rows) < self.batch_size:
+                try:
+                    item = self._queue.get(timeout=max(deadline - time.monotonic(), 0))
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    running = False
+                    break
+                if item[0] is _FLUSH:
+                    waiters.append(item[1])
+                    break
+                rows.append(item)
+
+            if rows:
+                try:
+                    with connection:
+                        connection.executemany(
+                            "INSERT INTO utterances (ts, session, device, text, detected, targets) "
+                            "VALUES (?, ?, ?, ?, ?, ?)",
+                            rows,
+                        )
+                except sqlite3.Error as e:
+                    self.failed_rows += len(rows)
+                    self._failed(f"Transcript archive write failed, {len(rows)} line(s) lost: {e}")
+                rows = []
+            for waiter in waiters:
+                waiter.set()
+            waiters = []
+        connection.close()
+
+    def search(
+        self,
+        query: str = "",
+        since: float | None = None,
+        until: float | None = None,
+        detected_only: bool = False,
+        limit: int = 200,
+    ) -> list[dict]:
+        """
+        Newest-first utterances matching an FTS query (e.g. 'harvin', '"quarterly review"')
+        inside an optional [since, until) epoch range.
+        """
+        clauses: list[str] = []
+        params: list = []
+        if query.strip():
+            if self.has_fts:
+                clauses.append("u.id IN (SELECT rowid FROM utterances_fts WHERE utterances_fts MATCH ?)")
+                params.append(query)
+            else:
+                clauses.append("u.text LIKE ?")
+                params.append(f"%{query}%")
+        if since is not None:
+            clauses.append("u.ts >= ?")
+            params.append(since)
+        if until is not None:
+            clauses.append("u.ts < ?")
+            params.append(until)
+        if detected_only:
+            clauses.append("u.detected = 1")
+
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        params.append(limit)
+        sql = (
+            f"SELECT u.ts, u.session, u.device, u.text, u.detected, u.targets FROM utterances u "
+            f"{where} ORDER BY u.ts DESC LIMIT ?"
+        )
+        connection = self._connect()
+        try:
+            try:
+                cursor = connection.execute(sql, params)
+            except sqlite3.OperationalError:
+                if not (query.strip() and self.has_fts):
+                    raise
+                # Not valid FTS syntax (e.g. a stray quote): search it as a literal phrase
+                params[0] = '"' + query.replace('"', '""') + '"'
+                cursor = connection.execute(sql, params)
+            return [
+                {"ts": ts, "session": session, "device": device, "text": text, "detected": bool(detected), "targets": targets}
+                for ts, session, device, text, detected, targets in cursor
+            ]
+        finally:
+            connection.close()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Search the transcript archive.")
+    parser.add_argument("query", nargs="?", default="")
+    parser.add_argument("--archive", default=DEFAULT_ARCHIVE_PATH)
+    parser.add_argument("--since", help="YYYY-MM-DD [HH:MM]")
+    parser.add_argument("--until", help="YYYY-MM-DD [HH:MM]")
+    parser.add_argument("--detections", action="store_true", help="only lines where a target name was detected")
+    parser.add_argument("--limit", type=int, default=50)
+    args = parser.parse_args()
+
+    archive = TranscriptArchive(args.archive)
+    started = time.perf_counter()
+    results = archive.search(
+        args.query,
+        parse_date(args.since) if args.since else None,
+        parse_date(args.until) if args.until else None,
+        args.detections,
+        args.limit,
+    )
+    elapsed = time.perf_counter() - started
+    for row in results:
+        stamp = datetime.fromtimestamp(row["ts"]).strftime("%Y-%m-%d %H:%M:%S")
+        flag = " [DETECTED]" if row["detected"] else ""
+        print(f"{stamp} ({row['device']}){flag}: {row['text']}")
+    print(f"{len(results)} result(s) in {elapsed * 1000:.1f} ms")
+    archive.close()
@@ -0,0 +1,85 @@
+"""
+Bounded transcript of log lines for long sessions.
+
+The newest lines stay in an in-memory ring; lines pushed out of the ring are
+appended to a spill file on disk, so memory stays flat however long the call runs.
+
+Public:
+- TranscriptStore(capacity, spill_dir)
+"""
+import os
+import threading
+import time
+from collections import deque
+
+DEFAULT_SPILL_DIR = "./transcripts"
+
+
+class TranscriptStore:
+    def __init__(self, capacity: int = 1000, spill_dir: str | None = DEFAULT_SPILL_DIR) -> None:
+        self.capacity = capacity
+        self.spill_dir = spill_dir
+        self.spill_path: str | None = None
+        self.spilled = 0
+        self._lines: deque[str] = deque()
+        self._spill_file = None
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._lines)
+
+    def append(self, line: str) -> None:
+        with self._lock:
+            self._lines.append(line)
+            while len(self._lines) > self.capacity:
+                self._spill(self._lines.popleft())
+
+    def extend(self, lines: list[str]) -> None:
+        for line in lines:
+            self.append(line)
+
+    def lines(self) -> list[str]:
+        with self._lock:
+            return list(self._lines)
+
+    def snippet(self, max_chars: int = 500) -> str:
+        """The last max_chars characters of the transcript, newest lines last"""
+        with self._lock:
+            parts: list[str] = []
+            size = 0
+            for line in reversed(self._lines):
+                parts.append(line)
+                size += len(line) + 1
+                if size >= max_chars:
+                    break
+        text = "\n".join(reversed(parts))
+        return text[-max_chars:]
+
+    def clear(self) -> None:
+        """Start a new session. A session that already spilled gets its tail written so its file is complete."""
+        with self._lock:
+            if self._spill_file is not None:
+                while self._lines:
+                    self._spill(self._lines.popleft())
+            self._lines.clear()
+            self._close_spill()
+
+    def close(self) -> None:
+        with self._lock:
+            self._close_spill()
+
+    def _spill(self, line: str) -> None:
+        # Caller holds _lock
+        if self.spill_dir is None:
+            return
+        if self._spill_file is None:
+            os.makedirs(self.spill_dir, exist_ok=True)
+            self.spill_path = os.path.join(self.spill_dir, time.strftime("transcript-%Y%m%d-%H%M%S.log"))
+            self._spill_file = open(self.spill_path, "a", encoding="utf-8", buffering=1)
+        self._spill_file.write(line + "\n")
+        self.spilled += 1
+
+    def _close_spill(self) -> None:
+        if self._spill_file is not None:
+            self._spill_file.close()
+            self._spill_file = None
@@ -2,104 +2,214 @@
 Public method: 
 - openWhitelistUI(master: tk.Tk) -> None
 - getWhitelist() -> list[str]
-- minmaxPrograms() -> None
+- setWhitelist(names: list[str]) -> None
+- minmaxPrograms(onDone) -> Future[SnapResult]
 """
 
 # Reference: https://www.geeksforgeeks.org/python/python-get-list-of-running-processes/
-import os, process_handling, win32gui, tkinter as tk
+import process_handling, re, tkinter as tk
+from dataclasses import dataclass
 from okcancelapply import OkCancelApply as OCA
 
 _whitelist: list[str] = []
 _blacklist: list[str] = ["TextInputHost.exe"]
 
 # Private Functions
-def _splitCol(row: str) -> list[str]:
-    info: list[str] = row.split()
-    return [" ".join(info[:-1]), info[-1]] if len(info) != 0 else []
-
-def _getAllProcesses() -> dict[int, str]:
+def _getAllProcesses(snapshot: process_handling.WindowSnapshot | None = None) -> dict[int, str]:
     """
-    Get all running processes.
+    Get all running processes that own a visible window.
+    A process whose executable cannot be read (e.g. elevated) is keyed by its
+    first window title, or "pid:<n>", so it is still minimized or restored.
     
+    :param snapshot: Window index to read from (default: the cached one)
+    :type snapshot: process_handling.WindowSnapshot | None
     :return: A map with key "process_id" and value "program_name"
     :rtype: dict[int, str]
     """
-    output = os.popen("wmic process get description, processid").read()
+    snapshot = snapshot or process_handling.getSnapshot()
     processes: dict[int, str] = {}
-    for row in output.split("\n\n")[1:]:
-        info: list[str] = _splitCol(row)
-        if len(info) != 0:
-            desc, pid = info
-            if len(process_handling.getHwnds(int(pid))) == 0: continue
-            if desc in _blacklist: continue
-            processes[int(pid)] = desc
+    for pid, name in snapshot.names.items():
+        if not name:
+            titles = (snapshot.titles.get(hwnd, "") for hwnd in snapshot.hwnds.get(pid, []))
+            name = next((title for title in titles if title), f"pid:{pid}")
+        if name not in _blacklist:
+            processes[pid] = name
     return processes
 
-def _isWhitelisted(name: str, whitelist: list[str]) -> bool:
+class _WhitelistMatcher:
+    """
+    The whitelist compiled once: normalized patterns, an exact-name set and one
+    combined substring regex. Answers are memoized per executable name, so a
+    lookup costs one dict access however long the whitelist is.
+    """
+    _MAX_CACHE: int = 4096
+
+    def __init__(self, whitelist: list[str]) -> None:
+        self.patterns: list[str] = [wl_name.lower() for wl_name in whitelist]
+        self._exact: dict[str, int] = {}
+        for priority, pattern in enumerate(self.patterns):
+            self._exact.setdefault(pattern, priority)
+        # Longest first so the alternation never stops at a shorter prefix of a longer entry
+        alternatives = sorted(set(self.patterns), key = len, reverse = True)
+        self._regex = re.compile("|".join(map(re.escape, alternatives))) if alternatives else None
+        self._cache: dict[str, int] = {}
+
+    def priority(self, name: str) -> int:
+        """Index of the first whitelist entry found in name, or -1"""
+        priority = self._cache.get(name)
+        if priority is not None:
+            return priority
+
+        lowered = name.lower()
+        priority = self._exact.get(lowered, -1)
+        if priority < 0 and self._regex is not None and self._regex.search(lowered):
+            # Rare path (the name is whitelisted): find which entry comes first
+            priority = next(i for i, pattern in enumerate(self.patterns) if pattern in lowered)
+
+        if len(self._cache) >= self._MAX_CACHE:
+            self._cache.clear()
+        self._cache[name] = priority
+        return priority
+
+    def __contains__(self, name: str) -> bool:
+        return self.priority(name) >= 0
+
+_matcher = _WhitelistMatcher(_whitelist)
+
+def _isWhitelisted(name: str) -> bool:
     """
     Check if name is in the whitelist (case-insensitive, match)
     
     :param name: Program name
     :type name: str
-    :param whitelist: A list of allowed program names
-    :type whitelist: list[str]
     :return: The name of the program is in the whitelist.
     :rtype: bool
     """
-    for wl_name in whitelist:
-        if wl_name.lower() in name.lower():
-            return True
-    return False
+    return name in _matcher
 
 # Class
+_MAX_CHAR: int = 32
+
+def _describe(name: str, title: str) -> str:
+    """Button text: the window title, with the program name added when the title does not show it"""
+    desc = title
+    program_name = name.split(".")[0].lower()
+    if program_name not in desc.lower()[:_MAX_CHAR - 3]:
+        if len(desc) > _MAX_CHAR - len(program_name) - 3:
+            desc = desc[:_MAX_CHAR - 3] + "..."
+        desc += f" ({program_name.capitalize()})"
+    elif len(desc) > _MAX_CHAR:
+        desc = desc[:_MAX_CHAR - 3] + "..."
+    return desc
+
+@dataclass
+class _ProgramRow:
+    """One running program in the whitelist dialog"""
+    pid: int
+    name: str
+    title: str
+    desc: str
+    whitelisted: bool
+
+def _diffSnapshot(rows: dict[int, _ProgramRow], processes: dict[int, str], snapshot: process_handling.WindowSnapshot) -> tuple[list[int], list[int], list[int]]:
+    """
+    Compare the dialog's rows with a new snapshot.
+
+    :return: (added pids, gone pids, retitled pids)
+    :rtype: tuple[list[int], list[int], list[int]]
+    """
+    gone = [pid for pid in rows if pid not in processes or processes[pid] != rows[pid].name]
+    # A pid reused by another program is both gone (old row) and added (new row)
+    replaced = set(gone)
+    added = [pid for pid in processes if pid not in rows or pid in replaced]
+    retitled = [pid for pid in processes if pid in rows and pid not in replaced and snapshot.title(pid) != rows[pid].title]
+    return added, gone, retitled
+
 class _ProgramButton(tk.Button):
-    _MAX_CHAR: int = 32
+    """A recycled row of a _VirtualList: shows whichever program row it is given"""
 
-    def __init__(self, master: tk.Misc | None = None, pid: int = 0, name: str = "", command = lambda: print("Pressed")) -> None:
-        # Instance Variable
-        self.name = name
+    def __init__(self, master: tk.Misc, command) -> None:
+        self.pid = 0
         self.desc = ""
-        self.command = command
+        super().__init__(master, width = _MAX_CHAR + 4, command = lambda: command(self.pid))
 
-        # Get Window Name
-        hwnds = process_handling.getHwnds(pid)
-        for hwnd in hwnds:
-            tempDesc = win32gui.GetWindowText(hwnd)
-            # print(f"'{tempDesc}'")
-            if tempDesc != "" and self.desc == "":
-                # print(f"    '{tempDesc}'")
-                self.desc = tempDesc
-
-        # Add Program Name if it's not present
-        program_name = self.name.split(".")[0].lower()
-        if program_name not in self.desc.lower()[:self._MAX_CHAR - 3]:
-            if len(self.desc) > self._MAX_CHAR - len(program_name) - 3:
-                self.desc = self.desc[:self._MAX_CHAR - 3] + "..."
-            self.desc += f" ({program_name.capitalize()})"
-        elif len(self.desc) > self._MAX_CHAR:
-            self.desc = self.desc[:self._MAX_CHAR - 3] + "..."
-
-        # Create Program Button
-        super().__init__(master, text = self.desc, command = self.command, width = self._MAX_CHAR + 4)
-        self._isWhitelisted = _isWhitelisted(name, _whitelist)
-    
-    def toggleWhitelist(self):
-        self._isWhitelisted = not self._isWhitelisted
+    def showRow(self, row: _ProgramRow) -> None:
+        self.pid = row.pid
+        if row.desc != self.desc:
+            self.desc = row.desc
+            self.config(text = row.desc)
 
-    def refresh(self, newMaster: tk.Misc):
-        super().__init__(newMaster, text = self.desc, command = self.command, width = self._MAX_CHAR + 4)
-    
-    def isWhitelisted(self) -> bool:
-        return self._isWhitelisted
+class _VirtualList(tk.Frame):
+    """
+    Scrollable list of program buttons that only creates widgets for the rows
+    on screen. The buttons are reused as the list scrolls or changes.
+    """
+    _ROW_HEIGHT: int = 30
+
+    def __init__(self, master: tk.Misc, command, emptyText: str, visibleRows: int = 8) -> None:
+        super().__init__(master)
+        self.command = command
+        self.rows: list[_ProgramRow] = []
+        self.visibleRows = visibleRows
+        self._buttons: list[_ProgramButton] = []
+        self._items: list[int] = [] # Canvas window item of each button
+
+        self.canvas = tk.Canvas(self, height = visibleRows * self._ROW_HEIGHT, highlightthickness = 0, yscrollincrement = self._ROW_HEIGHT)
+        self.scrollbar = tk.Scrollbar(self, orient = "vertical", command = self._yview)
+        self.canvas.configure(yscrollcommand = self.scrollbar.set)
+        self.scrollbar.pack(side = "right", fill = "y")
+        self.canvas.pack(side = "left", fill = "both", expand = True)
+        self.emptyLabel = tk.Label(self.canvas, text = emptyText)
+
+        self.canvas.bind("<Configure>", lambda _event: self._render())
+        self.canvas.bind("<MouseWheel>", self._onWheel)
+
+    def setRows(self, rows: list[_ProgramRow]) -> None:
+        self.rows = rows
+        self.canvas.configure(scrollregion = (0, 0, 1, len(rows) * self._ROW_HEIGHT))
+        if rows:
+            self.emptyLabel.place_forget()
+        else:
+            self.emptyLabel.place(relx = 0.5, rely = 0.5, anchor = "center")
+        self._render()
+
+    def _yview(self, *args) -> None:
+        self.canvas.yview(*args)
+        self._render()
+
+    def _onWheel(self, event) -> None:
+        self.canvas.yview_scroll(-int(event.delta / 120) or (-1 if event.delta > 0 else 1), "units")
+        self._render()
+
+    def _render(self) -> None:
+        first = int(self.canvas.canvasy(0) // self._ROW_HEIGHT)
+        width = max(self.canvas.winfo_width(), 1)
+        for slot in range(self.visibleRows + 1):
+            if slot == len(self._buttons):
+                button = _ProgramButton(self.canvas, self.command)
+                button.bind("<MouseWheel>", self._onWheel)
+                self._buttons.append(button)
+                self._items.append(self.canvas.create_window(0, 0, anchor = "n", window = button))
+            index = first + slot
+            item = self._items[slot]
+            if index < len(self.rows):
+                self._buttons[slot].showRow(self.rows[index])
+                self.canvas.coords(item, width // 2, index * self._ROW_HEIGHT)
+                self.canvas.itemconfigure(item, state = "normal")
+            else:
+                self.canvas.itemconfigure(item, state = "hidden")
 
 class _WhitelistUI(tk.Toplevel):
     _PADDING: int = 10
     _PACK_KWARGS = {"padx": _PADDING, "pady": _PADDING, "fill": "x"}
+    _REFRESH_MS: int = 1000
 
     def __init__(self, master = None, title: str = "Whitelist", width: int = 500, height: int = 600) -> None:
         # Instance Variables
-        self._programButtons: dict[int, _ProgramButton] = {}
-        self.processes = _getAllProcesses()
+        self._rows: dict[int, _ProgramRow] = {}
+        # Start from a fresh view of the desktop without enumerating on the Tk thread: _poll picks it up
+        process_handling.invalidateSnapshot(wait = False)
+        self.snapshot = process_handling.getSnapshot()
         self.localWhitelist = _whitelist[:]
 
         super().__init__(master)
@@ -109,13 +219,17 @@ class _WhitelistUI(tk.Toplevel):
         # Programs List
         self.programsFrame: tk.LabelFrame = tk.LabelFrame(self, text = "Programs")
         self.programsFrame.pack(**self._PACK_KWARGS) # padx = self._PADDING, pady = self._PADDING, fill = "x"
+        self.programList = _VirtualList(self.programsFrame, self.refresh, "All programs are whitelisted!")
+        self.programList.pack(fill = "x", padx = self._PADDING, pady = self._PADDING)
 
         # Whitelist
         self.whitelistFrame: tk.LabelFrame = tk.LabelFrame(self, text = "Whitelisted Programs")
         self.whitelistFrame.pack(**self._PACK_KWARGS)
+        self.whitelistList = _VirtualList(self.whitelistFrame, self.refresh, "No whitelisted program yet.", visibleRows = 5)
+        self.whitelistList.pack(fill = "x", padx = self._PADDING, pady = self._PADDING)
 
-        # Program Buttons
-        self.insertButtons()
+        # Program Rows
+        self.applySnapshot(self.snapshot)
 
         # Ok Cancel Apply Button
         self.oca: OCA = OCA(self, self._apply, None, self._stateFunc)
@@ -124,8 +238,11 @@ class _WhitelistUI(tk.Toplevel):
         # Closing protocol
         self.protocol("WM_DELETE_WINDOW", self.window_exit)
 
+        # Follow the desktop while the dialog is open
+        self.after(self._REFRESH_MS, self._poll)
+
     def _apply(self):
-        _whitelist[:] = self.localWhitelist
+        setWhitelist(self.localWhitelist)
 
     def _stateFunc(self):
         if len(_whitelist) != len(self.localWhitelist):
@@ -137,87 +254,66 @@ class _WhitelistUI(tk.Toplevel):
         return False
 
     def window_exit(self):
-        _whitelist[:] = self.getProgramWhitelist()
+        setWhitelist(self.getProgramWhitelist())
         self.destroy()
 
-    def insertButtons(self) -> None:
-        # new_dict: dict[int, ProgramButton] = {}
-        for pid, name in self.processes.items():
-            programButton: None|_ProgramButton = None
-            if len(name) == 0:
-                continue
-            elif _isWhitelisted(name, _whitelist) or programButton and programButton.isWhitelisted():
-                programButton = _ProgramButton(self.whitelistFrame, pid, name, lambda x = pid: self.refresh(x))
-            else:
-                programButton = _ProgramButton(self.programsFrame, pid, name, lambda x = pid: self.refresh(x))
-                
-            programButton.pack()
-            self._programButtons[pid] = programButton
-        
-        # Show LabelFrame
-        self.blankWhitelistLabel = tk.Label(self.whitelistFrame, text = "No whitelisted program yet.")
-        self.blankProgramLabel = tk.Label(self.programsFrame, text = "All programs are whitelisted!")
-
-        whitelist_length = len(self.getProgramWhitelist())
-        if whitelist_length == 0:
-            self.blankWhitelistLabel.pack()
-        
-        if len(self.processes) - whitelist_length == 0:
-            self.blankProgramLabel.pack()
-        
-        # Frame Padding
-        self.programPad = tk.Frame(self.programsFrame, height = self._PADDING)
-        self.whitelistPad = tk.Frame(self.whitelistFrame, height = self._PADDING)
-
-        self.programPad.pack()
-        self.whitelistPad.pack()
+    def _poll(self) -> None:
+        if not self.winfo_exists():
+            return
+        snapshot = process_handling.getSnapshot()
+        if snapshot is not self.snapshot:
+            self.snapshot = snapshot
+            self.applySnapshot(snapshot)
+        self.after(self._REFRESH_MS, self._poll)
+
+    def applySnapshot(self, snapshot: process_handling.WindowSnapshot) -> None:
+        """Update only the rows of processes that were added, are gone or were retitled"""
+        processes = _getAllProcesses(snapshot)
+        added, gone, retitled = _diffSnapshot(self._rows, processes, snapshot)
+        if not (added or gone or retitled):
+            return
+
+        for pid in gone:
+            del self._rows[pid]
+        for pid in retitled:
+            row = self._rows[pid]
+            row.title = snapshot.title(pid)
+            row.desc = _describe(row.name, row.title)
+        for pid in added:
+            name, title = processes[pid], snapshot.title(pid)
+            whitelisted = _isWhitelisted(name) or name in self.localWhitelist
+            self._rows[pid] = _ProgramRow(pid, name, title, _describe(name, title), whitelisted)
+        self._layout()
+
+    def _layout(self) -> None:
+        rows = list(self._rows.values())
+        self.programList.setRows([row for row in rows if not row.whitelisted])
+        self.whitelistList.setRows([row for row in rows if row.whitelisted])
 
     def refresh(self, pid: int) -> None:
-        # Change the referred program button's whitelist status
-        selfButton: _ProgramButton = self._programButtons[pid]
-        selfButton.toggleWhitelist()
-
-        # Update the position of the button
-        selfButton.pack_forget()
-        if selfButton.isWhitelisted():
-            selfButton.refresh(self.whitelistFrame)
-        else:
-            selfButton.refresh(self.programsFrame)
-        selfButton.pack()
+        # Change the referred program's whitelist status and move it to the other list
+        row = self._rows.get(pid)
+        if row is None:
+            return
+        row.whitelisted = not row.whitelisted
+        self._layout()
 
         # Update local settings
         self.localWhitelist[:] = self.getProgramWhitelist()
 
-        # Show empty frame status
-        whitelist_length = len(self.localWhitelist)
-        self.blankWhitelistLabel.pack_forget()
-        self.blankProgramLabel.pack_forget()
-
-        if whitelist_length == 0: # No whitelist
-            self.blankWhitelistLabel.pack()
-
-        if len(self.processes) - whitelist_length == 0: # No blacklist
-            self.blankProgramLabel.pack()
-
-        # update frame padding
-        self.programPad.pack_forget()
-        self.programPad.pack()
-        self.whitelistPad.pack_forget()
-        self.whitelistPad.pack()
-        
         # Refresh Apply Button
         self.oca.refreshApplyButton()
     
     def getProgramWhitelist(self):
-        return [button.name for button in self._programButtons.values() if button.isWhitelisted()]
+        return [row.name for row in self._rows.values() if row.whitelisted]
     
     def _printProgramWhitelist(self):
         """
         Debug purposes only. Show the whitelist status of all program.
         """
         print("__Button_Whitelist_______")
-        for button in self._programButtons.values():
-            print(button.desc[:12], button.isWhitelisted())
+        for row in self._rows.values():
+            print(row.desc[:12], row.whitelisted)
         print()
 
 # Public Functions
@@ -228,16 +324,35 @@ def openWhitelistUI(master: tk.Tk) -> None:
     # wui.grab_release()
 
 def getWhitelist() -> list[str]:
-    return _whitelist
-
-def minmaxPrograms() -> None:
-    processes = _getAllProcesses()
-    for pid, name in processes.items():
-        if _isWhitelisted(name, _whitelist):
-            process_handling.restore_by_pid(pid)
+    """A copy: change the whitelist through setWhitelist() so the matcher is recompiled"""
+    return _whitelist[:]
+
+def setWhitelist(names: list[str]) -> None:
+    """Replace the whitelist and recompile its matcher"""
+    global _matcher
+    _whitelist[:] = names
+    _matcher = _WhitelistMatcher(_whitelist)
+
+def _snapPlan(snapshot: process_handling.WindowSnapshot) -> tuple[list[int], list[int]]:
+    """Whitelisted processes are restored (in whitelist order), every other one minimized"""
+    restore: list[tuple[int, int]] = []
+    minimize: list[int] = []
+    matcher = _matcher
+    for pid, name in _getAllProcesses(snapshot).items():
+        priority = matcher.priority(name)
+        if priority >= 0:
+            restore.append((priority, pid))
         else:
-            process_handling.minimize_by_pid(pid)
+            minimize.append(pid)
+    restore.sort()
+    return [pid for _, pid in restore], minimize
 
+def minmaxPrograms(onDone = None):
+    """
+    Restore the whitelisted programs and minimize the rest, on the window worker.
+    Returns immediately; onDone(result: SnapResult) runs when the snap has finished.
+    """
+    return process_handling.submitSnap(_snapPlan, onDone)
 
 if __name__ == "__main__":
     root = tk.Tk()
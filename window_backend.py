@@ -0,0 +1,407 @@
+"""
+Window-manager backends used by process_handling.
+
+Public method:
+- getBackend() -> WindowBackend
+- setBackend(backend: WindowBackend) -> None
+
+Public class:
+- WindowBackend: the interface (enumerate, pid/title/placement, minimize/restore/maximize, window events)
+- Win32Backend: the real desktop through pywin32
+- SimulatedDesktop: pure-Python desktop for tests and load tests on any OS
+"""
+import ctypes
+import itertools
+from ctypes import wintypes
+import sys
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable
+
+# Show states, same values as win32con.SW_SHOWNORMAL / SW_SHOWMINIMIZED / SW_SHOWMAXIMIZED
+SHOW_NORMAL = 1
+SHOW_MINIMIZED = 2
+SHOW_MAXIMIZED = 3
+
+# Window events passed to watchWindows() callbacks
+EVENT_CREATE = "create"
+EVENT_DESTROY = "destroy"
+EVENT_SHOW = "show"
+EVENT_HIDE = "hide"
+EVENT_TITLE = "title"
+
+_PROCESS_QUERY_LIMITED_INFORMATION = 0x1000
+_SW_SHOWMINNOACTIVE = 7
+_GA_ROOT = 2
+_WM_QUIT = 0x0012
+_WINEVENT_OUTOFCONTEXT = 0x0000
+_OBJID_WINDOW = 0
+_CHILDID_SELF = 0
+_WIN_EVENTS = {
+    0x8000: EVENT_CREATE, # EVENT_OBJECT_CREATE
+    0x8001: EVENT_DESTROY, # EVENT_OBJECT_DESTROY
+    0x8002: EVENT_SHOW, # EVENT_OBJECT_SHOW
+    0x8003: EVENT_HIDE, # EVENT_OBJECT_HIDE
+    0x800C: EVENT_TITLE, # EVENT_OBJECT_NAMECHANGE
+}
+
+class WindowBackend:
+    """Everything the snap logic needs from the window manager"""
+
+    def enumWindows(self) -> list[int]:
+        """Visible top-level windows, in Z order"""
+        raise NotImplementedError
+
+    def isTopLevelVisible(self, hwnd: int) -> bool:
+        """The window exists, is visible and is not a child window"""
+        raise NotImplementedError
+
+    def getPid(self, hwnd: int) -> int:
+        raise NotImplementedError
+
+    def getTitle(self, hwnd: int) -> str:
+        raise NotImplementedError
+
+    def getPlacement(self, hwnd: int) -> int:
+        """SHOW_NORMAL, SHOW_MINIMIZED or SHOW_MAXIMIZED"""
+        raise NotImplementedError
+
+    def getExeName(self, pid: int) -> str:
+        """Executable file name ("chrome.exe"), or "" when it cannot be read"""
+        raise NotImplementedError
+
+    def minimize(self, hwnd: int) -> None:
+        raise NotImplementedError
+
+    def restore(self, hwnd: int) -> None:
+        """Un-minimize, going back to maximized if that is where the window was"""
+        raise NotImplementedError
+
+    def maximize(self, hwnd: int) -> None:
+        raise NotImplementedError
+
+    def minimizeMany(self, hwnds: list[int]) -> int:
+        """
+        Minimize a batch of windows without handing focus from one to the next.
+        A window that fails (e.g. closed since the snapshot) is skipped; returns how many did.
+        """
+        failed = 0
+        for hwnd in hwnds:
+            try:
+                self.minimize(hwnd)
+            except Exception:
+                failed += 1
+        return failed
+
+    def restoreMany(self, hwnds: list[int]) -> int:
+        """
+        Restore a batch of windows given in priority order, so that the first one ends up in front.
+        Returns how many failed and were skipped.
+        """
+        failed = 0
+        # Each restore activates its window: go from the lowest priority up, so the top one is raised last
+        for hwnd in reversed(hwnds):
+            try:
+                self.restore(hwnd)
+            except Exception:
+                failed += 1
+        return failed
+
+    def watchWindows(self, callback) -> "Callable[[], None] | None":
+        """
+        Call callback(event, hwnd) when a window is created, destroyed, shown,
+        hidden or retitled. Returns a function that stops watching, or None when
+        the backend cannot deliver events (callers then fall back to polling).
+        """
+        return None
+
+class Win32Backend(WindowBackend):
+    def __init__(self) -> None:
+        import win32con, win32gui, win32process
+        self._con, self._gui, self._process = win32con, win32gui, win32process
+
+    def enumWindows(self) -> list[int]:
+        hwnds: list[int] = []
+        isVisible = self._gui.IsWindowVisible
+
+        def callback(hwnd, _):
+            if isVisible(hwnd):
+                hwnds.append(hwnd)
+            return True
+
+        self._gui.EnumWindows(callback, None)
+        return hwnds
+
+    def isTopLevelVisible(self, hwnd: int) -> bool:
+        gui = self._gui
+        return bool(gui.IsWindow(hwnd) and gui.IsWindowVisible(hwnd) and ctypes.windll.user32.GetAncestor(hwnd, _GA_ROOT) == hwnd)
+
+    def getPid(self, hwnd: int) -> int:
+        return self._process.GetWindowThreadProcessId(hwnd)[1]
+
+    def getTitle(self, hwnd: int) -> str:
+        return self._gui.GetWindowText(hwnd)
+
+    def getPlacement(self, hwnd: int) -> int:
+        # Reference: https://stackoverflow.com/questions/60471477/using-python-how-can-i-detect-whether-a-program-is-minimized-or-maximized
+        _, viewStatus, *_ = self._gui.GetWindowPlacement(hwnd)
+        return viewStatus
+
+    def getExeName(self, pid: int) -> str:
+        kernel32 = ctypes.windll.kernel32
+        handle = kernel32.OpenProcess(_PROCESS_QUERY_LIMITED_INFORMATION, False, pid)
+        if not handle:
+            return ""
+        try:
+            size = ctypes.c_ulong(1024)
+            buffer = ctypes.create_unicode_buffer(size.value)
+            if not kernel32.QueryFullProcessImageNameW(handle, 0, buffer, ctypes.byref(size)):
+                return ""
+            return buffer.value.rsplit("\\", 1)[-1]
+        finally:
+            kernel32.CloseHandle(handle)
+
+    def minimize(self, hwnd: int) -> None:
+        self._gui.ShowWindow(hwnd, self._con.SW_MINIMIZE)
+
+    def restore(self, hwnd: int) -> None:
+        # GetWindowPlacement raises for a window closed since the snapshot; restoreMany skips it
+        if self.getPlacement(hwnd) == SHOW_MAXIMIZED:
+            self._gui.ShowWindow(hwnd, self._con.SW_MAXIMIZE)
+        else:
+            self._gui.ShowWindow(hwnd, self._con.SW_RESTORE)
+
+    def maximize(self, hwnd: int) -> None:
+        self._gui.ShowWindow(hwnd, self._con.SW_MAXIMIZE)
+
+    def restoreMany(self, hwnds: list[int]) -> int:
+        failed = super().restoreMany(hwnds)
+        if hwnds and failed < len(hwnds):
+            try:
+                # The restores already raised it; this also hands it the keyboard focus
+                self._gui.SetForegroundWindow(hwnds[0])
+            except Exception:
+                pass # Closed since the snapshot, or Windows refused the focus change
+        return failed
+
+    def minimizeMany(self, hwnds: list[int]) -> int:
+        # ShowWindowAsync posts the request instead of waiting for each window's
+        # thread, so one hung program cannot stall the batch, and "no activate"
+        # keeps focus on the window that was just restored
+        showWindowAsync = ctypes.windll.user32.ShowWindowAsync
+        isWindow = self._gui.IsWindow
+        failed = 0
+        for hwnd in hwnds:
+            if not isWindow(hwnd): # Closed since the snapshot
+                failed += 1
+                continue
+            showWindowAsync(hwnd, _SW_SHOWMINNOACTIVE)
+        return failed
+
+    def watchWindows(self, callback):
+        """WinEvent hooks on a thread of their own, which pumps the messages they are delivered through"""
+        user32, kernel32 = ctypes.windll.user32, ctypes.windll.kernel32
+        WinEventProc = ctypes.WINFUNCTYPE(
+            None, wintypes.HANDLE, wintypes.DWORD, wintypes.HWND, wintypes.LONG, wintypes.LONG, wintypes.DWORD, wintypes.DWORD
+        )
+
+        def onEvent(hook, event, hwnd, idObject, idChild, thread, eventTime):
+            # Only whole windows; carets, cursors and controls raise the same events
+            if idObject == _OBJID_WINDOW and idChild == _CHILDID_SELF and hwnd:
+                try:
+                    callback(_WIN_EVENTS[event], hwnd)
+                except Exception as e:
+                    print(f"Window event handler failed: {e}")
+
+        proc = WinEventProc(onEvent)
+        started = threading.Event()
+        threadId = [0]
+
+        def pump():
+            # Our own windows are reported too: enumWindows() lists them, so the index must see them close
+            flags = _WINEVENT_OUTOFCONTEXT
+            # Two ranges: the create..hide block and NAMECHANGE, skipping the very noisy LOCATIONCHANGE in between
+            hooks = [
+                user32.SetWinEventHook(0x8000, 0x8003, 0, proc, 0, 0, flags),
+                user32.SetWinEventHook(0x800C, 0x800C, 0, proc, 0, 0, flags),
+            ]
+            threadId[0] = kernel32.GetCurrentThreadId()
+            started.set()
+            msg = wintypes.MSG()
+            while user32.GetMessageW(ctypes.byref(msg), 0, 0, 0) > 0:
+                user32.TranslateMessage(ctypes.byref(msg))
+                user32.DispatchMessageW(ctypes.byref(msg))
+            for hook in hooks:
+                if hook:
+                    user32.UnhookWinEvent(hook)
+
+        thread = threading.Thread(target=pump, name="window-events", daemon=True)
+        thread.start()
+        started.wait()
+
+        def stop():
+            user32.PostThreadMessageW(threadId[0], _WM_QUIT, 0, 0)
+            thread.join(timeout=1.0)
+
+        stop.proc = proc # The hooks call into it until stop(); it must not be collected before then
+        return stop
+
+@dataclass
+class SimulatedWindow:
+    hwnd: int
+    pid: int
+    title: str
+    state: int = SHOW_NORMAL
+    visible: bool = True
+    wasMaximized: bool = False # Where restore() goes back to, like the real placement
+
+class SimulatedDesktop(WindowBackend):
+    """
+    In-memory desktop. Holds any number of windows, counts every call and can
+    charge a fixed cost per window-manager call to mimic a real ShowWindow.
+    """
+
+    def __init__(self, callCost: float = 0.0) -> None:
+        self.callCost = callCost
+        self.windows: dict[int, SimulatedWindow] = {}
+        self.exeNames: dict[int, str] = {}
+        self.calls: dict[str, int] = {}
+        self._order: OrderedDict[int, None] = OrderedDict() # Z order, topmost last, so raising and sinking are O(1)
+        self.foreground: int | None = None # Active window
+        self._nextHwnd = itertools.count(0x10000, 4)
+        self._lock = threading.Lock()
+        self._watchers: list = []
+
+    # Desktop setup
+    def addProcess(self, pid: int, exeName: str) -> None:
+        self.exeNames[pid] = exeName
+
+    def addWindow(self, pid: int, title: str = "", state: int = SHOW_NORMAL, visible: bool = True) -> int:
+        with self._lock:
+            hwnd = next(self._nextHwnd)
+            self.windows[hwnd] = SimulatedWindow(hwnd, pid, title, state, visible, state == SHOW_MAXIMIZED)
+            self._order[hwnd] = None
+            self.foreground = hwnd
+        self._emit(EVENT_CREATE, hwnd)
+        if visible:
+            self._emit(EVENT_SHOW, hwnd)
+        return hwnd
+
+    def closeWindow(self, hwnd: int) -> None:
+        with self._lock:
+            if self.windows.pop(hwnd, None) is None:
+                return
+            del self._order[hwnd]
+            if self.foreground == hwnd:
+                self.foreground = None
+        self._emit(EVENT_DESTROY, hwnd)
+
+    def setTitle(self, hwnd: int, title: str) -> None:
+        self.windows[hwnd].title = title
+        self._emit(EVENT_TITLE, hwnd)
+
+    def setVisible(self, hwnd: int, visible: bool) -> None:
+        self.windows[hwnd].visible = visible
+        self._emit(EVENT_SHOW if visible else EVENT_HIDE, hwnd)
+
+    def _emit(self, event: str, hwnd: int) -> None:
+        for callback in list(self._watchers):
+            callback(event, hwnd)
+
+    def populate(self, processes: int, windowsPerProcess: int = 1, firstPid: int = 1000) -> None:
+        """Fill the desktop with processes named app0000.exe... each owning windowsPerProcess windows"""
+        for index in range(processes):
+            pid = firstPid + index
+            self.addProcess(pid, f"app{index:04d}.exe")
+            for window in range(windowsPerProcess):
+                self.addWindow(pid, f"Document {window} - App {index}")
+
+    def zOrder(self) -> list[int]:
+        """All windows, topmost first"""
+        with self._lock:
+            return list(reversed(self._order))
+
+    def _raise(self, hwnd: int, activate: bool) -> None:
+        with self._lock:
+            self._order.move_to_end(hwnd)
+            if activate:
+                self.foreground = hwnd
+
+    def _call(self, name: str) -> None:
+        self.calls[name] = self.calls.get(name, 0) + 1
+        if self.callCost:
+            time.sleep(self.callCost)
+
+    # WindowBackend
+    def enumWindows(self) -> list[int]:
+        self._call("enumWindows")
+        with self._lock:
+            return [hwnd for hwnd in reversed(self._order) if self.windows[hwnd].visible]
+
+    def isTopLevelVisible(self, hwnd: int) -> bool:
+        window = self.windows.get(hwnd)
+        return window is not None and window.visible
+
+    def getPid(self, hwnd: int) -> int:
+        return self.windows[hwnd].pid if hwnd in self.windows else 0
+
+    def getTitle(self, hwnd: int) -> str:
+        return self.windows[hwnd].title if hwnd in self.windows else ""
+
+    def getPlacement(self, hwnd: int) -> int:
+        return self.windows[hwnd].state if hwnd in self.windows else SHOW_NORMAL
+
+    def getExeName(self, pid: int) -> str:
+        return self.exeNames.get(pid, "")
+
+    def _window(self, hwnd: int) -> SimulatedWindow:
+        window = self.windows.get(hwnd)
+        if window is None:
+            raise LookupError(f"Invalid window handle {hwnd}") # Like a closed window on Win32
+        return window
+
+    def minimize(self, hwnd: int) -> None:
+        self._call("minimize")
+        window = self._window(hwnd)
+        if window.state != SHOW_MINIMIZED:
+            window.wasMaximized = window.state == SHOW_MAXIMIZED
+            window.state = SHOW_MINIMIZED
+            with self._lock:
+                # Minimized windows sink to the bottom and give up the focus
+                self._order.move_to_end(hwnd, last=False)
+                if self.foreground == hwnd:
+                    self.foreground = None
+
+    def restore(self, hwnd: int) -> None:
+        self._call("restore")
+        window = self._window(hwnd)
+        if window.state == SHOW_MINIMIZED:
+            window.state = SHOW_MAXIMIZED if window.wasMaximized else SHOW_NORMAL
+        self._raise(hwnd, activate=True) # Like SW_RESTORE, which activates the window
+
+    def maximize(self, hwnd: int) -> None:
+        self._call("maximize")
+        window = self._window(hwnd)
+        window.state = SHOW_MAXIMIZED
+        window.wasMaximized = True
+        self._raise(hwnd, activate=True)
+
+    def watchWindows(self, callback):
+        """Events are delivered synchronously, from whichever thread changed the desktop"""
+        self._watchers.append(callback)
+        return lambda: self._watchers.remove(callback)
+
+_backend: WindowBackend | None = None
+
+def getBackend() -> WindowBackend:
+    """The active backend: Win32 on Windows, an empty simulated desktop elsewhere"""
+    global _backend
+    if _backend is None:
+        _backend = Win32Backend() if sys.platform == "win32" else SimulatedDesktop()
+    return _backend
+
+def setBackend(backend: WindowBackend) -> None:
+    global _backend
+    _backend = backend